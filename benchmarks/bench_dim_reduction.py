@@ -0,0 +1,71 @@
+"""
+Neighbor-recall and speed impact of reducing embedding dimension before
+the k-NN search, and how much the resulting clusters change.
+
+recall@k is measured against the exact search on the full-dimension
+vectors; ARI compares native-Louvain clusters of both k-NN graphs.
+
+Usage:
+    poetry run python benchmarks/bench_dim_reduction.py [n_points] [dim ...]
+"""
+
+import sys
+import time
+
+import numpy as np
+from sklearn.metrics import adjusted_rand_score
+
+from paper_grouper.core.ann_index import neighbor_recall
+from paper_grouper.core.community_detector import detect_communities_louvain
+from paper_grouper.core.data import EmbeddingResult
+from paper_grouper.core.dim_reduction import REDUCTION_METHODS, reduce_dimensions
+from paper_grouper.core.graph_builder import compute_neighbor_table, graph_from_neighbor_table
+from paper_grouper.core.sparse_graph import labels_from_partition
+
+K = 10
+
+
+def synthetic_embeddings(n: int, dim: int = 384, seed: int = 0) -> EmbeddingResult:
+    """Clustered vectors living near a low-dimensional subspace, like sentence embeddings."""
+    rng = np.random.default_rng(seed)
+    basis = rng.normal(size=(48, dim))
+    centers = rng.normal(size=(max(1, n // 100), 48))
+    latent = centers[rng.integers(0, len(centers), n)] + 0.6 * rng.normal(size=(n, 48))
+    vectors = latent @ basis + 0.5 * rng.normal(size=(n, dim))
+    return EmbeddingResult(
+        vectors=vectors.astype(np.float32), article_ids=[f"p{i}" for i in range(n)]
+    )
+
+
+def _clusters(table) -> np.ndarray:
+    G = graph_from_neighbor_table(table, k=K)
+    part = detect_communities_louvain(G, resolution=1.0, backend="native", seed=0)
+    return labels_from_partition(G, part)
+
+
+def main(n: int, dims) -> None:
+    emb = synthetic_embeddings(n)
+    t0 = time.perf_counter()
+    full = compute_neighbor_table(emb, k_max=K)
+    base = time.perf_counter() - t0
+    full_labels = _clusters(full)
+    print(f"n={n} full dim={emb.vectors.shape[1]}: k-NN {base:.2f}s")
+    print(f"{'method':>18} {'dim':>5} {'reduce s':>9} {'k-NN s':>7} {'recall@10':>9} {'ARI':>6}")
+    for method in REDUCTION_METHODS:
+        for dim in dims:
+            t0 = time.perf_counter()
+            reduced = reduce_dimensions(emb, dim, method=method)
+            t_reduce = time.perf_counter() - t0
+            t0 = time.perf_counter()
+            table = compute_neighbor_table(reduced, k_max=K)
+            t_knn = time.perf_counter() - t0
+            recall = neighbor_recall(table.indices, full.indices)
+            ari = adjusted_rand_score(full_labels, _clusters(table))
+            print(
+                f"{method:>18} {dim:>5} {t_reduce:>9.2f} {t_knn:>7.2f} {recall:>9.3f} {ari:>6.3f}"
+            )
+
+
+if __name__ == "__main__":
+    args = [int(a) for a in sys.argv[1:]]
+    main(args[0] if args else 20_000, args[1:] or [32, 64, 128])
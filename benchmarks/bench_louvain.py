@@ -0,0 +1,45 @@
+"""
+Compare Louvain backends (python-louvain vs native) on synthetic k-NN graphs.
+
+Usage:
+    poetry run python benchmarks/bench_louvain.py [n_nodes ...]
+"""
+
+import sys
+import time
+
+import numpy as np
+
+from paper_grouper.core.community_detector import detect_communities_louvain
+from paper_grouper.core.data import EmbeddingResult
+from paper_grouper.core.graph_builder import build_knn_graph
+from paper_grouper.core.sparse_graph import labels_from_partition, modularity
+
+
+def synthetic_graph(n: int, k: int = 10, noise: float = 2.5, seed: int = 0):
+    rng = np.random.default_rng(seed)
+    centers = rng.normal(size=(max(1, n // 100), 32))
+    vectors = centers[rng.integers(0, len(centers), n)] + noise * rng.normal(size=(n, 32))
+    emb = EmbeddingResult(vectors=vectors, article_ids=[f"p{i}" for i in range(n)])
+    return build_knn_graph(emb, k=k)
+
+
+def main(sizes) -> None:
+    print(f"{'nodes':>8} {'backend':>15} {'seconds':>8} {'modularity':>10} {'clusters':>8}")
+    for n in sizes:
+        G = synthetic_graph(n)
+        base = None
+        for backend in ("python-louvain", "native"):
+            t0 = time.perf_counter()
+            part = detect_communities_louvain(G, resolution=1.0, backend=backend, seed=0)
+            dt = time.perf_counter() - t0
+            q = modularity(G, labels_from_partition(G, part))
+            speedup = "" if base is None else f"  ({base / dt:.1f}x)"
+            base = base or dt
+            print(
+                f"{n:>8} {backend:>15} {dt:>8.2f} {q:>10.4f} {len(set(part.values())):>8}{speedup}"
+            )
+
+
+if __name__ == "__main__":
+    main([int(a) for a in sys.argv[1:]] or [2_000, 20_000])
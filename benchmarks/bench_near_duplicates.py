@@ -0,0 +1,64 @@
+"""
+Timings of MinHash/LSH near-duplicate detection, and how many planted
+near-duplicate pairs it recovers.
+
+Documents are abstract-length random word sequences. For a fraction of
+them a copy with a few words replaced is appended, like a preprint next to
+its camera-ready version.
+
+Usage:
+    poetry run python benchmarks/bench_near_duplicates.py [n_docs] [edits]
+"""
+
+import sys
+import time
+
+import numpy as np
+
+from paper_grouper.core.near_duplicates import (
+    DEFAULT_THRESHOLD,
+    choose_bands,
+    lsh_groups,
+    minhash_signatures,
+)
+
+WORDS_PER_DOC = 200
+DUPLICATE_FRACTION = 0.01
+
+
+def synthetic_corpus(n: int, edits: int, seed: int = 0):
+    """`n` texts; the last n * DUPLICATE_FRACTION are edited copies of the first ones."""
+    rng = np.random.default_rng(seed)
+    vocab = np.array([f"w{i}" for i in range(50_000)])
+    n_dup = int(n * DUPLICATE_FRACTION)
+    docs = rng.integers(0, len(vocab), size=(n - n_dup, WORDS_PER_DOC))
+    copies = docs[:n_dup].copy()
+    for row in copies:
+        row[rng.choice(WORDS_PER_DOC, size=edits, replace=False)] = rng.integers(0, len(vocab))
+    texts = [" ".join(vocab[row]) for row in np.concatenate([docs, copies])]
+    planted = {(i, n - n_dup + i) for i in range(n_dup)}
+    return texts, planted
+
+
+def main(n: int, edits: int) -> None:
+    texts, planted = synthetic_corpus(n, edits)
+    bands, rows = choose_bands(128, DEFAULT_THRESHOLD)
+    print(f"n={n} words/doc={WORDS_PER_DOC} edits/copy={edits} bands={bands}x{rows}")
+
+    t0 = time.perf_counter()
+    signatures, empty = minhash_signatures(texts)
+    t_sig = time.perf_counter() - t0
+    t0 = time.perf_counter()
+    groups = lsh_groups(signatures, DEFAULT_THRESHOLD, skip=empty)
+    t_lsh = time.perf_counter() - t0
+
+    found = {(g[0], other) for g in groups for other in g[1:]}
+    recall = len(found & planted) / max(1, len(planted))
+    print(f"signatures {t_sig:.2f}s  LSH {t_lsh:.2f}s  total {t_sig + t_lsh:.2f}s")
+    print(f"groups {len(groups)}  planted pairs recovered {recall:.3f}")
+    print(f"pairs not planted {len(found - planted)}")
+
+
+if __name__ == "__main__":
+    args = [int(a) for a in sys.argv[1:]]
+    main(args[0] if args else 100_000, args[1] if len(args) > 1 else 5)
@@ -3,19 +3,361 @@ Controller for both Manual and Auto modes.
 The GUI should call here, not core/io directly.
 """
 
-from typing import Any, Dict, List, Optional
+import os
+from collections import Counter
+from dataclasses import replace
+from functools import partial
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+
+import numpy as np
 
 from paper_grouper.core.autotune import run_autotune
 from paper_grouper.core.cluster_postprocess import finalize_clustering
 from paper_grouper.core.community_detector import detect_communities_louvain
-from paper_grouper.core.embedder import embed_articles_light
-from paper_grouper.core.graph_builder import build_knn_graph
-from paper_grouper.core.metadata_extractor import batch_extract
+from paper_grouper.core.data import ArticleRecord, EmbeddingResult
+from paper_grouper.core.dim_reduction import reduce_dimensions
+from paper_grouper.core.embedder import (
+    EMBEDDER_SPECS,
+    embed_articles,
+    embed_articles_tfidf,
+    fit_tfidf,
+    wait_for_model,
+    warm_up_model,
+)
+from paper_grouper.core.graph_builder import (
+    build_knn_graph,
+    compute_neighbor_table,
+    graph_from_neighbor_table,
+)
+from paper_grouper.core.metadata_extractor import EXTRACTOR_VERSION, batch_extract
+from paper_grouper.core.near_duplicates import (
+    DEFAULT_THRESHOLD,
+    NEAR_DUPLICATE_MODES,
+    find_near_duplicates,
+)
+from paper_grouper.core.quantization import quantize_embeddings
 from paper_grouper.core.scoring import summarize_for_autotune
-from paper_grouper.io.file_scanner import list_pdfs
+from paper_grouper.io.dedup import DuplicateFilter, dedupe_pdfs
+from paper_grouper.io.embedding_cache import (
+    DEFAULT_CACHE_DIR,
+    EmbeddingCache,
+    embed_with_cache,
+)
+from paper_grouper.io.embedding_store import embed_to_memmap
+from paper_grouper.io.file_scanner import iter_pdfs
 from paper_grouper.io.graph_visualizer import render_graph_png
+from paper_grouper.io.manifest import (
+    Manifest,
+    diff_manifest,
+    read_manifest,
+    scan_entries,
+    write_manifest,
+)
+from paper_grouper.io.metadata_cache import (
+    DEFAULT_METADATA_CACHE,
+    Fingerprint,
+    MetadataCache,
+    extract_with_cache,
+)
 from paper_grouper.io.output_writer import prepare_output_dir, write_clustered_files
 from paper_grouper.io.report_writer import write_reports
+from paper_grouper.io.tfidf_store import load_tfidf, save_tfidf
+
+__all__ = [
+    "DEFAULT_CACHE_DIR",
+    "DEFAULT_METADATA_CACHE",
+    "run_auto",
+    "run_manual",
+    "wait_for_model",
+    "warm_up_model",
+]
+
+
+def _extract(
+    pdfs: Iterable[str],
+    extract_workers: Optional[int],
+    metadata_cache: Optional[str],
+    fingerprints: Optional[Dict[str, Fingerprint]] = None,
+) -> Tuple[List[ArticleRecord], Dict[str, int]]:
+    """
+    Extract metadata, reusing records cached in the `metadata_cache` SQLite
+    file if set. `pdfs` may be a stream, e.g. the folder scan still running.
+    The cache lookups share `fingerprints` with the manifest (see
+    `extract_with_cache`).
+    """
+    extract_fn = partial(batch_extract, max_workers=extract_workers)
+    if metadata_cache is None:
+        return extract_fn(pdfs), {}
+    with MetadataCache(metadata_cache) as cache:
+        return extract_with_cache(pdfs, cache, extract_fn, fingerprints)
+
+
+def _reuse_vectors(
+    chunk: List[ArticleRecord],
+    embed_fn: Callable[[List[ArticleRecord]], EmbeddingResult],
+    rows: Dict[str, int],
+    previous: Manifest,
+) -> EmbeddingResult:
+    """
+    float32 vectors of `chunk`: articles in `rows` (article id -> manifest
+    row) get `previous`'s vector back, only the others go through `embed_fn`.
+    """
+    reused = np.array([a.id in rows for a in chunk], dtype=bool)
+    old = [rows[a.id] for a in chunk if a.id in rows]
+    vectors = np.empty((len(chunk), previous.vectors.shape[1]), dtype=np.float32)
+    vectors[reused] = previous.vectors[old]
+    if previous.scales is not None:
+        vectors[reused] *= previous.scales[old, None]
+    stats: Dict[str, Any] = {}
+    if not reused.all():
+        new = embed_fn([a for a, r in zip(chunk, reused, strict=True) if not r])
+        vectors[~reused] = new.vectors
+        stats = new.stats
+    return EmbeddingResult(vectors=vectors, article_ids=[a.id for a in chunk], stats=stats)
+
+
+def _embed(
+    articles: List[ArticleRecord],
+    embedder: str,
+    cache_dir: Optional[str],
+    batch_size: int = 32,
+    num_threads: Optional[int] = None,
+    storage: str = "float32",
+    memmap_path: Optional[str] = None,
+    tfidf_vocab: Optional[str] = None,
+    reuse: Optional[Tuple[Dict[str, int], Manifest]] = None,
+) -> EmbeddingResult:
+    """
+    Embed with the chosen embedder, reusing cached vectors when `cache_dir`
+    is set, and store the vectors as `storage`. With `memmap_path` the
+    vectors are streamed chunk by chunk into a memmap at that path instead
+    of being held in memory. `reuse` (article id -> row, previous manifest)
+    takes those articles' vectors from an incremental run's manifest. A model warm-up started with `warm_up_model`
+    is waited on by the first real-model call, after PDF scanning and
+    extraction have run.
+
+    "tfidf" yields sparse vectors and bypasses the cache and the memmap (a
+    text's vector depends on the corpus IDF). With `tfidf_vocab`, the
+    vocabulary/IDF stored there is reused, or fitted and saved there.
+    """
+    if embedder == "tfidf":
+        if tfidf_vocab is not None and Path(tfidf_vocab).exists():
+            vectorizer = load_tfidf(tfidf_vocab)
+        else:
+            vectorizer = fit_tfidf([a.text_repr for a in articles])
+            if tfidf_vocab is not None:
+                save_tfidf(vectorizer, tfidf_vocab)
+        return quantize_embeddings(embed_articles_tfidf(articles, vectorizer), storage)
+
+    embedder_id, dim = EMBEDDER_SPECS[embedder]
+    embed_fn = partial(
+        embed_articles, embedder=embedder, batch_size=batch_size, num_threads=num_threads
+    )
+    if cache_dir is not None:
+        cache = EmbeddingCache(cache_dir, embedder_id, dim)
+        embed_fn = partial(embed_with_cache, embed_fn=embed_fn, cache=cache)
+    if reuse is not None:
+        embed_fn = partial(_reuse_vectors, embed_fn=embed_fn, rows=reuse[0], previous=reuse[1])
+    if memmap_path is not None:
+        return embed_to_memmap(
+            articles, embed_fn, memmap_path, dim=dim, n_articles=len(articles), storage=storage
+        )
+    return quantize_embeddings(embed_fn(articles), storage)
+
+
+def _scan(
+    input_dir: str,
+    recursive: bool,
+    include: Optional[List[str]],
+    exclude: Optional[List[str]],
+    deduplicate: bool,
+    extract: bool = False,
+    extract_workers: Optional[int] = None,
+    metadata_cache: Optional[str] = None,
+    fingerprints: Optional[Dict[str, Fingerprint]] = None,
+) -> Tuple[
+    List[str], Dict[str, List[str]], Optional[Tuple[Dict[str, ArticleRecord], Dict[str, int]]]
+]:
+    """
+    Input PDFs and, with `deduplicate`, the byte-identical copies dropped per
+    kept path. With `extract`, PDFs are also extracted while the folder is
+    still being scanned, and (records by path, extraction stats) is returned
+    as well. Copies are recognized as they arrive and are not extracted
+    (see `DuplicateFilter` for the one exception). Fingerprints the
+    metadata cache computes are collected in `fingerprints`.
+    """
+    paths = iter_pdfs(input_dir, recursive=recursive, include=include, exclude=exclude)
+    if not extract:
+        pdfs = sorted(paths) if recursive else list(paths)
+        if not deduplicate:
+            return pdfs, {}, None
+        return (*dedupe_pdfs(pdfs), None)
+
+    found: List[str] = []
+    admitted: List[str] = []
+    duplicates = DuplicateFilter() if deduplicate else None
+
+    def scanned() -> Iterator[str]:
+        for path in paths:
+            found.append(path)
+            if duplicates is None or duplicates.admit(path):
+                admitted.append(path)
+                yield path
+
+    records, stats = _extract(scanned(), extract_workers, metadata_cache, fingerprints)
+    # a recursive scan comes in thread order; sorted like list_pdfs for reproducible runs
+    pdfs = sorted(found) if recursive else found
+    aliases = duplicates.aliases() if duplicates is not None else {}
+    dropped = {path for copies in aliases.values() for path in copies}
+    pdfs = [path for path in pdfs if path not in dropped]
+    return pdfs, aliases, (dict(zip(admitted, records, strict=True)), stats)
+
+
+def _unique_ids(
+    articles: List[ArticleRecord], pdfs: List[str], input_dir: str
+) -> List[ArticleRecord]:
+    """
+    Ids are file names, which can repeat across subfolders of a recursive
+    scan; repeated ones become the PDF's path relative to `input_dir`.
+    """
+    counts = Counter(a.id for a in articles)
+    if len(counts) == len(articles):
+        return articles
+    root = os.path.realpath(input_dir)
+    return [
+        (replace(a, id=Path(os.path.relpath(pdf, root)).as_posix()) if counts[a.id] > 1 else a)
+        for a, pdf in zip(articles, pdfs, strict=True)
+    ]
+
+
+def _near_duplicates(
+    articles: List[ArticleRecord], emb: EmbeddingResult, mode: str, threshold: float
+) -> Tuple[List[ArticleRecord], EmbeddingResult, List[List[str]]]:
+    """
+    Near-duplicate groups as article ids, first one kept. "flag" only
+    reports them. "merge" keeps the first article of each group, appends the
+    others' paths to its aliases and drops their embedding rows (a
+    memmap-backed embedding is copied into memory by that).
+    """
+    if mode not in NEAR_DUPLICATE_MODES:
+        raise ValueError(
+            f"unknown near-duplicate mode {mode!r}; expected one of {NEAR_DUPLICATE_MODES}"
+        )
+    if mode == "off":
+        return articles, emb, []
+    groups = find_near_duplicates(articles, threshold)
+    id_groups = [[articles[i].id for i in group] for group in groups]
+    if mode == "flag" or not groups:
+        return articles, emb, id_groups
+
+    articles = list(articles)
+    dropped = set()
+    for first, *rest in groups:
+        merged = [path for i in rest for path in (articles[i].src_path, *articles[i].aliases)]
+        articles[first] = replace(articles[first], aliases=articles[first].aliases + merged)
+        dropped.update(rest)
+    keep = np.array([i for i in range(len(articles)) if i not in dropped])
+    emb = replace(
+        emb,
+        vectors=emb.vectors[keep],
+        article_ids=[emb.article_ids[i] for i in keep],
+        scales=None if emb.scales is None else emb.scales[keep],
+    )
+    return [articles[i] for i in keep], emb, id_groups
+
+
+def _load_corpus(
+    input_dir: str,
+    pdfs: List[str],
+    aliases: Dict[str, List[str]],
+    embedder: str,
+    cache_dir: Optional[str],
+    embed_batch_size: int,
+    embed_threads: Optional[int],
+    embedding_storage: str,
+    embedding_memmap: Optional[str],
+    tfidf_vocab: Optional[str],
+    extract_workers: Optional[int],
+    metadata_cache: Optional[str],
+    incremental_from: Optional[str],
+    prefetched: Optional[Tuple[Dict[str, ArticleRecord], Dict[str, int]]] = None,
+    fingerprints: Optional[Dict[str, Fingerprint]] = None,
+) -> Tuple[List[ArticleRecord], EmbeddingResult, Manifest, Dict[str, Any]]:
+    """
+    Extract and embed the PDFs found in the input folder. With `incremental_from` (a
+    previous output folder holding a manifest), PDFs whose path, size,
+    mtime and content hash are unchanged reuse that run's record and
+    vector, only added/modified ones are extracted and embedded, and
+    removed ones are dropped. A manifest written with another extractor or
+    embedder is not reused at all. Returns the manifest to write for this run.
+    `prefetched` holds the records (by path) and stats of an extraction
+    already done during the scan (see `_scan`), and `fingerprints` the file
+    fingerprints computed so far (path -> fingerprint).
+    """
+    fingerprints = {} if fingerprints is None else fingerprints
+    embedder_id, dim = EMBEDDER_SPECS.get(embedder, (None, None))
+    config = {"extractor": EXTRACTOR_VERSION, "embedder": embedder_id or embedder, "dim": dim}
+    entries = scan_entries(pdfs, fingerprints)
+    previous = read_manifest(incremental_from) if incremental_from is not None else None
+    stats: Dict[str, Any] = {}
+    if previous is not None and previous.config != config:
+        previous = None
+        stats["incremental_rebuild"] = True
+
+    todo = list(range(len(pdfs)))
+    diff = None
+    if previous is not None:
+        diff = diff_manifest(previous, entries)
+        todo = sorted(diff.added + diff.modified)
+        stats["incremental_stats"] = diff.summary()
+
+    if prefetched is None:
+        fresh, stats["extraction_stats"] = _extract(
+            [pdfs[i] for i in todo], extract_workers, metadata_cache, fingerprints
+        )
+    else:
+        records, stats["extraction_stats"] = prefetched
+        fresh = [records[pdfs[i]] for i in todo]
+    articles: List[ArticleRecord] = [None] * len(pdfs)  # type: ignore[list-item]
+    for i, record in zip(todo, fresh, strict=True):
+        articles[i] = record
+    if diff is not None:
+        for i, j in diff.reused.items():
+            articles[i] = previous.records[j]
+    articles = _unique_ids(articles, pdfs, input_dir)
+    # reused records may carry the copies seen by the previous run
+    articles = [replace(a, aliases=aliases.get(pdf, [])) for a, pdf in zip(articles, pdfs)]
+    if aliases:
+        stats["duplicates"] = {a.id: a.aliases for a in articles if a.aliases}
+    for entry, article in zip(entries, articles, strict=True):
+        entry.article_id = article.id
+
+    reuse = None
+    if diff is not None and diff.reused and previous.vectors is not None:
+        reuse = ({articles[i].id: j for i, j in diff.reused.items()}, previous)
+    # "light": rápido, sem torch (desenvolvimento); "model": embeddings reais
+    emb = _embed(
+        articles,
+        embedder,
+        cache_dir,
+        embed_batch_size,
+        embed_threads,
+        embedding_storage,
+        embedding_memmap,
+        tfidf_vocab,
+        reuse=reuse,
+    )
+
+    sparse = embedder_id is None
+    manifest = Manifest(
+        entries=entries,
+        records=articles,
+        config=config,
+        vectors=None if sparse else emb.vectors,
+        scales=None if sparse else emb.scales,
+    )
+    return articles, emb, manifest, stats
 
 
 def run_manual(
@@ -25,18 +367,67 @@ def run_manual(
     resolution: float,
     min_cluster_size: int,
     rename_with_title: bool,
+    knn_method: str = "exact",
+    ann_trees: Optional[int] = None,
+    louvain_backend: str = "python-louvain",
+    embedder: str = "light",
+    cache_dir: Optional[str] = None,
+    embed_batch_size: int = 32,
+    embed_threads: Optional[int] = None,
+    embedding_storage: str = "float32",
+    embedding_memmap: Optional[str] = None,
+    tfidf_vocab: Optional[str] = None,
+    target_dim: Optional[int] = None,
+    reduction_method: str = "svd",
+    extract_workers: Optional[int] = None,
+    metadata_cache: Optional[str] = None,
+    incremental_from: Optional[str] = None,
+    recursive: bool = False,
+    include: Optional[List[str]] = None,
+    exclude: Optional[List[str]] = None,
+    deduplicate: bool = True,
+    near_duplicates: str = "off",
+    near_dup_threshold: float = DEFAULT_THRESHOLD,
 ) -> Dict[str, Any]:
 
-    pdfs = list_pdfs(input_dir)
-    articles_list = batch_extract(pdfs)
+    # without a previous run every PDF is extracted, so that can overlap the scan
+    fingerprints: Dict[str, Fingerprint] = {}
+    pdfs, aliases, prefetched = _scan(
+        input_dir,
+        recursive,
+        include,
+        exclude,
+        deduplicate,
+        extract=incremental_from is None,
+        extract_workers=extract_workers,
+        metadata_cache=metadata_cache,
+        fingerprints=fingerprints,
+    )
+    articles_list, emb, manifest, corpus_stats = _load_corpus(
+        input_dir,
+        pdfs,
+        aliases,
+        embedder,
+        cache_dir,
+        embed_batch_size,
+        embed_threads,
+        embedding_storage,
+        embedding_memmap,
+        tfidf_vocab,
+        extract_workers,
+        metadata_cache,
+        incremental_from,
+        prefetched,
+        fingerprints,
+    )
+    articles_list, emb, near_dups = _near_duplicates(
+        articles_list, emb, near_duplicates, near_dup_threshold
+    )
     articles_by_id = {a.id: a for a in articles_list}
-
-    # desenvolvimento: rápido, sem torch
-    emb = embed_articles_light(articles_list)
-    # produção futura (quando quiser rodar embeddings reais):
-    # emb = embed_articles_model(articles_list)
-    G = build_knn_graph(emb, k=k)
-    raw_part = detect_communities_louvain(G, resolution=resolution)
+    if target_dim is not None:
+        emb = reduce_dimensions(emb, target_dim, method=reduction_method)
+    G = build_knn_graph(emb, k=k, method=knn_method, n_trees=ann_trees)
+    raw_part = detect_communities_louvain(G, resolution=resolution, backend=louvain_backend)
 
     clustering = finalize_clustering(
         raw_article_to_cluster=raw_part,
@@ -49,8 +440,9 @@ def run_manual(
     )
 
     out_root = prepare_output_dir(input_dir, output_dir)
+    write_manifest(out_root, manifest)
     write_clustered_files(out_root, clustering, articles_by_id, rename_with_title)
-    write_reports(out_root, clustering, articles_by_id, trials_info=None)
+    write_reports(out_root, clustering, articles_by_id, trials_info=None, near_duplicates=near_dups)
     graph_png = render_graph_png(G, clustering, out_root)
 
     summary = summarize_for_autotune(clustering)
@@ -62,6 +454,9 @@ def run_manual(
         "summary": summary,
         "articles": articles_by_id,
         "autotune_trials": None,
+        "embedding_stats": emb.stats,
+        "near_duplicates": near_dups,
+        **corpus_stats,
     }
 
 
@@ -73,16 +468,73 @@ def run_auto(
     min_cluster_sizes: List[int],
     max_workers: int,
     rename_with_title: bool,
+    knn_method: str = "exact",
+    ann_trees: Optional[int] = None,
+    louvain_backend: str = "python-louvain",
+    search_strategy: str = "grid",
+    max_trials: Optional[int] = None,
+    time_budget: Optional[float] = None,
+    embedder: str = "light",
+    cache_dir: Optional[str] = None,
+    embed_batch_size: int = 32,
+    embed_threads: Optional[int] = None,
+    embedding_storage: str = "float32",
+    embedding_memmap: Optional[str] = None,
+    tfidf_vocab: Optional[str] = None,
+    target_dim: Optional[int] = None,
+    reduction_method: str = "svd",
+    extract_workers: Optional[int] = None,
+    metadata_cache: Optional[str] = None,
+    incremental_from: Optional[str] = None,
+    recursive: bool = False,
+    include: Optional[List[str]] = None,
+    exclude: Optional[List[str]] = None,
+    deduplicate: bool = True,
+    near_duplicates: str = "off",
+    near_dup_threshold: float = DEFAULT_THRESHOLD,
 ) -> Dict[str, Any]:
 
-    pdfs = list_pdfs(input_dir)
-    articles_list = batch_extract(pdfs)
+    # without a previous run every PDF is extracted, so that can overlap the scan
+    fingerprints: Dict[str, Fingerprint] = {}
+    pdfs, aliases, prefetched = _scan(
+        input_dir,
+        recursive,
+        include,
+        exclude,
+        deduplicate,
+        extract=incremental_from is None,
+        extract_workers=extract_workers,
+        metadata_cache=metadata_cache,
+        fingerprints=fingerprints,
+    )
+    articles_list, emb, manifest, corpus_stats = _load_corpus(
+        input_dir,
+        pdfs,
+        aliases,
+        embedder,
+        cache_dir,
+        embed_batch_size,
+        embed_threads,
+        embedding_storage,
+        embedding_memmap,
+        tfidf_vocab,
+        extract_workers,
+        metadata_cache,
+        incremental_from,
+        prefetched,
+        fingerprints,
+    )
+    articles_list, emb, near_dups = _near_duplicates(
+        articles_list, emb, near_duplicates, near_dup_threshold
+    )
     articles_by_id = {a.id: a for a in articles_list}
+    if target_dim is not None:
+        emb = reduce_dimensions(emb, target_dim, method=reduction_method)
 
-    # desenvolvimento: rápido, sem torch
-    emb = embed_articles_light(articles_list)
-    # produção futura (quando quiser rodar embeddings reais):
-    # emb = embed_articles_model(articles_list)
+    # one neighbor search at max(k), shared by every trial and the final render
+    neighbors = compute_neighbor_table(
+        emb, k_max=max(k_values), method=knn_method, n_trees=ann_trees
+    )
 
     best_cr, best_cfg, trials = run_autotune(
         articles=articles_list,
@@ -91,15 +543,23 @@ def run_auto(
         resolutions=resolutions,
         min_cluster_sizes=min_cluster_sizes,
         max_workers=max_workers,
+        knn_method=knn_method,
+        ann_trees=ann_trees,
+        neighbors=neighbors,
+        louvain_backend=louvain_backend,
+        strategy=search_strategy,
+        max_trials=max_trials,
+        time_budget=time_budget,
     )
 
-    # rebuild graph for visualization using best k
-    G_best = build_knn_graph(emb, k=int(best_cfg["k"]))
+    # graph for visualization using best k, sliced from the shared table
+    G_best = graph_from_neighbor_table(neighbors, k=int(best_cfg["k"]))
     out_root = prepare_output_dir(input_dir, output_dir)
+    write_manifest(out_root, manifest)
     graph_png = render_graph_png(G_best, best_cr, out_root)
 
     write_clustered_files(out_root, best_cr, articles_by_id, rename_with_title)
-    write_reports(out_root, best_cr, articles_by_id, trials_info=trials)
+    write_reports(out_root, best_cr, articles_by_id, trials_info=trials, near_duplicates=near_dups)
 
     summary = summarize_for_autotune(best_cr)
 
@@ -111,4 +571,7 @@ def run_auto(
         "best_cfg": best_cfg,
         "articles": articles_by_id,
         "autotune_trials": trials,
+        "embedding_stats": emb.stats,
+        "near_duplicates": near_dups,
+        **corpus_stats,
     }
@@ -1,44 +1,272 @@
+"""
+Parameter sweep over (k, resolution, min_cluster_size).
+
+Trials run in a process pool, in tasks of configs sharing one k: the worker
+builds that graph once, runs Louvain once per resolution and scores every
+min_cluster_size against the same raw partition. With warm starts, the
+grid's resolutions are cut into fixed chains of WARM_CHAIN_LENGTH, each
+warm-started from its top resolution (see _split_tasks), so a config's
+score depends neither on the worker count nor on the search strategy's
+batches. The neighbor table every trial slices its
+graph from is copied once into shared memory and attached by each worker in
+the pool initializer, so a submitted task carries only its config dicts.
+Workers send back only each trial's summary and its partition as an int
+array; the parent keeps just the running best and rebuilds a single
+ClusteringResult from it, whose labels and centrality are computed lazily.
+"""
+
 import concurrent.futures
-import itertools
-from typing import Dict, List, Tuple
+import time
+from multiprocessing import shared_memory
+from typing import Any, Dict, List, Optional, Tuple
 
-from .cluster_postprocess import finalize_clustering
+import numpy as np
+
+from .cluster_postprocess import _invert_partition, defer_enrichment, score_clustering
 from .community_detector import detect_communities_louvain
 from .data import (
     ArticleRecord,
     AutoTuneTrialResult,
     ClusteringResult,
     EmbeddingResult,
+    NeighborTable,
 )
-from .graph_builder import build_knn_graph
+from .graph_builder import compute_neighbor_table, graph_from_neighbor_table
 from .scoring import summarize_for_autotune
+from .search_strategies import make_strategy
+from .shared_arrays import (
+    SharedArraySpec,
+    attach_array,
+    pack_strings,
+    share_array,
+    unpack_strings,
+)
+from .sparse_graph import CSRGraph, labels_from_partition, partition_from_labels
 
+# (config, summary, final labels) of one trial, as returned by workers
+TrialOutcome = Tuple[Dict[str, float], Dict[str, float], np.ndarray]
 
-def _evaluate_single_config(
-    config: Dict[str, float],
-    articles: List[ArticleRecord],
-    emb: EmbeddingResult,
+# per-process state of pool workers, filled once by _init_worker
+_worker_state: Dict[str, Any] = {}
+
+# resolutions per warm-started Louvain chain
+WARM_CHAIN_LENGTH = 3
+
+
+def _evaluate_k_group(
+    configs: List[Dict[str, float]],
+    neighbors: NeighborTable,
     alpha_beta_gamma=(1.0, 0.5, 0.5),
-) -> Tuple[Dict[str, float], ClusteringResult, Dict[str, float]]:
-    k = int(config["k"])
-    resolution = float(config["resolution"])
-    min_cluster = int(config["min_cluster_size"])
-
-    G = build_knn_graph(emb, k=k)
-    raw_part = detect_communities_louvain(G, resolution=resolution)
-
-    cr = finalize_clustering(
-        raw_article_to_cluster=raw_part,
-        G=G,
-        articles=articles,
-        min_cluster_size=min_cluster,
-        alpha=alpha_beta_gamma[0],
-        beta=alpha_beta_gamma[1],
-        gamma=alpha_beta_gamma[2],
+    louvain_backend: str = "python-louvain",
+    seed: Optional[int] = None,
+    warm_start: bool = True,
+    chain: Optional[List[float]] = None,
+) -> List[TrialOutcome]:
+    """
+    Evaluate configs sharing the same k. The graph is built once, Louvain
+    runs once per resolution of `chain` (descending; default: the configs'
+    resolutions), each run warm-started from the previous raw partition
+    when `warm_start`, and every min_cluster_size is scored against that
+    single raw partition. Chain resolutions without configs only seed the
+    next run. Each trial yields its summary and its final partition as an
+    int array aligned with `neighbors.article_ids`.
+    """
+    G = graph_from_neighbor_table(neighbors, k=int(configs[0]["k"]))
+    by_resolution: Dict[float, List[Dict[str, float]]] = {}
+    for cfg in configs:
+        by_resolution.setdefault(cfg["resolution"], []).append(cfg)
+
+    previous: Optional[Dict[str, int]] = None
+    out = []
+    for resolution in chain if chain is not None else sorted(by_resolution, reverse=True):
+        raw_part = detect_communities_louvain(
+            G,
+            resolution=float(resolution),
+            backend=louvain_backend,
+            seed=seed,
+            initial_partition=previous if warm_start else None,
+        )
+        previous = raw_part
+
+        for config in by_resolution.get(resolution, []):
+            cr = score_clustering(
+                raw_article_to_cluster=raw_part,
+                G=G,
+                min_cluster_size=int(config["min_cluster_size"]),
+                alpha=alpha_beta_gamma[0],
+                beta=alpha_beta_gamma[1],
+                gamma=alpha_beta_gamma[2],
+            )
+            labels = labels_from_partition(G, cr.article_to_cluster).astype(np.int32)
+            out.append((config, summarize_for_autotune(cr), labels))
+    return out
+
+
+def _split_tasks(
+    configs: List[Dict[str, float]], resolutions: List[float], warm_start: bool
+) -> List[Tuple[List[Dict[str, float]], List[float]]]:
+    """
+    (configs, chain) tasks of configs sharing one k. Without `warm_start`
+    every resolution is its own task, since nothing links them. With it,
+    the grid's `resolutions` (descending) are cut into fixed chains of
+    WARM_CHAIN_LENGTH. A task covers one chain, run from its top down to
+    the lowest resolution asked for, so a config always starts from the
+    same partitions whichever other configs are evaluated with it.
+    """
+    order = sorted(set(resolutions), reverse=True)
+    chain_of = {r: i // WARM_CHAIN_LENGTH for i, r in enumerate(order)}
+    groups: Dict[Tuple[float, float], List[Dict[str, float]]] = {}
+    for cfg in configs:
+        key = chain_of[cfg["resolution"]] if warm_start else cfg["resolution"]
+        groups.setdefault((cfg["k"], key), []).append(cfg)
+
+    tasks = []
+    for (_, key), cfgs in groups.items():
+        if not warm_start:
+            tasks.append((cfgs, [key]))
+            continue
+        chain = order[key * WARM_CHAIN_LENGTH : (key + 1) * WARM_CHAIN_LENGTH]
+        lowest = min(cfg["resolution"] for cfg in cfgs)
+        tasks.append((cfgs, chain[: chain.index(lowest) + 1]))
+    return tasks
+
+
+def _share_inputs(
+    neighbors: NeighborTable,
+) -> Tuple[List[shared_memory.SharedMemory], Dict[str, SharedArraySpec]]:
+    arrays = {
+        "nbr_indices": neighbors.indices,
+        "nbr_sims": neighbors.similarities,
+    }
+    arrays["nbr_ids_blob"], arrays["nbr_ids_off"] = pack_strings(neighbors.article_ids)
+
+    segments: List[shared_memory.SharedMemory] = []
+    specs: Dict[str, SharedArraySpec] = {}
+    try:
+        for name, arr in arrays.items():
+            shm, specs[name] = share_array(arr)
+            segments.append(shm)
+    except BaseException:
+        _release(segments)
+        raise
+    return segments, specs
+
+
+def _release(segments: List[shared_memory.SharedMemory]) -> None:
+    for shm in segments:
+        shm.close()
+        shm.unlink()
+
+
+def _attach_table(
+    specs: Dict[str, SharedArraySpec], drop_non_positive: bool
+) -> Tuple[List[shared_memory.SharedMemory], NeighborTable]:
+    views = {}
+    segments = []
+    for name, spec in specs.items():
+        shm, views[name] = attach_array(spec)
+        segments.append(shm)
+    table = NeighborTable(
+        indices=views["nbr_indices"],
+        similarities=views["nbr_sims"],
+        article_ids=unpack_strings(views["nbr_ids_blob"], views["nbr_ids_off"]),
+        drop_non_positive=drop_non_positive,
     )
+    return segments, table
+
 
-    summary = summarize_for_autotune(cr)
-    return (config, cr, summary)
+def _init_worker(
+    specs: Dict[str, SharedArraySpec], options: Dict[str, Any], drop_non_positive: bool
+) -> None:
+    # segments are kept to keep the mappings alive
+    _worker_state["segments"], _worker_state["neighbors"] = _attach_table(specs, drop_non_positive)
+    _worker_state["options"] = options
+
+
+def _worker_table(specs: Optional[Dict[str, SharedArraySpec]]) -> NeighborTable:
+    """
+    The full neighbor table attached by the initializer, or the subsample
+    table of the current successive-halving rung (attached on first use).
+    """
+    if specs is None:
+        return _worker_state["neighbors"]
+    name = specs["nbr_indices"].name
+    cached = _worker_state.get("sample")
+    if cached is None or cached[0] != name:
+        if cached is not None:
+            _, old_segments, _ = _worker_state.pop("sample")
+            del cached
+            for shm in old_segments:
+                shm.close()
+        segments, table = _attach_table(specs, _worker_state["neighbors"].drop_non_positive)
+        _worker_state["sample"] = (name, segments, table)
+    return _worker_state["sample"][2]
+
+
+def _evaluate_k_group_in_worker(
+    configs: List[Dict[str, float]],
+    chain: List[float],
+    table_specs: Optional[Dict[str, SharedArraySpec]] = None,
+) -> List[TrialOutcome]:
+    return _evaluate_k_group(
+        configs,
+        _worker_table(table_specs),
+        chain=chain,
+        **_worker_state["options"],
+    )
+
+
+def _sample_table(
+    emb: EmbeddingResult,
+    fraction: float,
+    k_max: int,
+    seed: Optional[int],
+    knn_method: str,
+    ann_trees: Optional[int],
+) -> NeighborTable:
+    """Neighbor table of a seeded random subsample of the articles."""
+    n = len(emb.article_ids)
+    size = min(n, max(k_max + 1, int(round(fraction * n))))
+    rows = np.sort(np.random.default_rng(seed).permutation(n)[:size])
+    sub = EmbeddingResult(
+        vectors=emb.vectors[rows],
+        article_ids=[emb.article_ids[i] for i in rows],
+        scales=None if emb.scales is None else emb.scales[rows],
+    )
+    return compute_neighbor_table(sub, k_max=k_max, method=knn_method, n_trees=ann_trees)
+
+
+def _budget_left(n_done: int, max_trials: Optional[int], deadline: Optional[float]) -> bool:
+    if max_trials is not None and n_done >= max_trials:
+        return False
+    return deadline is None or time.monotonic() < deadline
+
+
+def _trial_result(config: Dict[str, float], summary: Dict[str, float]) -> AutoTuneTrialResult:
+    return AutoTuneTrialResult(
+        params=config,
+        n_clusters=summary["n_clusters"],
+        max_cluster_fraction=summary["max_cluster_fraction"],
+        modularity=summary["modularity"],
+        balance_score=summary["balance_score"],
+        small_cluster_fraction=summary["small_cluster_fraction"],
+        score_final=summary["score_final"],
+    )
+
+
+def _result_from_labels(
+    G: CSRGraph, labels: np.ndarray, summary: Dict[str, float]
+) -> ClusteringResult:
+    """Rebuild the (unenriched) ClusteringResult of a trial from its labels."""
+    article_to_cluster = partition_from_labels(G, labels.astype(np.int64))
+    return ClusteringResult(
+        article_to_cluster=article_to_cluster,
+        clusters=_invert_partition(article_to_cluster),
+        modularity=summary["modularity"],
+        balance_score=summary["balance_score"],
+        small_cluster_fraction=summary["small_cluster_fraction"],
+        score_final=summary["score_final"],
+    )
 
 
 def run_autotune(
@@ -48,39 +276,111 @@ def run_autotune(
     resolutions: List[float],
     min_cluster_sizes: List[int],
     max_workers: int = 4,
+    knn_method: str = "exact",
+    ann_trees: Optional[int] = None,
+    neighbors: Optional[NeighborTable] = None,
+    louvain_backend: str = "python-louvain",
+    warm_start: bool = True,
+    seed: Optional[int] = 0,
+    strategy: str = "grid",
+    max_trials: Optional[int] = None,
+    time_budget: Optional[float] = None,
 ) -> Tuple[ClusteringResult, Dict[str, float], List[AutoTuneTrialResult]]:
 
-    configs = []
-    for k, r, m in itertools.product(k_values, resolutions, min_cluster_sizes):
-        configs.append(
-            {
-                "k": k,
-                "resolution": r,
-                "min_cluster_size": m,
-            }
-        )
-
-    results = []
-    with concurrent.futures.ProcessPoolExecutor(max_workers=max_workers) as pool:
-        futs = [pool.submit(_evaluate_single_config, cfg, articles, emb) for cfg in configs]
-        for fut in concurrent.futures.as_completed(futs):
-            results.append(fut.result())
+    if not (k_values and resolutions and min_cluster_sizes):
+        raise ValueError("no autotune configurations")
+    space = {"k": k_values, "resolution": resolutions, "min_cluster_size": min_cluster_sizes}
+    search = make_strategy(
+        strategy,
+        space,
+        n_items=len(emb.article_ids),
+        seed=seed,
+        batch_size=max_workers,
+        max_trials=max_trials,
+    )
+    # grid order breaks score ties, so the result does not depend on scheduling
+    position = {tuple(cfg.values()): i for i, cfg in enumerate(search.configs)}
+    k_max = int(max(k_values))
 
-    best = max(results, key=lambda r: r[2]["score_final"])
-    best_config, best_cr, best_summary = best
+    if neighbors is None:
+        neighbors = compute_neighbor_table(emb, k_max=k_max, method=knn_method, n_trees=ann_trees)
 
+    options = {"louvain_backend": louvain_backend, "seed": seed, "warm_start": warm_start}
+    deadline = None if time_budget is None else time.monotonic() + time_budget
     trials: List[AutoTuneTrialResult] = []
-    for cfg, _cr, summary in results:
-        trials.append(
-            AutoTuneTrialResult(
-                params=cfg,
-                n_clusters=summary["n_clusters"],
-                max_cluster_fraction=summary["max_cluster_fraction"],
-                modularity=summary["modularity"],
-                balance_score=summary["balance_score"],
-                small_cluster_fraction=summary["small_cluster_fraction"],
-                score_final=summary["score_final"],
-            )
-        )
+    best: Optional[Tuple[float, int, Dict[str, float], Dict[str, float], np.ndarray]] = None
+    n_done = 0
+
+    def record(cfg: Dict[str, float], fraction: float, summary: Dict[str, float], labels) -> None:
+        nonlocal best
+        search.tell(cfg, fraction, summary["score_final"])
+        if fraction < 1.0:
+            return  # subsample scores only steer the search
+        trials.append(_trial_result(cfg, summary))
+        pos = position[tuple(cfg.values())]
+        if best is None or (summary["score_final"], -pos) > (best[0], -best[1]):
+            best = (summary["score_final"], pos, cfg, summary, labels)
+
+    segments, specs = _share_inputs(neighbors)
+    try:
+        with concurrent.futures.ProcessPoolExecutor(
+            max_workers=max_workers,
+            initializer=_init_worker,
+            initargs=(specs, options, neighbors.drop_non_positive),
+        ) as pool:
+            while _budget_left(n_done, max_trials, deadline):
+                batch = search.ask(None if max_trials is None else max_trials - n_done)
+                if not batch:
+                    break
+
+                by_fraction: Dict[float, List[Dict[str, float]]] = {}
+                for cfg, fraction in batch:
+                    by_fraction.setdefault(fraction, []).append(cfg)
+                batch_segments: List[shared_memory.SharedMemory] = []
+                futs = {}
+                try:
+                    for fraction, cfgs in by_fraction.items():
+                        table_specs = None
+                        if fraction < 1.0:
+                            sample = _sample_table(
+                                emb, fraction, k_max, seed, knn_method, ann_trees
+                            )
+                            sample_segments, table_specs = _share_inputs(sample)
+                            batch_segments.extend(sample_segments)
+                        for group, chain in _split_tasks(cfgs, resolutions, warm_start):
+                            fut = pool.submit(
+                                _evaluate_k_group_in_worker, group, chain, table_specs
+                            )
+                            futs[fut] = fraction
+
+                    for fut in concurrent.futures.as_completed(futs):
+                        if fut.cancelled():
+                            continue
+                        for cfg, summary, labels in fut.result():
+                            n_done += 1
+                            record(cfg, futs[fut], summary, labels)
+                        if not _budget_left(0, None, deadline):
+                            for other in futs:
+                                other.cancel()
+                finally:
+                    for other in futs:
+                        other.cancel()
+                    concurrent.futures.wait(futs)
+                    _release(batch_segments)
+    finally:
+        _release(segments)
+
+    if best is None:
+        # budget ran out before any full-data trial: evaluate the best guess
+        ((group, chain),) = _split_tasks([search.best_guess()], resolutions, warm_start)
+        for cfg, summary, labels in _evaluate_k_group(group, neighbors, chain=chain, **options):
+            record(cfg, 1.0, summary, labels)
+
+    trials.sort(key=lambda t: position[tuple(t.params.values())])
+    _, _, best_config, best_summary, best_labels = best
+    best_graph = graph_from_neighbor_table(neighbors, k=int(best_config["k"]))
+    best_cr = defer_enrichment(
+        _result_from_labels(best_graph, best_labels, best_summary), best_graph, articles
+    )
 
     return best_cr, best_config, trials
@@ -2,18 +2,19 @@
 Post-process partition:
 - merge tiny clusters
 - compute metrics (modularity, balance, etc.)
-- label clusters
-- compute centrality
 - score final solution
+- label clusters and compute centrality (deferred until first read)
 """
 
 from collections import Counter, defaultdict
+from functools import partial
 from typing import Dict, List
 
-import networkx as nx
-from community import community_louvain
+import numpy as np
 
 from .data import ArticleRecord, ClusteringResult
+from .sparse_graph import CSRGraph, labels_from_partition, partition_from_labels
+from .sparse_graph import modularity as graph_modularity
 
 
 def _invert_partition(article_to_cluster: Dict[str, int]) -> Dict[int, List[str]]:
@@ -24,41 +25,36 @@ def _invert_partition(article_to_cluster: Dict[str, int]) -> Dict[int, List[str]
 
 
 def _merge_tiny_clusters(
-    article_to_cluster: Dict[str, int], G: nx.Graph, min_size: int
+    article_to_cluster: Dict[str, int], G: CSRGraph, min_size: int
 ) -> Dict[str, int]:
-    clusters = _invert_partition(article_to_cluster)
-    tiny = {_cid for _cid, members in clusters.items() if len(members) < min_size}
-    if not tiny:
+    """
+    Move every member of a cluster smaller than `min_size` to the cluster of
+    its heaviest neighbor outside its own (original) cluster.
+    """
+    labels = labels_from_partition(G, article_to_cluster)
+    _, comm, sizes = np.unique(labels, return_inverse=True, return_counts=True)
+    tiny_node = sizes[comm] < min_size
+    if not tiny_node.any():
         return article_to_cluster
-    new_assign = dict(article_to_cluster)
-    for cid in tiny:
-        for art in clusters[cid]:
-            best_cid = None
-            best_w = -1.0
-            for nbr in G.neighbors(art):
-                nbr_cid = article_to_cluster[nbr]
-                if nbr_cid == cid:
-                    continue
-                w = G[art][nbr].get("weight", 0.0)
-                if w > best_w:
-                    best_w = w
-                    best_cid = nbr_cid
-            if best_cid is not None:
-                new_assign[art] = best_cid
-    return new_assign
-
-
-def _compute_centrality(G: nx.Graph, clusters: Dict[int, List[str]]) -> Dict[str, float]:
-    centrality: Dict[str, float] = {}
-    for _cid, members in clusters.items():
-        member_set = set(members)
-        for m in members:
-            score = 0.0
-            for nbr in G[m]:
-                if nbr in member_set:
-                    score += G[m][nbr].get("weight", 0.0)
-            centrality[m] = score
-    return centrality
+
+    src, dst, w = G.rows, G.indices, G.weights
+    cand = tiny_node[src] & (labels[dst] != labels[src]) & (w > -1.0)
+    src, dst, w = src[cand], dst[cand], w[cand]
+    order = np.lexsort((-w, src))  # heaviest edge first within each node
+    src, dst = src[order], dst[order]
+    first = np.ones(len(src), dtype=bool)
+    first[1:] = src[1:] != src[:-1]
+
+    new_labels = labels.copy()
+    new_labels[src[first]] = labels[dst[first]]
+    return partition_from_labels(G, new_labels)
+
+
+def _compute_centrality(G: CSRGraph, labels: np.ndarray) -> Dict[str, float]:
+    """Weighted degree of each article restricted to its own cluster."""
+    same = labels[G.rows] == labels[G.indices]
+    score = np.bincount(G.rows[same], weights=G.weights[same], minlength=G.n_nodes)
+    return dict(zip(G.node_ids, score.tolist(), strict=True))
 
 
 def _label_cluster(cid: int, members: List[str], by_id: Dict[str, ArticleRecord]) -> str:
@@ -102,41 +98,71 @@ def _small_frac(clusters: Dict[int, List[str]], min_size: int) -> float:
     return tiny_count / max(1, len(clusters))
 
 
-def finalize_clustering(
+def score_clustering(
     raw_article_to_cluster: Dict[str, int],
-    G: nx.Graph,
-    articles: List[ArticleRecord],
+    G: CSRGraph,
     min_cluster_size: int,
     alpha: float,
     beta: float,
     gamma: float,
 ) -> ClusteringResult:
-
+    """
+    Cheap phase: merge tiny clusters and compute the metrics autotune ranks
+    on. Labels and centrality are left empty (see defer_enrichment).
+    """
     reassigned = _merge_tiny_clusters(raw_article_to_cluster, G, min_cluster_size)
     clusters = _invert_partition(reassigned)
 
-    modularity = community_louvain.modularity(reassigned, G, weight="weight")
+    # an edgeless graph (e.g. TF-IDF documents sharing no term) leaves every
+    # article a singleton; its modularity is undefined, reported as 0
+    if G.total_weight() == 0.0:
+        modularity = 0.0
+    else:
+        modularity = graph_modularity(G, labels_from_partition(G, reassigned))
 
     total_n = len(reassigned)
     balance_score = _balance_score(clusters, total_n)
     small_fraction = _small_frac(clusters, min_cluster_size)
 
-    by_id = {a.id: a for a in articles}
-    cluster_labels = {
-        _cid: _label_cluster(_cid, members, by_id) for _cid, members in clusters.items()
-    }
-
-    centrality = _compute_centrality(G, clusters)
-
     score_final = alpha * modularity + beta * balance_score - gamma * small_fraction
 
     return ClusteringResult(
         article_to_cluster=reassigned,
         clusters=clusters,
-        cluster_labels=cluster_labels,
         modularity=modularity,
         balance_score=balance_score,
         small_cluster_fraction=small_fraction,
         score_final=score_final,
-        centrality=centrality,
     )
+
+
+def _enrich(cr: ClusteringResult, G: CSRGraph, articles: List[ArticleRecord]) -> None:
+    by_id = {a.id: a for a in articles}
+    cr.cluster_labels = {
+        _cid: _label_cluster(_cid, members, by_id) for _cid, members in cr.clusters.items()
+    }
+    cr.centrality = _compute_centrality(G, labels_from_partition(G, cr.article_to_cluster))
+
+
+def defer_enrichment(
+    cr: ClusteringResult, G: CSRGraph, articles: List[ArticleRecord]
+) -> ClusteringResult:
+    """
+    Attach the expensive phase (labels, centrality) to `cr`; it runs once,
+    the first time either field is read.
+    """
+    cr.enricher = partial(_enrich, G=G, articles=articles)
+    return cr
+
+
+def finalize_clustering(
+    raw_article_to_cluster: Dict[str, int],
+    G: CSRGraph,
+    articles: List[ArticleRecord],
+    min_cluster_size: int,
+    alpha: float,
+    beta: float,
+    gamma: float,
+) -> ClusteringResult:
+    cr = score_clustering(raw_article_to_cluster, G, min_cluster_size, alpha, beta, gamma)
+    return defer_enrichment(cr, G, articles)
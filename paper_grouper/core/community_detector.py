@@ -1,20 +1,54 @@
 """
 Community detection using Louvain.
+
+Backends:
+- "python-louvain": reference implementation (pure Python over networkx)
+- "native": vectorized NumPy/scipy implementation in `louvain_native`
 """
 
-from typing import Dict
+from typing import Dict, Optional
 
-import networkx as nx
 from community import community_louvain  # python-louvain
 
+from .louvain_native import louvain_labels
+from .sparse_graph import CSRGraph, labels_from_partition, partition_from_labels
+
+LOUVAIN_BACKENDS = ("python-louvain", "native")
+
 
-def detect_communities_louvain(G: nx.Graph, resolution: float) -> Dict[str, int]:
+def detect_communities_louvain(
+    G: CSRGraph,
+    resolution: float,
+    backend: str = "python-louvain",
+    seed: Optional[int] = None,
+    initial_partition: Optional[Dict[str, int]] = None,
+) -> Dict[str, int]:
     """
     Returns mapping: article_id -> cluster_id
+
+    `initial_partition` warm-starts the first level from an existing
+    partition (e.g. the result at a neighboring resolution) instead of
+    singletons. python-louvain rejects a starting partition on graphs with
+    non-positive edge weights (dense k-NN graphs keep those), so there it
+    cold-starts instead.
     """
+    if backend == "native":
+        initial_labels = (
+            None if initial_partition is None else labels_from_partition(G, initial_partition)
+        )
+        labels = louvain_labels(G, resolution=resolution, seed=seed, initial_labels=initial_labels)
+        return partition_from_labels(G, labels)
+    if backend != "python-louvain":
+        raise ValueError(f"unknown louvain backend {backend!r}; expected one of {LOUVAIN_BACKENDS}")
+
+    if initial_partition is not None and (G.weights <= 0).any():
+        initial_partition = None
+    # python-louvain walks networkx dicts, so it needs the converted graph
     partition = community_louvain.best_partition(
-        G,
+        G.to_networkx(),
+        partition=initial_partition,
         resolution=resolution,
         weight="weight",
+        random_state=seed,
     )
     return partition
@@ -1,5 +1,5 @@
-from dataclasses import dataclass
-from typing import Dict, List, Optional
+from dataclasses import dataclass, field
+from typing import Callable, Dict, List, Optional
 
 import numpy as np
 
@@ -15,6 +15,8 @@ class ArticleRecord:
     keywords: str
     year: Optional[int]
     text_repr: str  # concatenation of title+abstract+keywords (cleaned)
+    first_page_text: str = ""  # raw first-page text, when the extractor provides it
+    aliases: List[str] = field(default_factory=list)  # paths of duplicates folded into this one
 
 
 @dataclass
@@ -23,6 +25,40 @@ class EmbeddingResult:
 
     vectors: np.ndarray  # shape (N, D)
     article_ids: List[str]  # len N, aligns with vectors rows
+    scales: Optional[np.ndarray] = None  # int8 storage only: per-row scale (see quantization)
+    stats: Dict[str, float] = field(default_factory=dict)  # e.g. throughput, cache hits
+
+
+@dataclass
+class NeighborTable:
+    """Top-k_max neighbors of every article, computed once and sliced per k."""
+
+    indices: np.ndarray  # shape (N, k_max), row positions into article_ids
+    similarities: np.ndarray  # shape (N, k_max), rows sorted descending
+    article_ids: List[str]  # len N
+    # sparse input: rows sharing no term have similarity 0, which is no affinity
+    drop_non_positive: bool = False
+
+
+class _Deferred:
+    """
+    Dataclass field filled on first access by the owner's `enricher`
+    (see cluster_postprocess.defer_enrichment). Defaults to None.
+    """
+
+    def __set_name__(self, owner, name):
+        self._attr = f"_{name}"
+
+    def __get__(self, obj, objtype=None):
+        if obj is None:
+            return None  # dataclass default
+        if getattr(obj, self._attr, None) is None and obj.enricher is not None:
+            enricher, obj.enricher = obj.enricher, None
+            enricher(obj)
+        return getattr(obj, self._attr, None)
+
+    def __set__(self, obj, value):
+        setattr(obj, self._attr, value)
 
 
 @dataclass
@@ -31,12 +67,16 @@ class ClusteringResult:
 
     article_to_cluster: Dict[str, int]  # article_id -> cluster_id
     clusters: Dict[int, List[str]]  # cluster_id -> [article_id,...]
-    cluster_labels: Dict[int, str]  # cluster_id -> human-readable label
     modularity: float  # partition modularity score
     balance_score: float  # 1 - (max_cluster_size / total)
     small_cluster_fraction: float  # frac of clusters under threshold
     score_final: float  # combined score we optimize
-    centrality: Dict[str, float]  # article_id -> importance within cluster
+    # enrichment, computed lazily on first access when an enricher is set
+    cluster_labels: Dict[int, str] = _Deferred()  # cluster_id -> human-readable label
+    centrality: Dict[str, float] = _Deferred()  # article_id -> importance within cluster
+    enricher: Optional[Callable[["ClusteringResult"], None]] = field(
+        default=None, repr=False, compare=False
+    )
 
 
 @dataclass
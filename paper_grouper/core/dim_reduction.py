@@ -0,0 +1,127 @@
+"""
+Optional dimensionality reduction between embedding and graph building.
+
+The exact neighbor search costs O(N^2 * D), so projecting e.g. 384-d
+MiniLM vectors down to 64-128 dims speeds it up roughly in proportion. The
+projection is fit on a random sample of rows and applied `batch_size` rows
+at a time, so it also works on memmap-backed and quantized embeddings. The
+output keeps the input's storage: int8/float16 input is re-quantized, and
+memmap input is reduced into a memmap file next to the input's.
+
+- "svd": randomized TruncatedSVD, uncentered, so it projects around the
+  same origin cosine similarity is measured from (LSA for sparse TF-IDF)
+- "pca": randomized PCA (sklearn, svd_solver="randomized"). Centering
+  moves that origin, so cosine neighborhoods can change; sparse input
+  falls back to "svd", which needs no densifying
+- "random_projection": sparse random projection (data-independent, cheapest)
+
+Use `benchmarks/bench_dim_reduction.py` to see the neighbor-recall cost of
+a target dimension.
+"""
+
+from pathlib import Path
+from typing import Optional, Union
+
+import numpy as np
+import scipy.sparse as sp
+from sklearn.decomposition import PCA, TruncatedSVD
+from sklearn.random_projection import SparseRandomProjection
+
+from .data import EmbeddingResult
+from .quantization import quantize_embeddings, storage_mode
+
+REDUCTION_METHODS = ("svd", "pca", "random_projection")
+
+DEFAULT_FIT_SAMPLE = 10_000
+DEFAULT_BATCH_SIZE = 8192
+
+
+def _float_rows(emb: EmbeddingResult, sel):
+    rows = emb.vectors[sel]
+    if sp.issparse(rows):
+        return sp.csr_matrix(rows, dtype=np.float32)
+    rows = np.asarray(rows, dtype=np.float32)
+    if emb.scales is not None:
+        rows = rows * emb.scales[sel, None]
+    return rows
+
+
+def fit_reducer(
+    emb: EmbeddingResult,
+    target_dim: int,
+    method: str = "svd",
+    sample_size: int = DEFAULT_FIT_SAMPLE,
+    seed: Optional[int] = 0,
+):
+    """Fitted sklearn transformer projecting emb's rows to `target_dim`."""
+    n = len(emb.article_ids)
+    rows = np.sort(np.random.default_rng(seed).permutation(n)[: min(sample_size, n)])
+    sample = _float_rows(emb, rows)
+    if method == "svd" or (method == "pca" and sp.issparse(sample)):
+        reducer = TruncatedSVD(n_components=target_dim, algorithm="randomized", random_state=seed)
+    elif method == "pca":
+        reducer = PCA(n_components=target_dim, svd_solver="randomized", random_state=seed)
+    elif method == "random_projection":
+        reducer = SparseRandomProjection(n_components=target_dim, random_state=seed)
+    else:
+        raise ValueError(
+            f"unknown reduction method {method!r}; expected one of {REDUCTION_METHODS}"
+        )
+    return reducer.fit(sample)
+
+
+def _reduced_path(vectors: np.memmap, target_dim: int) -> Path:
+    src = Path(vectors.filename)
+    return src.with_name(f"{src.stem}.{target_dim}d{src.suffix}")
+
+
+def reduce_dimensions(
+    emb: EmbeddingResult,
+    target_dim: int,
+    method: str = "svd",
+    sample_size: int = DEFAULT_FIT_SAMPLE,
+    batch_size: int = DEFAULT_BATCH_SIZE,
+    seed: Optional[int] = 0,
+    memmap_path: Optional[Union[str, Path]] = None,
+) -> EmbeddingResult:
+    """
+    Embeddings projected to `target_dim`, float32 or in the input's compact
+    storage (int8 / float16). With `memmap_path`, or for memmap input, the
+    vectors are written to a memmap there (default: the input's file name
+    plus ".<target_dim>d"). Returns `emb` unchanged when it already has at
+    most `target_dim` dims, or when there are too few rows to fit
+    `target_dim` SVD/PCA components.
+    """
+    n, dim = emb.vectors.shape
+    if target_dim >= dim or (method != "random_projection" and target_dim > min(n, sample_size)):
+        return emb
+    reducer = fit_reducer(emb, target_dim, method=method, sample_size=sample_size, seed=seed)
+
+    storage = storage_mode(emb)
+    storage = storage if storage in ("int8", "float16") else "float32"
+    dtype = np.dtype(np.int8 if storage == "int8" else storage)
+    if memmap_path is None and isinstance(emb.vectors, np.memmap):
+        memmap_path = _reduced_path(emb.vectors, target_dim)
+    if memmap_path is not None and n:
+        Path(memmap_path).parent.mkdir(parents=True, exist_ok=True)
+        out = np.memmap(memmap_path, dtype=dtype, mode="w+", shape=(n, target_dim))
+    else:
+        out = np.empty((n, target_dim), dtype=dtype)
+    scales = np.empty(n, dtype=np.float32) if storage == "int8" else None
+
+    for start in range(0, n, batch_size):
+        stop = min(start + batch_size, n)
+        part = reducer.transform(_float_rows(emb, slice(start, stop)))
+        part = part.toarray() if sp.issparse(part) else part
+        # int8 scales are per row, so quantizing batch by batch is exact
+        q = quantize_embeddings(EmbeddingResult(vectors=part, article_ids=[]), storage)
+        out[start:stop] = q.vectors
+        if scales is not None:
+            scales[start:stop] = q.scales
+
+    if isinstance(out, np.memmap):
+        out.flush()
+        out = np.memmap(memmap_path, dtype=dtype, mode="r", shape=(n, target_dim))
+    return EmbeddingResult(
+        vectors=out, article_ids=list(emb.article_ids), scales=scales, stats=dict(emb.stats)
+    )
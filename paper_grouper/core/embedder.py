@@ -2,7 +2,7 @@
 Embedding interface.
 
 Durante desenvolvimento da UI, carregar sentence-transformers + torch
-pode ficar pesado e travar a janela. Então oferecemos dois modos:
+pode ficar pesado e travar a janela. Então oferecemos três modos:
 
 1. embed_articles_light(...)  -> rápido, não usa torch
    Gera vetores "fake" porém consistentes a partir do texto
@@ -11,13 +11,25 @@ pode ficar pesado e travar a janela. Então oferecemos dois modos:
 2. embed_articles_model(...)  -> usa sentence-transformers
    (usa torch, pesado)
 
-O controller pode chamar um ou outro.
+3. embed_articles_tfidf(...)  -> TF-IDF esparso (scipy CSR), sem torch
+   Barato e já "meio semântico"; bom para corpora muito grandes. O
+   vocabulário/IDF pode ser salvo e reaproveitado (io/tfidf_store.py).
+
+O controller pode chamar um deles, ou escolher pelo nome via
+embed_articles(..., embedder="light" | "model" | "tfidf"). EMBEDDER_SPECS
+dá a identidade (nome/versão, dimensão) dos modos de dimensão fixa, usada
+como chave do cache de embeddings em disco.
 """
 
 import hashlib
-from typing import List
+import threading
+import time
+from contextlib import contextmanager, suppress
+from typing import Dict, Iterator, List, Optional, Tuple
 
 import numpy as np
+import scipy.sparse as sp
+from sklearn.feature_extraction.text import TfidfVectorizer
 
 from .data import ArticleRecord, EmbeddingResult
 
@@ -43,51 +55,294 @@ def _text_to_vec_hash(text: str, dim: int = 64) -> np.ndarray:
     return vec
 
 
+def _token_bucket(token: str, dim: int) -> int:
+    return int.from_bytes(hashlib.md5(token.encode("utf-8")).digest(), "big") % dim
+
+
+def hash_embed_sparse(texts: List[str], dim: int = 64) -> sp.csr_matrix:
+    """
+    Versão em lote de _text_to_vec_hash: mesma semântica (md5 do token mod
+    dim, contagem, normalização L2) e resultado bit a bit idêntico, mas cada
+    token distinto é hasheado uma única vez no corpus inteiro, a matriz de
+    contagens é montada direto em CSR e todas as linhas são normalizadas de
+    uma vez. Linhas de textos vazios ficam zeradas.
+    """
+    vocab: Dict[str, int] = {}
+    token_ids: List[int] = []
+    indptr = np.zeros(len(texts) + 1, dtype=np.int64)
+    for i, text in enumerate(texts):
+        tokens = text.lower().split()
+        token_ids.extend(vocab.setdefault(t, len(vocab)) for t in tokens)
+        indptr[i + 1] = len(token_ids)
+
+    buckets = np.fromiter((_token_bucket(t, dim) for t in vocab), dtype=np.int64, count=len(vocab))
+    indices = buckets[np.asarray(token_ids, dtype=np.int64)]
+    counts = sp.csr_matrix(
+        (np.ones(len(indices)), indices, indptr), shape=(len(texts), dim), dtype=float
+    )
+    counts.sum_duplicates()
+
+    # contagens inteiras: a soma dos quadrados é exata, igual à de np.linalg.norm
+    rows = np.repeat(np.arange(len(texts)), np.diff(counts.indptr))
+    norms = np.sqrt(np.bincount(rows, weights=counts.data**2, minlength=len(texts)))
+    counts.data /= norms[rows]
+    return counts
+
+
 def embed_articles_light(articles: List[ArticleRecord], dim: int = 64) -> EmbeddingResult:
     """
     Modo leve (sem torch). Útil para desenvolvimento rápido.
+    Vetores float32, como os do modelo e os do cache de embeddings.
     """
-    vectors = []
-    ids = []
-    for a in articles:
-        v = _text_to_vec_hash(a.text_repr, dim=dim)
-        vectors.append(v)
-        ids.append(a.id)
-    vectors = np.vstack(vectors)
+    vectors = hash_embed_sparse([a.text_repr for a in articles], dim=dim).toarray()
+    vectors = vectors.astype(np.float32)
     return EmbeddingResult(
         vectors=vectors,
-        article_ids=ids,
+        article_ids=[a.id for a in articles],
     )
 
 
 # --------- PESADO / REAL (desativado por padrão no controller agora) ----------
 
+MODEL_NAME = "all-MiniLM-L6-v2"
+
 _model_cache = None
+_model_lock = threading.Lock()  # segurado durante o carregamento
+_warmup_lock = threading.Lock()
+_model_ready = threading.Event()
+_model_error: Optional[BaseException] = None
+_warmup_thread: Optional[threading.Thread] = None
+_model_dir: Optional[str] = None  # definido pelo warm-up
+
+
+def _load_model(model_dir: Optional[str] = None):
+    from sentence_transformers import SentenceTransformer
+
+    if model_dir is None:
+        # modelo pequeno mas ainda usa torch
+        return SentenceTransformer(MODEL_NAME)
+    # diretório local: nada é baixado da internet
+    return SentenceTransformer(model_dir, local_files_only=True)
+
+
+def _load_cached(model_dir: Optional[str]):
+    """
+    Carrega o modelo uma vez só. Se um carregamento já falhou, relança esse
+    erro em vez de tentar de novo.
+    """
+    global _model_cache, _model_error
+    with _model_lock:
+        if _model_cache is None:
+            if _model_error is not None:
+                raise RuntimeError("falha ao carregar o modelo de embeddings") from _model_error
+            try:
+                _model_cache = _load_model(model_dir)
+            except BaseException as exc:
+                _model_error = exc
+                raise
+            finally:
+                _model_ready.set()
+    return _model_cache
 
 
 def _get_model():
     """
     Carrega sentence-transformers (usa torch). Só chamamos isso
-    em modo 'real'.
+    em modo 'real'. Se houve warm-up, espera por ele e usa o mesmo
+    `model_dir`; se ele falhou, o erro aparece aqui (nada de cair
+    silenciosamente num download do MODEL_NAME).
     """
-    global _model_cache
-    if _model_cache is None:
-        from sentence_transformers import SentenceTransformer
+    if _warmup_thread is not None:
+        wait_for_model()
+    return _load_cached(_model_dir)
+
+
+def warm_up_model(model_dir: Optional[str] = None) -> threading.Thread:
+    """
+    Começa a carregar o modelo numa thread em segundo plano (ex.: ao abrir
+    a janela), para o carregamento correr junto com a leitura dos PDFs.
+    Chamadas repetidas devolvem a mesma thread. As execuções seguintes
+    usam o modelo de `model_dir`.
+    """
+    global _warmup_thread, _model_dir
+
+    def _run():
+        # o erro fica em _model_error; wait_for_model relança
+        with suppress(BaseException):
+            _load_cached(model_dir)
+
+    with _warmup_lock:
+        if _warmup_thread is None:
+            _model_dir = model_dir
+            _warmup_thread = threading.Thread(target=_run, name="model-warmup", daemon=True)
+            _warmup_thread.start()
+    return _warmup_thread
 
-        # modelo pequeno mas ainda usa torch
-        _model_cache = SentenceTransformer("all-MiniLM-L6-v2")
-    return _model_cache
 
+def model_ready() -> bool:
+    """True quando o modelo terminou de carregar (ou falhou ao carregar)."""
+    return _model_ready.is_set()
 
-def embed_articles_model(articles: List[ArticleRecord]) -> EmbeddingResult:
+
+def wait_for_model(timeout: Optional[float] = None) -> bool:
+    """
+    Espera o warm-up terminar. Devolve False se o tempo esgotar e relança
+    o erro se o carregamento falhou.
+    """
+    if not _model_ready.wait(timeout):
+        return False
+    if _model_error is not None:
+        raise RuntimeError("falha ao carregar o modelo de embeddings") from _model_error
+    return True
+
+
+@contextmanager
+def _torch_threads(num_threads: Optional[int]):
+    """Limita as threads intra-op do torch durante o bloco (None = não mexe)."""
+    if num_threads is None:
+        yield
+        return
+    import torch
+
+    previous = torch.get_num_threads()
+    torch.set_num_threads(num_threads)
+    try:
+        yield
+    finally:
+        torch.set_num_threads(previous)
+
+
+def iter_model_embeddings(
+    texts: List[str],
+    batch_size: int = 32,
+    num_threads: Optional[int] = None,
+    model=None,
+) -> Iterator[Tuple[np.ndarray, np.ndarray]]:
+    """
+    Gera (posições, vetores) lote a lote. Os textos são ordenados pelo
+    tamanho (em tokens de espaço, uma boa aproximação dos tokens do modelo)
+    e fatiados em lotes de `batch_size`, então cada lote tem textos de
+    tamanho parecido e quase não há padding. Os lotes mais longos vêm
+    primeiro, para um estouro de memória aparecer logo. `posições` indica
+    onde cada vetor entra na ordem original.
+    """
+    model = _get_model() if model is None else model
+    lengths = np.fromiter((len(t.split()) for t in texts), dtype=np.int64, count=len(texts))
+    order = np.argsort(-lengths, kind="stable")
+    with _torch_threads(num_threads):
+        for start in range(0, len(texts), batch_size):
+            positions = order[start : start + batch_size]
+            vectors = model.encode(
+                [texts[i] for i in positions],
+                batch_size=len(positions),
+                convert_to_numpy=True,
+                show_progress_bar=False,
+            )
+            yield positions, np.asarray(vectors)
+
+
+def embed_articles_model(
+    articles: List[ArticleRecord],
+    batch_size: int = 32,
+    num_threads: Optional[int] = None,
+    model=None,
+) -> EmbeddingResult:
     """
     Modo real, usa embeddings semânticos de verdade.
     Isso é o que você vai usar mais tarde, mas requer PyTorch.
+
+    `batch_size` e `num_threads` (threads do torch; None = padrão do torch)
+    permitem ajustar por máquina; a vazão medida vai em `stats`.
+    """
+    texts = [a.text_repr for a in articles]
+    vectors: Optional[np.ndarray] = None
+    n_batches = 0
+    t0 = time.perf_counter()
+    for positions, batch in iter_model_embeddings(texts, batch_size, num_threads, model):
+        if vectors is None:
+            vectors = np.empty((len(texts), batch.shape[1]), dtype=np.float32)
+        vectors[positions] = batch
+        n_batches += 1
+    seconds = time.perf_counter() - t0
+    if vectors is None:
+        vectors = np.empty((0, EMBEDDER_SPECS["model"][1]), dtype=np.float32)
+
+    return EmbeddingResult(
+        vectors=vectors,
+        article_ids=[a.id for a in articles],
+        stats={
+            "n_texts": len(texts),
+            "n_batches": n_batches,
+            "seconds": seconds,
+            "texts_per_s": len(texts) / seconds if seconds > 0 else 0.0,
+        },
+    )
+
+
+# --------- TF-IDF ESPARSO ----------
+
+TFIDF_DEFAULTS = {
+    "max_features": 50_000,
+    "ngram_range": (1, 2),
+    "min_df": 1,
+    "max_df": 0.95,
+    "sublinear_tf": True,
+}
+
+
+def fit_tfidf(texts: List[str], **params) -> TfidfVectorizer:
+    """
+    Ajusta vocabulário e IDF (parâmetros: TFIDF_DEFAULTS, sobrescrevíveis).
+    Sem stop words por padrão: os artigos não são todos em inglês; passe
+    `stop_words=...` para filtrar alguma lista.
+    """
+    vectorizer = TfidfVectorizer(**{**TFIDF_DEFAULTS, **params}, dtype=np.float32)
+    if len(texts) == 1:
+        vectorizer.set_params(max_df=1.0)  # max_df < 1 descartaria tudo com 1 documento
+    return vectorizer.fit(texts)
+
+
+def embed_articles_tfidf(
+    articles: List[ArticleRecord], vectorizer: Optional[TfidfVectorizer] = None
+) -> EmbeddingResult:
+    """
+    Vetores TF-IDF esparsos (CSR float32, linhas com norma L2 = 1), sem
+    nunca virar matriz densa. Com `vectorizer` (ex.: carregado do disco)
+    o vocabulário/IDF é reaproveitado; sem ele, é ajustado nestes artigos.
     """
-    model = _get_model()
     texts = [a.text_repr for a in articles]
-    vectors = model.encode(texts, convert_to_numpy=True, show_progress_bar=False)
+    if vectorizer is None:
+        vectorizer = fit_tfidf(texts)
     return EmbeddingResult(
-        vectors=np.asarray(vectors, dtype=float),
+        vectors=vectorizer.transform(texts).tocsr(),
         article_ids=[a.id for a in articles],
     )
+
+
+# nome -> (identidade do embedder, dimensão dos vetores).
+# Mude a identidade sempre que os vetores gerados mudarem, para invalidar o cache.
+# TF-IDF fica de fora: o vetor de um texto depende do IDF do corpus todo.
+EMBEDDER_SPECS: Dict[str, Tuple[str, int]] = {
+    "light": ("light-md5-hash/v1", 64),
+    "model": ("sentence-transformers/all-MiniLM-L6-v2", 384),
+}
+EMBEDDERS = ("light", "model", "tfidf")
+
+
+def embed_articles(
+    articles: List[ArticleRecord],
+    embedder: str = "light",
+    batch_size: int = 32,
+    num_threads: Optional[int] = None,
+) -> EmbeddingResult:
+    """
+    Despacha para o modo escolhido pelo nome (chave de EMBEDDER_SPECS).
+    `batch_size`/`num_threads` só valem para o modo "model".
+    """
+    if embedder == "light":
+        return embed_articles_light(articles, dim=EMBEDDER_SPECS["light"][1])
+    if embedder == "model":
+        return embed_articles_model(articles, batch_size=batch_size, num_threads=num_threads)
+    if embedder == "tfidf":
+        return embed_articles_tfidf(articles)
+    raise ValueError(f"unknown embedder {embedder!r}; expected one of {EMBEDDERS}")
@@ -1,35 +1,200 @@
 """
 Build k-NN similarity graph using cosine similarity of embeddings.
+
+Neighbors are found with a blocked exact search: query rows are processed
+`block_size` at a time against the corpus, and only the top-k of each block
+is kept (via `argpartition`). Row norms are computed once, in one pass over
+the corpus; the search then reads it in tiles of `tile_size` rows, each
+converted to L2-normalized float32 on the fly. Vectors therefore stay in
+their compact storage (float16 / int8, see `quantization`, or a memmap),
+and scipy sparse rows (e.g. TF-IDF) are never densified. Peak extra memory
+is O(block_size * N + tile_size * D), never a float32 copy of the corpus
+nor the O(N^2) of a dense similarity matrix.
+
+For very large corpora `method="rpforest"` switches to the approximate
+random-projection forest in `ann_index` (sub-quadratic).
 """
 
-import networkx as nx
+from typing import Optional, Tuple
+
 import numpy as np
-from sklearn.metrics.pairwise import cosine_similarity
-
-from .data import EmbeddingResult
-
-
-def build_knn_graph(emb: EmbeddingResult, k: int) -> nx.Graph:
-    sims = cosine_similarity(emb.vectors)  # N x N
-    n = sims.shape[0]
-
-    G = nx.Graph()
-    for node_id in emb.article_ids:
-        G.add_node(node_id)
-
-    for i in range(n):
-        idx_sorted = np.argsort(-sims[i])
-        neighbors = [j for j in idx_sorted if j != i][:k]
-        for j in neighbors:
-            a = emb.article_ids[i]
-            b = emb.article_ids[j]
-            w = float(sims[i, j])
-            if a == b:
-                continue
-            if G.has_edge(a, b):
-                if w > G[a][b]["weight"]:
-                    G[a][b]["weight"] = w
-            else:
-                G.add_edge(a, b, weight=w)
-
-    return G
+import scipy.sparse as sp
+
+from .data import EmbeddingResult, NeighborTable
+from .sparse_graph import CSRGraph, csr_from_edges
+
+DEFAULT_BLOCK_SIZE = 1024
+DEFAULT_TILE_SIZE = 8192
+KNN_METHODS = ("exact", "rpforest")
+
+
+def _normalize_rows(vectors: np.ndarray) -> np.ndarray:
+    """L2-normalize rows into a float32 copy (zero rows stay zero, like sklearn)."""
+    vecs = np.asarray(vectors, dtype=np.float32)
+    norms = np.linalg.norm(vecs, axis=1, keepdims=True)
+    norms[norms == 0.0] = 1.0
+    return vecs / norms
+
+
+def _float32_rows(vectors, lo: int, hi: int):
+    """Rows lo:hi as float32 (kept sparse for sparse input)."""
+    rows = vectors[lo:hi]
+    if sp.issparse(rows):
+        return sp.csr_matrix(rows, dtype=np.float32)
+    return np.asarray(rows, dtype=np.float32)
+
+
+def _row_norms(vectors, tile_size: int) -> np.ndarray:
+    """float32 L2 norm of every row, zero norms replaced by 1."""
+    norms = np.empty(vectors.shape[0], dtype=np.float32)
+    for lo in range(0, vectors.shape[0], tile_size):
+        tile = _float32_rows(vectors, lo, lo + tile_size)
+        if sp.issparse(tile):
+            norms[lo : lo + tile_size] = np.sqrt(
+                np.asarray(tile.multiply(tile).sum(axis=1)).ravel()
+            )
+        else:
+            norms[lo : lo + tile_size] = np.linalg.norm(tile, axis=1)
+    norms[norms == 0.0] = 1.0
+    return norms
+
+
+def _topk_rows(sims: np.ndarray, k: int) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Top-k columns of every row of `sims`, sorted by descending similarity
+    (ties broken by lower column index).
+    """
+    n_cols = sims.shape[1]
+    if k < n_cols:
+        cand = np.argpartition(-sims, k - 1, axis=1)[:, :k]
+    else:
+        cand = np.broadcast_to(np.arange(n_cols), sims.shape).copy()
+    cand_sims = np.take_along_axis(sims, cand, axis=1)
+    order = np.lexsort((cand, -cand_sims), axis=1)
+    return np.take_along_axis(cand, order, axis=1), np.take_along_axis(cand_sims, order, axis=1)
+
+
+def knn_search_blocked(
+    vectors,
+    k: int,
+    block_size: int = DEFAULT_BLOCK_SIZE,
+    tile_size: int = DEFAULT_TILE_SIZE,
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Exact cosine k-NN of every row against all other rows. `vectors` may
+    be any float or int8 array (or memmap), or a scipy sparse matrix. Row
+    norms are computed once; rows are normalized one tile at a time.
+
+    Returns (indices, similarities), both of shape (N, min(k, N - 1)), each row
+    sorted by descending similarity. A row is never its own neighbor.
+    """
+    if block_size < 1 or tile_size < 1:
+        raise ValueError("block_size and tile_size must be >= 1")
+    n = vectors.shape[0]
+    k_eff = max(0, min(k, n - 1))
+    indices = np.empty((n, k_eff), dtype=np.int64)
+    sims_out = np.empty((n, k_eff), dtype=np.float32)
+    if k_eff == 0:
+        return indices, sims_out
+
+    norms = _row_norms(vectors, tile_size)
+
+    def normalized(lo: int, hi: int):
+        rows = _float32_rows(vectors, lo, hi)
+        if sp.issparse(rows):
+            return sp.csr_matrix(rows.multiply(1.0 / norms[lo:hi, None]), dtype=np.float32)
+        return rows / norms[lo:hi, None]
+
+    for start in range(0, n, block_size):
+        stop = min(start + block_size, n)
+        query = normalized(start, stop)
+        sims = np.empty((stop - start, n), dtype=np.float32)
+        for lo in range(0, n, tile_size):
+            hi = min(lo + tile_size, n)
+            tile_sims = query @ normalized(lo, hi).T
+            sims[:, lo:hi] = tile_sims.toarray() if sp.issparse(tile_sims) else tile_sims
+        rows = np.arange(stop - start)
+        sims[rows, rows + start] = -np.inf  # exclude self
+        idx, s = _topk_rows(sims, k_eff)
+        indices[start:stop] = idx
+        sims_out[start:stop] = s
+
+    return indices, sims_out
+
+
+def search_neighbors(
+    vectors,
+    k: int,
+    method: str = "exact",
+    block_size: int = DEFAULT_BLOCK_SIZE,
+    n_trees: Optional[int] = None,
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Dispatch to a neighbor-search backend (see KNN_METHODS).
+    `n_trees` is the recall-vs-speed knob of the approximate backend
+    (default: scaled with the corpus size, see `ann_index.default_n_trees`).
+    """
+    if method == "exact":
+        return knn_search_blocked(vectors, k=k, block_size=block_size)
+    if method == "rpforest":
+        if sp.issparse(vectors):
+            raise ValueError("rpforest needs dense vectors; reduce sparse ones first")
+        from .ann_index import knn_search_rpforest
+
+        return knn_search_rpforest(vectors, k=k, n_trees=n_trees)
+    raise ValueError(f"unknown knn method {method!r}; expected one of {KNN_METHODS}")
+
+
+def compute_neighbor_table(
+    emb: EmbeddingResult,
+    k_max: int,
+    block_size: int = DEFAULT_BLOCK_SIZE,
+    method: str = "exact",
+    n_trees: Optional[int] = None,
+) -> NeighborTable:
+    """
+    Search neighbors once at `k_max`; graphs for any k <= k_max are then
+    sliced from the table by `graph_from_neighbor_table`.
+    """
+    indices, sims = search_neighbors(
+        emb.vectors, k=k_max, method=method, block_size=block_size, n_trees=n_trees
+    )
+    return NeighborTable(
+        indices=indices,
+        similarities=sims,
+        article_ids=list(emb.article_ids),
+        drop_non_positive=sp.issparse(emb.vectors),
+    )
+
+
+def graph_from_neighbor_table(table: NeighborTable, k: int) -> CSRGraph:
+    """
+    k-NN graph from the first k columns of the table (rows are sorted).
+    For tables with `drop_non_positive` (sparse input such as TF-IDF, where
+    rows sharing no term have similarity 0) neighbors with similarity <= 0
+    are not linked: they carry no affinity, and Louvain needs positive edge
+    weights. Dense tables keep every neighbor.
+    """
+    n, k_max = table.indices.shape
+    if k > k_max and k_max < n - 1:
+        raise ValueError(f"k={k} exceeds the neighbor table's k_max={k_max}")
+    cols = table.indices[:, :k]
+    sims = table.similarities[:, :k]
+    rows = np.repeat(np.arange(n), cols.shape[1])
+    if not table.drop_non_positive:
+        return csr_from_edges(rows, cols.ravel(), sims.ravel(), table.article_ids)
+    keep = sims.ravel() > 0
+    return csr_from_edges(rows[keep], cols.ravel()[keep], sims.ravel()[keep], table.article_ids)
+
+
+def build_knn_graph(
+    emb: EmbeddingResult,
+    k: int,
+    block_size: int = DEFAULT_BLOCK_SIZE,
+    method: str = "exact",
+    n_trees: Optional[int] = None,
+) -> CSRGraph:
+    table = compute_neighbor_table(
+        emb, k_max=k, block_size=block_size, method=method, n_trees=n_trees
+    )
+    return graph_from_neighbor_table(table, k)
@@ -2,13 +2,26 @@
 Extract minimal metadata (title, abstract, keywords, year) from PDFs.
 Right now it's a placeholder heuristic, later we'll parse PDF text
 and/or use .bib.
+
+`batch_extract` spreads the (CPU-bound, once real parsing is in) work over
+a process pool in chunks of `chunk_size` paths, keeping input order, when
+asked for more than one worker. It falls back to a serial loop for small
+inputs or when no pool can be started; errors raised by a worker while
+extracting propagate.
+It accepts any iterable of paths: chunks are submitted as they fill up, so
+fed by `file_scanner.iter_pdfs` extraction overlaps with the folder scan.
 """
 
+import concurrent.futures
+import itertools
 from pathlib import Path
-from typing import List
+from typing import Iterable, Iterator, List, Optional
 
 from .data import ArticleRecord
 
+# bump whenever extract_from_pdf output changes, to invalidate cached records
+EXTRACTOR_VERSION = "placeholder/v1"
+
 
 def extract_from_pdf(pdf_path: str) -> ArticleRecord:
     p = Path(pdf_path)
@@ -30,5 +43,50 @@ def extract_from_pdf(pdf_path: str) -> ArticleRecord:
     )
 
 
-def batch_extract(pdf_paths: List[str]) -> List[ArticleRecord]:
+DEFAULT_CHUNK_SIZE = 64
+
+
+def _extract_chunk(pdf_paths: List[str]) -> List[ArticleRecord]:
     return [extract_from_pdf(p) for p in pdf_paths]
+
+
+def _chunked(paths: Iterable[str], chunk_size: int, seen: List[List[str]]) -> Iterator[List[str]]:
+    it = iter(paths)
+    while chunk := list(itertools.islice(it, chunk_size)):
+        seen.append(chunk)
+        yield chunk
+
+
+def batch_extract(
+    pdf_paths: Iterable[str],
+    max_workers: Optional[int] = None,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+) -> List[ArticleRecord]:
+    """
+    Records in the order of `pdf_paths`. Extraction is serial unless
+    `max_workers` > 1 (a pool only pays off once real parsing is in); at
+    most one chunk of paths is also extracted serially.
+    """
+    if chunk_size < 1:
+        raise ValueError("chunk_size must be >= 1")
+    workers = max_workers or 1
+    if workers <= 1:
+        # one record at a time, so a streamed input keeps being produced meanwhile
+        return [extract_from_pdf(p) for p in pdf_paths]
+
+    seen: List[List[str]] = []
+    chunks = _chunked(pdf_paths, chunk_size, seen)
+    head = list(itertools.islice(chunks, workers))
+    if len(head) < 2:
+        return _extract_chunk(head[0] if head else [])
+    try:
+        # fewer chunks than workers means the input is exhausted
+        pool = concurrent.futures.ProcessPoolExecutor(max_workers=min(workers, len(head)))
+    except (OSError, NotImplementedError):
+        # no usable process pool here (sandbox without semaphores, frozen app)
+        for _ in chunks:  # drain the input into `seen`
+            pass
+        return _extract_chunk([path for chunk in seen for path in chunk])
+    with pool:
+        results = pool.map(_extract_chunk, itertools.chain(head, chunks))
+        return [record for chunk in results for record in chunk]
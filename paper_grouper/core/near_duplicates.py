@@ -0,0 +1,220 @@
+"""
+Near-duplicate papers (preprint vs. camera-ready, re-uploads with a new
+cover page) via MinHash signatures and an LSH banding index.
+
+Each text becomes a set of word `shingle_size`-grams. Its signature is a
+one-permutation MinHash with rotation densification: every shingle is
+hashed once and falls into one of `num_perm` bins, each bin keeps its
+minimum, and an empty bin borrows from the next non-empty one. Two
+signatures then agree in about a Jaccard-similarity fraction of their
+positions, at the cost of one hash per shingle instead of `num_perm`.
+
+Signatures are cut into `bands` bands of `rows` values. Texts sharing a
+whole band land in the same bucket and become candidates. Candidates are
+kept if their estimated similarity reaches `threshold`. Linking each
+bucket member to the bucket's first member only, plus union-find over
+the kept pairs, keeps the whole thing roughly linear in the number of
+texts.
+
+Tokenizing, shingling, hashing, signatures and banding are all array
+operations. Use `benchmarks/bench_near_duplicates.py` for
+timings.
+"""
+
+from typing import List, Optional, Sequence, Tuple
+
+import numpy as np
+import scipy.sparse as sp
+from scipy.sparse.csgraph import connected_components
+
+from .data import ArticleRecord
+
+NEAR_DUPLICATE_MODES = ("off", "flag", "merge")
+
+DEFAULT_THRESHOLD = 0.8
+DEFAULT_NUM_PERM = 128
+DEFAULT_SHINGLE_SIZE = 3
+
+_WORD_BYTES = np.zeros(256, dtype=bool)
+for _c in b"0123456789_abcdefghijklmnopqrstuvwxyzABCDEFGHIJKLMNOPQRSTUVWXYZ":
+    _WORD_BYTES[_c] = True
+_WORD_BYTES[0x80:] = True
+_POLY = np.uint64(0x100000001B3)  # odd, hence invertible mod 2^64
+_POLY_INV = np.uint64(pow(int(_POLY), -1, 2**64))
+_TEXT_CHUNK = 4096
+_EMPTY_BIN = np.uint32(0xFFFFFFFF)
+_ROTATION = np.uint32(0x9E3779B1)  # added per bin borrowed across, so borrowed values differ
+
+
+def _mix64(x: np.ndarray) -> np.ndarray:
+    """splitmix64 finalizer: spreads any uint64 input over all 64 bits."""
+    x = x ^ (x >> np.uint64(30))
+    x *= np.uint64(0xBF58476D1CE4E5B9)
+    x ^= x >> np.uint64(27)
+    x *= np.uint64(0x94D049BB133111EB)
+    return x ^ (x >> np.uint64(31))
+
+
+def _word_hashes(texts: Sequence[str]) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    uint64 hash of every word, concatenated, and words per text. Words are
+    runs of ASCII letters, digits and "_" plus any non-ASCII byte, so they
+    are found and hashed with array ops over the UTF-8 bytes instead of a
+    per-word Python loop. The hash is polynomial: the prefix sums of
+    byte * P^position, differenced per word and scaled by P^-start.
+    """
+    hashes, lengths = [], []
+    for lo in range(0, len(texts), _TEXT_CHUNK):
+        # lowered one by one: lower() can change a text's UTF-8 length
+        # ("İ" 2 -> 3 bytes, Kelvin sign 3 -> 1), and offsets below use it
+        chunk = [t.lower().encode("utf-8") for t in texts[lo : lo + _TEXT_CHUNK]]
+        # "\n" between texts ends the last word of each one
+        data = np.frombuffer(b"\n".join(chunk) + b"\n", dtype=np.uint8)
+        is_word = _WORD_BYTES[data]
+        edges = np.diff(is_word.astype(np.int8), prepend=np.int8(0))
+        starts, ends = np.flatnonzero(edges == 1), np.flatnonzero(edges == -1)
+
+        powers = np.full(len(data), _POLY, dtype=np.uint64)
+        powers[0] = 1
+        np.multiply.accumulate(powers, out=powers)
+        inverse = np.full(len(data), _POLY_INV, dtype=np.uint64)
+        inverse[0] = 1
+        np.multiply.accumulate(inverse, out=inverse)
+        prefix = np.concatenate(([np.uint64(0)], np.cumsum(data * powers, dtype=np.uint64)))
+        hashes.append(_mix64((prefix[ends] - prefix[starts]) * inverse[starts]))
+
+        text_starts = np.cumsum([0] + [len(t) + 1 for t in chunk[:-1]])
+        owner = np.searchsorted(text_starts, starts, side="right") - 1
+        lengths.append(np.bincount(owner, minlength=len(chunk)))
+    if not hashes:
+        return np.zeros(0, dtype=np.uint64), np.zeros(0, dtype=np.int64)
+    return np.concatenate(hashes), np.concatenate(lengths).astype(np.int64)
+
+
+def _shingles(texts: Sequence[str], shingle_size: int) -> Tuple[np.ndarray, np.ndarray]:
+    """uint64 ids of every text's word shingles, concatenated, and shingles per text."""
+    flat, lengths = _word_hashes(texts)
+
+    # a text shorter than one shingle is padded with id 0 to a single shingle
+    padded = np.where((lengths > 0) & (lengths < shingle_size), shingle_size, lengths)
+    tok = np.zeros(int(padded.sum()), dtype=np.uint64)
+    shift = np.repeat((np.cumsum(padded) - padded) - (np.cumsum(lengths) - lengths), lengths)
+    tok[np.arange(len(flat)) + shift] = flat
+
+    # start position of every shingle within `tok`, without a per-text loop
+    counts = np.maximum(padded - shingle_size + 1, 0)
+    before = np.cumsum(counts) - counts
+    starts = np.repeat((np.cumsum(padded) - padded) - before, counts) + np.arange(counts.sum())
+    shingle = np.zeros(len(starts), dtype=np.uint64)
+    for j in range(shingle_size):
+        shingle = _mix64(shingle + tok[starts + j])
+    return shingle, counts
+
+
+def minhash_signatures(
+    texts: Sequence[str],
+    num_perm: int = DEFAULT_NUM_PERM,
+    shingle_size: int = DEFAULT_SHINGLE_SIZE,
+    seed: int = 0,
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    (signatures, empty): uint32 array of shape (len(texts), num_perm), and a
+    mask of texts without words, whose signature is meaningless.
+    """
+    shingles, counts = _shingles(texts, shingle_size)
+    h = _mix64(shingles ^ np.uint64(seed))
+    bins = (h >> np.uint64(32)) % np.uint64(num_perm)
+    doc = np.repeat(np.arange(len(texts), dtype=np.uint64), counts)
+
+    signatures = np.full((len(texts), num_perm), _EMPTY_BIN, dtype=np.uint32)
+    # keep the max bin value 1 lower than _EMPTY_BIN so "empty" stays unambiguous
+    values = np.minimum(h & np.uint64(0xFFFFFFFF), np.uint64(0xFFFFFFFE)).astype(np.uint32)
+    np.minimum.at(signatures.reshape(-1), doc * np.uint64(num_perm) + bins, values)
+
+    # rotation densification: an empty bin takes the next non-empty bin's
+    # value (circularly), plus _ROTATION per bin crossed
+    empty_bins = signatures == _EMPTY_BIN
+    if empty_bins.any():
+        cols = np.arange(2 * num_perm)
+        source = np.where(np.tile(~empty_bins, 2), cols, 2 * num_perm)
+        source = np.minimum.accumulate(source[:, ::-1], axis=1)[:, ::-1][:, :num_perm]
+        rows = np.arange(len(texts))[:, None]
+        has_any = source[:, :1] < 2 * num_perm
+        source = np.where(has_any, source, cols[:num_perm])
+        distance = (source - cols[:num_perm]).astype(np.uint32)
+        borrowed = signatures[rows, source % num_perm] + distance * _ROTATION
+        signatures = np.where(empty_bins & has_any, borrowed, signatures)
+    return signatures, counts == 0
+
+
+def choose_bands(num_perm: int, threshold: float) -> Tuple[int, int]:
+    """
+    (bands, rows) with bands * rows == num_perm. The LSH S-curve midpoint
+    (1/bands)^(1/rows) is kept at or below `threshold` while being as steep
+    as possible. Recall is favoured because candidates are verified anyway.
+    """
+    options = [(num_perm // r, r) for r in range(1, num_perm + 1) if num_perm % r == 0]
+    below = [(b, r) for b, r in options if (1 / b) ** (1 / r) <= threshold]
+    return max(below, key=lambda br: br[1]) if below else (num_perm, 1)
+
+
+def lsh_groups(
+    signatures: np.ndarray,
+    threshold: float = DEFAULT_THRESHOLD,
+    bands: Optional[int] = None,
+    skip: Optional[np.ndarray] = None,
+) -> List[List[int]]:
+    """Groups (row indices, ascending) of rows whose signatures estimate Jaccard >= threshold."""
+    n, num_perm = signatures.shape
+    if bands is None:
+        bands, rows = choose_bands(num_perm, threshold)
+    elif num_perm % bands:
+        raise ValueError("bands must divide the signature length")
+    else:
+        rows = num_perm // bands
+
+    active = np.arange(n) if skip is None else np.flatnonzero(~skip)
+    mix = np.random.default_rng(1).integers(1, 2**63, size=rows, dtype=np.uint64) | np.uint64(1)
+    pairs = []
+    for band in range(bands):
+        cols = signatures[active, band * rows : (band + 1) * rows].astype(np.uint64)
+        keys = (cols * mix).sum(axis=1)
+        order = np.argsort(keys, kind="stable")
+        sorted_keys = keys[order]
+        new_bucket = np.concatenate(([True], sorted_keys[1:] != sorted_keys[:-1]))
+        leader = order[np.maximum.accumulate(np.where(new_bucket, np.arange(len(order)), 0))]
+        linked = ~new_bucket
+        pairs.append(np.stack([active[leader[linked]], active[order[linked]]], axis=1))
+    if not pairs or not sum(len(p) for p in pairs):
+        return []
+
+    candidates = np.unique(np.concatenate(pairs), axis=0)
+    similarity = np.empty(len(candidates))
+    for start in range(0, len(candidates), 1 << 14):
+        c = candidates[start : start + (1 << 14)]
+        similarity[start : start + len(c)] = (signatures[c[:, 0]] == signatures[c[:, 1]]).mean(1)
+    kept = candidates[similarity >= threshold]
+    if not len(kept):
+        return []
+
+    graph = sp.coo_matrix((np.ones(len(kept)), (kept[:, 0], kept[:, 1])), shape=(n, n))
+    _, labels = connected_components(graph, directed=False)
+    sizes = np.bincount(labels)
+    members = np.flatnonzero(sizes[labels] > 1)
+    groups: dict = {}
+    for i in members:
+        groups.setdefault(labels[i], []).append(int(i))
+    return sorted(groups.values())
+
+
+def find_near_duplicates(
+    articles: Sequence[ArticleRecord],
+    threshold: float = DEFAULT_THRESHOLD,
+    num_perm: int = DEFAULT_NUM_PERM,
+    shingle_size: int = DEFAULT_SHINGLE_SIZE,
+    seed: int = 0,
+) -> List[List[int]]:
+    """Groups of positions in `articles` whose text (plus first page) is nearly identical."""
+    texts = [f"{a.text_repr} {a.first_page_text}" for a in articles]
+    signatures, empty = minhash_signatures(texts, num_perm, shingle_size, seed)
+    return lsh_groups(signatures, threshold, skip=empty)
@@ -0,0 +1,56 @@
+"""
+Compact storage modes for EmbeddingResult.vectors.
+
+- "float64": double precision
+- "float32": as produced by the dense embedders, and what the neighbor
+             search computes in anyway
+- "float16": half the memory of float32
+- "int8":    symmetric scalar quantization with one scale per row,
+             vectors ~= q * scales[:, None]
+
+Cosine similarity ignores a row's positive scale, so the neighbor search
+reads int8 rows directly and never needs `scales`; they are kept to
+dequantize vectors for anything that needs magnitudes.
+"""
+
+from dataclasses import replace
+from typing import Optional
+
+import numpy as np
+import scipy.sparse as sp
+
+from .data import EmbeddingResult
+
+STORAGE_MODES = ("float64", "float32", "float16", "int8")
+
+_INT8_MAX = 127
+
+
+def storage_mode(emb: EmbeddingResult) -> str:
+    return "int8" if emb.scales is not None else np.dtype(emb.vectors.dtype).name
+
+
+def quantize_embeddings(emb: EmbeddingResult, storage: str) -> EmbeddingResult:
+    """Copy of `emb` with its vectors stored as `storage` (see STORAGE_MODES)."""
+    if storage not in STORAGE_MODES:
+        raise ValueError(f"unknown embedding storage {storage!r}; expected one of {STORAGE_MODES}")
+    if storage == storage_mode(emb):
+        return emb
+    vectors = dequantize(emb)
+    if sp.issparse(vectors) and storage == "int8":
+        raise ValueError("int8 storage needs dense vectors")
+    if storage != "int8":
+        return replace(emb, vectors=vectors.astype(storage), scales=None)
+
+    scales = np.abs(vectors).max(axis=1) / _INT8_MAX if vectors.size else np.zeros(len(vectors))
+    safe = np.where(scales > 0, scales, 1.0)
+    q = np.rint(vectors / safe[:, None]).clip(-_INT8_MAX, _INT8_MAX).astype(np.int8)
+    return replace(emb, vectors=q, scales=scales.astype(np.float32))
+
+
+def dequantize(emb: EmbeddingResult, start: int = 0, stop: Optional[int] = None) -> np.ndarray:
+    """Rows start:stop as floats (float32 for the compact modes)."""
+    rows = emb.vectors[start:stop]
+    if emb.scales is None:
+        return rows if rows.dtype != np.float16 else rows.astype(np.float32)
+    return rows.astype(np.float32) * emb.scales[start:stop, None]
@@ -0,0 +1,255 @@
+"""
+Search strategies for autotune over the (k, resolution, min_cluster_size) grid.
+
+A strategy proposes trials with `ask()` and learns from their scores with
+`tell()`. A trial is `(config, fraction)`: `fraction` < 1.0 means "evaluate
+on a random subsample of that fraction of the articles" (successive
+halving); only full-data trials (fraction 1.0) compete for the final result.
+
+- "grid":   exhaustive product, in grid order (the historical behavior)
+- "random": the product in seeded random order; pair with a trial budget
+- "halving": successive halving - all configs on a small subsample, the
+  best 1/eta move on to a eta-times larger sample, ..., finalists on all data.
+  Subsample trials count toward a trial budget like full-data ones.
+- "tpe":    Tree-structured Parzen Estimator over the categorical grid
+"""
+
+import itertools
+import math
+from abc import ABC, abstractmethod
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+Config = Dict[str, float]
+Trial = Tuple[Config, float]  # (config, sample fraction)
+
+SEARCH_STRATEGIES = ("grid", "random", "halving", "tpe")
+
+
+def grid_configs(space: Dict[str, List[float]]) -> List[Config]:
+    names = list(space)
+    return [dict(zip(names, values, strict=True)) for values in itertools.product(*space.values())]
+
+
+def _key(config: Config) -> Tuple[float, ...]:
+    return tuple(config.values())
+
+
+class SearchStrategy(ABC):
+    """Base class: proposes trials in batches, observes their scores."""
+
+    def __init__(self, space: Dict[str, List[float]], seed: Optional[int] = 0):
+        self.space = {name: list(dict.fromkeys(values)) for name, values in space.items()}
+        self.configs = grid_configs(self.space)
+        self.rng = np.random.default_rng(seed)
+        self.observed: Dict[Tuple[float, ...], float] = {}  # full-data scores
+
+    @abstractmethod
+    def ask(self, max_trials: Optional[int] = None) -> List[Trial]:
+        """Next batch to evaluate (at most `max_trials`); [] when done."""
+
+    def tell(self, config: Config, fraction: float, score: float) -> None:
+        if fraction >= 1.0:
+            self.observed[_key(config)] = score
+
+    def best_guess(self) -> Config:
+        """Most promising config seen so far (for budget-exhausted runs)."""
+        if self.observed:
+            best = max(self.observed, key=self.observed.get)
+            return dict(zip(self.space, best, strict=True))
+        return self.configs[0]
+
+
+class GridSearch(SearchStrategy):
+    def __init__(self, space, seed=0):
+        super().__init__(space, seed)
+        self._pending = list(self.configs)
+
+    def ask(self, max_trials=None):
+        n = len(self._pending) if max_trials is None else max_trials
+        batch, self._pending = self._pending[:n], self._pending[n:]
+        return [(cfg, 1.0) for cfg in batch]
+
+
+class RandomSearch(GridSearch):
+    def __init__(self, space, seed=0):
+        super().__init__(space, seed)
+        order = self.rng.permutation(len(self._pending))
+        self._pending = [self._pending[i] for i in order]
+
+
+class SuccessiveHalving(SearchStrategy):
+    """
+    Rung r evaluates its survivors on a fraction eta**-(R - r) of the
+    articles; the top 1/eta survive to the next rung. R is chosen so the
+    smallest sample still has `min_sample` articles and the first rung does
+    not start with fewer configs than eta**R.
+
+    With `max_trials`, every rung counts toward it: the first rung is cut to
+    the most (randomly ordered) configs whose rungs all fit in the budget.
+    """
+
+    def __init__(
+        self,
+        space,
+        n_items: int,
+        seed=0,
+        eta: int = 3,
+        min_sample: int = 100,
+        max_trials: Optional[int] = None,
+    ):
+        super().__init__(space, seed)
+        self.eta = eta
+        order = self.rng.permutation(len(self.configs))
+        max_rungs_data = math.floor(math.log(max(1, n_items / min_sample), eta))
+
+        def rungs(n_configs: int) -> int:
+            return max(0, min(max_rungs_data, math.floor(math.log(max(1, n_configs), eta))))
+
+        n_first = len(self.configs)
+        while max_trials is not None and n_first > 1:
+            if self._total_trials(n_first, rungs(n_first)) <= max_trials:
+                break
+            n_first -= 1
+        self._survivors = [self.configs[i] for i in order[:n_first]]
+        self._rung = -rungs(n_first)  # 0 = full data
+        self._scores: Dict[Tuple[float, ...], float] = {}
+        self._asked = False
+
+    def _total_trials(self, n_configs: int, n_rungs: int) -> int:
+        total = 0
+        for _ in range(n_rungs + 1):
+            total += n_configs
+            n_configs = max(1, math.ceil(n_configs / self.eta))
+        return total
+
+    @property
+    def fraction(self) -> float:
+        return float(self.eta**self._rung)
+
+    def ask(self, max_trials=None):
+        if self._asked or not self._survivors:
+            return []
+        self._asked = True
+        batch = self._survivors if max_trials is None else self._survivors[:max_trials]
+        return [(cfg, self.fraction) for cfg in batch]
+
+    def tell(self, config, fraction, score):
+        super().tell(config, fraction, score)
+        self._scores[_key(config)] = score
+        if len(self._scores) < len(self._survivors):
+            return
+        # rung complete: promote the best 1/eta (or stop after the full-data rung)
+        if self._rung >= 0:
+            self._survivors = []
+            return
+        ranked = sorted(self._survivors, key=lambda c: -self._scores[_key(c)])
+        self._survivors = ranked[: max(1, math.ceil(len(ranked) / self.eta))]
+        self._scores = {}
+        self._rung += 1
+        self._asked = False
+
+    def best_guess(self):
+        if self.observed or not (self._scores or self._survivors):
+            return super().best_guess()
+        if self._scores:
+            best = max(self._scores, key=self._scores.get)
+            return dict(zip(self.space, best, strict=True))
+        return self._survivors[0]  # ranked at the last promotion
+
+
+class TPESearch(SearchStrategy):
+    """
+    Tree-structured Parzen Estimator for categorical parameters.
+
+    After `n_startup` random trials, observations are split into the best
+    `gamma` quantile (l) and the rest (g); per parameter, value frequencies
+    (with a +1 prior) give l(x) and g(x). `n_candidates` configs are
+    sampled from l and the untried one maximizing prod l(x)/g(x) is picked.
+    Proposes `batch_size` trials per round.
+    """
+
+    def __init__(
+        self,
+        space,
+        seed=0,
+        batch_size: int = 4,
+        n_startup: int = 8,
+        gamma: float = 0.25,
+        n_candidates: int = 24,
+    ):
+        super().__init__(space, seed)
+        self.batch_size = max(1, batch_size)
+        self.n_startup = n_startup
+        self.gamma = gamma
+        self.n_candidates = n_candidates
+        self._asked: set = set()
+
+    def _untried(self) -> List[Config]:
+        return [c for c in self.configs if _key(c) not in self._asked]
+
+    def _propose_one(self) -> Optional[Config]:
+        untried = self._untried()
+        if not untried:
+            return None
+        if len(self.observed) < self.n_startup:
+            return untried[int(self.rng.integers(len(untried)))]
+
+        ranked = sorted(self.observed.items(), key=lambda kv: -kv[1])
+        n_good = max(1, int(math.ceil(self.gamma * len(ranked))))
+        good = [k for k, _ in ranked[:n_good]]
+        bad = [k for k, _ in ranked[n_good:]]
+
+        densities = []
+        for pos, values in enumerate(self.space.values()):
+            good_counts = np.array([1.0 + sum(k[pos] == v for k in good) for v in values])
+            bad_counts = np.array([1.0 + sum(k[pos] == v for k in bad) for v in values])
+            densities.append(
+                (values, good_counts / good_counts.sum(), bad_counts / bad_counts.sum())
+            )
+
+        untried_keys = {_key(c) for c in untried}
+        best_cfg, best_ratio = None, -np.inf
+        for _ in range(self.n_candidates):
+            picks = [int(self.rng.choice(len(values), p=p_good)) for values, p_good, _ in densities]
+            key = tuple(values[i] for (values, _, _), i in zip(densities, picks, strict=True))
+            if key not in untried_keys:
+                continue
+            ratio = sum(
+                math.log(p_good[i] / p_bad[i])
+                for (_, p_good, p_bad), i in zip(densities, picks, strict=True)
+            )
+            if ratio > best_ratio:
+                best_cfg, best_ratio = dict(zip(self.space, key, strict=True)), ratio
+        return best_cfg or untried[int(self.rng.integers(len(untried)))]
+
+    def ask(self, max_trials=None):
+        n = self.batch_size if max_trials is None else min(self.batch_size, max_trials)
+        batch = []
+        for _ in range(n):
+            cfg = self._propose_one()
+            if cfg is None:
+                break
+            self._asked.add(_key(cfg))
+            batch.append((cfg, 1.0))
+        return batch
+
+
+def make_strategy(
+    name: str,
+    space: Dict[str, List[float]],
+    n_items: int,
+    seed: Optional[int] = 0,
+    batch_size: int = 4,
+    max_trials: Optional[int] = None,
+) -> SearchStrategy:
+    if name == "grid":
+        return GridSearch(space, seed)
+    if name == "random":
+        return RandomSearch(space, seed)
+    if name == "halving":
+        return SuccessiveHalving(space, n_items=n_items, seed=seed, max_trials=max_trials)
+    if name == "tpe":
+        return TPESearch(space, seed, batch_size=batch_size)
+    raise ValueError(f"unknown search strategy {name!r}; expected one of {SEARCH_STRATEGIES}")
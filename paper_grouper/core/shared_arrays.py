@@ -0,0 +1,51 @@
+"""
+NumPy arrays in `multiprocessing.shared_memory`, for process pools.
+
+The parent copies an array into a named segment once (`share_array`) and
+hands the small, picklable `SharedArraySpec` to the pool initializer;
+workers map the same pages with `attach_array` (zero-copy).
+"""
+
+from dataclasses import dataclass
+from multiprocessing import shared_memory
+from typing import List, Tuple
+
+import numpy as np
+
+
+@dataclass(frozen=True)
+class SharedArraySpec:
+    """Everything a worker needs to re-open a shared array."""
+
+    name: str
+    shape: Tuple[int, ...]
+    dtype: str
+
+
+def share_array(arr: np.ndarray) -> Tuple[shared_memory.SharedMemory, SharedArraySpec]:
+    """Copy `arr` into a new shared segment. Caller must close() + unlink() it."""
+    arr = np.ascontiguousarray(arr)
+    shm = shared_memory.SharedMemory(create=True, size=max(1, arr.nbytes))
+    view = np.ndarray(arr.shape, dtype=arr.dtype, buffer=shm.buf)
+    view[...] = arr
+    return shm, SharedArraySpec(name=shm.name, shape=arr.shape, dtype=arr.dtype.str)
+
+
+def attach_array(spec: SharedArraySpec) -> Tuple[shared_memory.SharedMemory, np.ndarray]:
+    """Map a shared array; keep the returned segment alive while using the view."""
+    shm = shared_memory.SharedMemory(name=spec.name)
+    return shm, np.ndarray(spec.shape, dtype=np.dtype(spec.dtype), buffer=shm.buf)
+
+
+def pack_strings(values: List[str]) -> Tuple[np.ndarray, np.ndarray]:
+    """Encode strings as one UTF-8 byte buffer + int64 offsets (len N + 1)."""
+    encoded = [v.encode("utf-8") for v in values]
+    offsets = np.zeros(len(encoded) + 1, dtype=np.int64)
+    np.cumsum([len(b) for b in encoded], out=offsets[1:])
+    return np.frombuffer(b"".join(encoded), dtype=np.uint8), offsets
+
+
+def unpack_strings(blob: np.ndarray, offsets: np.ndarray) -> List[str]:
+    raw = blob.tobytes()
+    bounds = offsets.tolist()
+    return [raw[a:b].decode("utf-8") for a, b in zip(bounds[:-1], bounds[1:], strict=True)]
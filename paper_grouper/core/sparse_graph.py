@@ -0,0 +1,123 @@
+"""
+Integer-indexed CSR graph used by the core pipeline.
+
+Nodes are rows 0..N-1; `node_ids[i]` maps back to the article id. Every
+undirected edge is stored in both directions, so a node's neighbors are the
+slice `indices[indptr[i]:indptr[i + 1]]` (sorted by column) with matching
+`weights`. Use `to_networkx()` only where a networkx.Graph is really needed
+(e.g. layout for rendering).
+"""
+
+from dataclasses import dataclass
+from functools import cached_property
+from typing import Dict, List, Tuple
+
+import networkx as nx
+import numpy as np
+
+
+@dataclass
+class CSRGraph:
+    """Undirected weighted graph; both directions of every edge are stored."""
+
+    indptr: np.ndarray  # shape (N + 1,), int64
+    indices: np.ndarray  # shape (2E,), int64 column of each stored edge
+    weights: np.ndarray  # shape (2E,), float64
+    node_ids: List[str]  # len N, row -> article id
+
+    @property
+    def n_nodes(self) -> int:
+        return len(self.node_ids)
+
+    @property
+    def n_edges(self) -> int:
+        return len(self.indices) // 2
+
+    @cached_property
+    def node_index(self) -> Dict[str, int]:
+        """article id -> row."""
+        return {node_id: i for i, node_id in enumerate(self.node_ids)}
+
+    @cached_property
+    def rows(self) -> np.ndarray:
+        """Row (source node) of every stored edge, aligned with `indices`."""
+        return np.repeat(np.arange(self.n_nodes), np.diff(self.indptr))
+
+    def neighbors(self, i: int) -> Tuple[np.ndarray, np.ndarray]:
+        lo, hi = self.indptr[i], self.indptr[i + 1]
+        return self.indices[lo:hi], self.weights[lo:hi]
+
+    def strengths(self) -> np.ndarray:
+        """Weighted degree of every node."""
+        return np.bincount(self.rows, weights=self.weights, minlength=self.n_nodes)
+
+    def total_weight(self) -> float:
+        """Sum of edge weights, each undirected edge counted once."""
+        return float(self.weights.sum()) / 2.0
+
+    def to_networkx(self) -> nx.Graph:
+        G = nx.Graph()
+        G.add_nodes_from(self.node_ids)
+        upper = self.rows < self.indices
+        ids = self.node_ids
+        G.add_weighted_edges_from(
+            (ids[i], ids[j], w)
+            for i, j, w in zip(
+                self.rows[upper].tolist(),
+                self.indices[upper].tolist(),
+                self.weights[upper].tolist(),
+                strict=True,
+            )
+        )
+        return G
+
+
+def csr_from_edges(
+    rows: np.ndarray, cols: np.ndarray, weights: np.ndarray, node_ids: List[str]
+) -> CSRGraph:
+    """
+    Symmetric CSR graph from directed (row, col, weight) triples. Both
+    directions are added; repeated pairs keep their maximum weight.
+    Self-loops are dropped.
+    """
+    n = len(node_ids)
+    keep = rows != cols
+    r = np.concatenate([rows[keep], cols[keep]]).astype(np.int64)
+    c = np.concatenate([cols[keep], rows[keep]]).astype(np.int64)
+    w = np.concatenate([weights[keep], weights[keep]]).astype(np.float64)
+
+    key = r * n + c
+    order = np.lexsort((-w, key))
+    key, r, c, w = key[order], r[order], c[order], w[order]
+    first = np.ones(len(key), dtype=bool)
+    first[1:] = key[1:] != key[:-1]
+    r, c, w = r[first], c[first], w[first]
+
+    indptr = np.zeros(n + 1, dtype=np.int64)
+    np.cumsum(np.bincount(r, minlength=n), out=indptr[1:])
+    return CSRGraph(indptr=indptr, indices=c, weights=w, node_ids=list(node_ids))
+
+
+def labels_from_partition(G: CSRGraph, partition: Dict[str, int]) -> np.ndarray:
+    """Dict[article_id, cluster_id] -> int array aligned with G's rows."""
+    return np.fromiter((partition[i] for i in G.node_ids), dtype=np.int64, count=G.n_nodes)
+
+
+def partition_from_labels(G: CSRGraph, labels: np.ndarray) -> Dict[str, int]:
+    return dict(zip(G.node_ids, labels.tolist(), strict=True))
+
+
+def modularity(G: CSRGraph, labels: np.ndarray, resolution: float = 1.0) -> float:
+    """
+    Newman modularity of `labels` on G (same value as
+    python-louvain's `community_louvain.modularity`).
+    """
+    links = G.total_weight()
+    if links == 0.0:
+        raise ValueError("A graph without link has an undefined modularity")
+    _, comm = np.unique(labels, return_inverse=True)
+    n_comm = int(comm.max()) + 1 if len(comm) else 0
+    same = comm[G.rows] == comm[G.indices]
+    inc = np.bincount(comm[G.rows[same]], weights=G.weights[same], minlength=n_comm) / 2.0
+    deg = np.bincount(comm, weights=G.strengths(), minlength=n_comm)
+    return float(np.sum(inc / links - resolution * (deg / (2.0 * links)) ** 2))
@@ -0,0 +1,110 @@
+"""
+Byte-identical duplicate detection for the input PDFs, so the same paper
+saved under several names is extracted, embedded and clustered once.
+
+Files are bucketed by size first (one stat each) and only buckets with
+more than one file are hashed. A library without duplicates therefore
+costs no reads. Hashing maps each file into memory and feeds blake2b in
+`chunk_size` slices. Files are hashed in parallel on a thread pool;
+hashlib releases the GIL on large updates.
+
+`DuplicateFilter` does the same for paths arriving one at a time (e.g.
+from `file_scanner.iter_pdfs`), so a consumer can skip copies while the
+scan is still running.
+"""
+
+import concurrent.futures
+import hashlib
+import mmap
+import os
+from collections import Counter, defaultdict
+from functools import partial
+from typing import Dict, List, Optional, Tuple
+
+DEFAULT_HASH_CHUNK = 1 << 20
+
+
+def content_hash(path: str, chunk_size: int = DEFAULT_HASH_CHUNK) -> str:
+    h = hashlib.blake2b(digest_size=16)
+    with open(path, "rb") as f:
+        size = os.fstat(f.fileno()).st_size
+        if size:  # empty files cannot be mapped
+            with (
+                mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as m,
+                memoryview(m) as view,
+            ):
+                for start in range(0, size, chunk_size):
+                    h.update(view[start : start + chunk_size])
+    return h.hexdigest()
+
+
+def find_duplicates(
+    pdf_paths: List[str],
+    max_workers: Optional[int] = None,
+    chunk_size: int = DEFAULT_HASH_CHUNK,
+) -> Dict[str, List[str]]:
+    """
+    Map the lexicographically smallest path of each set of byte-identical
+    files to the other copies (sorted), so the kept file does not depend on
+    the listing order. Files without copies are left out.
+    """
+    sizes = {path: os.stat(path).st_size for path in pdf_paths}
+    per_size = Counter(sizes.values())
+    candidates = [path for path in pdf_paths if per_size[sizes[path]] > 1]
+    if not candidates:
+        return {}
+
+    hash_fn = partial(content_hash, chunk_size=chunk_size)
+    with concurrent.futures.ThreadPoolExecutor(max_workers=max_workers) as pool:
+        hashes = list(pool.map(hash_fn, candidates))
+
+    groups: Dict[Tuple[int, str], List[str]] = defaultdict(list)
+    for path, digest in zip(candidates, hashes, strict=True):
+        groups[(sizes[path], digest)].append(path)
+    return {min(group): sorted(group)[1:] for group in groups.values() if len(group) > 1}
+
+
+def dedupe_pdfs(
+    pdf_paths: List[str],
+    max_workers: Optional[int] = None,
+    chunk_size: int = DEFAULT_HASH_CHUNK,
+) -> Tuple[List[str], Dict[str, List[str]]]:
+    """`pdf_paths` without the dropped copies (see find_duplicates), and those per kept path."""
+    aliases = find_duplicates(pdf_paths, max_workers, chunk_size)
+    dropped = {path for copies in aliases.values() for path in copies}
+    return [path for path in pdf_paths if path not in dropped], aliases
+
+
+class DuplicateFilter:
+    """
+    Incremental `find_duplicates`. `admit(path)` is False for a copy of a
+    file already admitted with a smaller path; the first file of each size
+    is admitted without being read. A copy arriving after its twin, but
+    with a smaller path, is admitted too (it becomes the kept file), so a
+    caller may have processed a few dropped copies; `aliases()` says which.
+    """
+
+    def __init__(self, chunk_size: int = DEFAULT_HASH_CHUNK):
+        self.chunk_size = chunk_size
+        self._by_size: Dict[int, List[str]] = defaultdict(list)
+        self._groups: Dict[Tuple[int, str], List[str]] = defaultdict(list)
+
+    def _add(self, path: str, size: int) -> List[str]:
+        group = self._groups[(size, content_hash(path, self.chunk_size))]
+        group.append(path)
+        return group
+
+    def admit(self, path: str) -> bool:
+        size = os.stat(path).st_size
+        same_size = self._by_size[size]
+        same_size.append(path)
+        if len(same_size) == 1:
+            return True
+        if len(same_size) == 2:  # the first one is hashed only now
+            self._add(same_size[0], size)
+        group = self._add(path, size)
+        return path == min(group)
+
+    def aliases(self) -> Dict[str, List[str]]:
+        """Same mapping as `find_duplicates` over every path admitted or not."""
+        return {min(group): sorted(group)[1:] for group in self._groups.values() if len(group) > 1}
@@ -0,0 +1,146 @@
+"""
+Persistent, content-addressed embedding cache.
+
+One directory per (embedder identity, dim) holds
+- vectors.f32: float32 rows, append-only, read back through np.memmap
+- index.txt:   sha256 of the row's text_repr, one line per row
+
+Rows are written before their index lines and both files are fixed-width
+per row, so an interrupted append leaves at most unindexed trailing bytes,
+which the next append truncates away. The cache assumes a single writer at
+a time.
+"""
+
+import hashlib
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Union
+
+import numpy as np
+from slugify import slugify
+
+from paper_grouper.core.data import ArticleRecord, EmbeddingResult
+
+DEFAULT_CACHE_DIR = Path.home() / ".cache" / "paper_grouper" / "embeddings"
+
+_VECTORS_FILE = "vectors.f32"
+_INDEX_FILE = "index.txt"
+_KEY_BYTES = 65  # sha256 hex digest + newline
+
+
+def text_key(text: str) -> str:
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+class EmbeddingCache:
+    def __init__(self, root: Union[str, Path], embedder_id: str, dim: int):
+        self.dim = int(dim)
+        self.path = Path(root) / slugify(f"{embedder_id}-{self.dim}")
+        self.path.mkdir(parents=True, exist_ok=True)
+        self._vectors_path = self.path / _VECTORS_FILE
+        self._index_path = self.path / _INDEX_FILE
+        self._row_bytes = 4 * self.dim
+        self._rows: Dict[str, int] = {}
+        self._n_rows = 0
+        self._mmap: Optional[np.memmap] = None
+        self.hits = 0
+        self.misses = 0
+        self._load_index()
+
+    def _load_index(self) -> None:
+        keys: List[str] = []
+        if self._index_path.exists():
+            with open(self._index_path, encoding="ascii") as f:
+                keys = [line[:-1] for line in f if line.endswith("\n")]
+        stored = self._vectors_path.stat().st_size if self._vectors_path.exists() else 0
+        keys = keys[: stored // self._row_bytes]
+        self._rows = {key: row for row, key in enumerate(keys)}
+        self._n_rows = len(keys)
+
+    def __len__(self) -> int:
+        return self._n_rows
+
+    def __contains__(self, key: str) -> bool:
+        return key in self._rows
+
+    @property
+    def vectors(self) -> np.ndarray:
+        """All cached rows, memory-mapped read-only (shape (len(self), dim))."""
+        if self._n_rows == 0:
+            return np.empty((0, self.dim), dtype=np.float32)
+        if self._mmap is None:
+            self._mmap = np.memmap(
+                self._vectors_path, dtype=np.float32, mode="r", shape=(self._n_rows, self.dim)
+            )
+        return self._mmap
+
+    def lookup(self, keys: List[str]) -> np.ndarray:
+        """Row of every key, -1 where missing."""
+        return np.fromiter((self._rows.get(k, -1) for k in keys), dtype=np.int64, count=len(keys))
+
+    def get(self, rows: np.ndarray) -> np.ndarray:
+        """
+        Cached rows by position. A contiguous ascending run (the usual case
+        when rerunning on an unchanged folder) is returned as a zero-copy
+        view of the memory map.
+        """
+        if len(rows) and np.array_equal(rows, np.arange(rows[0], rows[0] + len(rows))):
+            return self.vectors[rows[0] : rows[0] + len(rows)]
+        return np.asarray(self.vectors[rows])
+
+    def append(self, keys: List[str], vectors: np.ndarray) -> None:
+        vectors = np.ascontiguousarray(vectors, dtype=np.float32)
+        if vectors.shape != (len(keys), self.dim):
+            raise ValueError(
+                f"expected vectors of shape {(len(keys), self.dim)}, got {vectors.shape}"
+            )
+        new: Dict[str, int] = {}
+        for i, key in enumerate(keys):
+            if key not in self._rows:
+                new.setdefault(key, i)
+        if not new:
+            return
+
+        self._mmap = None
+        with open(self._vectors_path, "ab") as f:
+            f.truncate(self._n_rows * self._row_bytes)  # drop bytes of an interrupted append
+            f.write(vectors[list(new.values())].tobytes())
+        with open(self._index_path, "ab") as f:
+            f.truncate(self._n_rows * _KEY_BYTES)
+            f.write("".join(f"{key}\n" for key in new).encode("ascii"))
+        for key in new:
+            self._rows[key] = self._n_rows
+            self._n_rows += 1
+
+
+def embed_with_cache(
+    articles: List[ArticleRecord],
+    embed_fn: Callable[[List[ArticleRecord]], EmbeddingResult],
+    cache: EmbeddingCache,
+) -> EmbeddingResult:
+    """
+    Embed `articles`, calling `embed_fn` only for texts not in the cache and
+    storing their vectors. Vectors come back as float32, in article order.
+    Hits and misses count articles; a missed text shared by several
+    articles is still embedded once.
+    """
+    keys = [text_key(a.text_repr) for a in articles]
+    rows = cache.lookup(keys)
+    missing = np.flatnonzero(rows < 0)
+    cache.hits += len(keys) - len(missing)
+    cache.misses += len(missing)
+    stats: Dict[str, float] = {}
+
+    if len(missing):
+        # identical texts are embedded once
+        first: Dict[str, int] = {}
+        for i in missing.tolist():
+            first.setdefault(keys[i], i)
+        fresh = embed_fn([articles[i] for i in first.values()])
+        cache.append(list(first), fresh.vectors)
+        rows = cache.lookup(keys)
+        stats.update(fresh.stats)
+    stats.update(cache_hits=len(keys) - len(missing), cache_misses=len(missing))
+
+    return EmbeddingResult(
+        vectors=cache.get(rows), article_ids=[a.id for a in articles], stats=stats
+    )
@@ -0,0 +1,99 @@
+"""
+Out-of-core embedding: stream articles through an embedder into an
+np.memmap on disk, for corpora whose matrix does not fit in RAM.
+
+Only one chunk of vectors is in memory at a time. The returned
+EmbeddingResult is backed by the read-only memmap, and the exact neighbor
+search (`graph_builder.knn_search_blocked`) reads it tile by tile.
+"""
+
+import itertools
+from pathlib import Path
+from typing import Callable, Dict, Iterable, List, Optional, Union
+
+import numpy as np
+
+from paper_grouper.core.data import ArticleRecord, EmbeddingResult
+from paper_grouper.core.quantization import STORAGE_MODES, quantize_embeddings
+
+DEFAULT_CHUNK_SIZE = 1024
+
+_MIN_CAPACITY = 1024
+
+
+def _resize(path: Path, rows: int, dim: int, dtype: np.dtype) -> None:
+    with open(path, "ab") as f:
+        f.truncate(rows * dim * dtype.itemsize)
+
+
+def embed_to_memmap(
+    articles: Iterable[ArticleRecord],
+    embed_fn: Callable[[List[ArticleRecord]], EmbeddingResult],
+    path: Union[str, Path],
+    dim: int,
+    n_articles: Optional[int] = None,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+    storage: str = "float32",
+) -> EmbeddingResult:
+    """
+    Embed `articles` (any iterable, consumed once) `chunk_size` at a time,
+    writing each chunk in `storage` form (see quantization.STORAGE_MODES)
+    into the file at `path`, which is overwritten.
+
+    With `n_articles` the file is preallocated once; otherwise it grows
+    geometrically and is trimmed at the end.
+    """
+    if chunk_size < 1:
+        raise ValueError("chunk_size must be >= 1")
+    if storage not in STORAGE_MODES:
+        raise ValueError(f"unknown embedding storage {storage!r}; expected one of {STORAGE_MODES}")
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    dtype = np.dtype(np.int8 if storage == "int8" else storage)
+    path.write_bytes(b"")
+
+    capacity = n_articles if n_articles is not None else _MIN_CAPACITY
+    _resize(path, capacity, dim, dtype)
+    ids: List[str] = []
+    scales: List[np.ndarray] = []
+    stats: Dict[str, float] = {}
+    it = iter(articles)
+
+    while chunk := list(itertools.islice(it, chunk_size)):
+        part = quantize_embeddings(embed_fn(chunk), storage)
+        n_done, n_new = len(ids), len(chunk)
+        if n_done + n_new > capacity:
+            if n_articles is not None:
+                raise ValueError(f"more than n_articles={n_articles} articles were given")
+            capacity = max(2 * capacity, n_done + n_new)
+            _resize(path, capacity, dim, dtype)
+
+        out = np.memmap(
+            path, dtype=dtype, mode="r+", offset=n_done * dim * dtype.itemsize, shape=(n_new, dim)
+        )
+        out[:] = part.vectors
+        out.flush()
+        del out
+        ids.extend(a.id for a in chunk)
+        if part.scales is not None:
+            scales.append(part.scales)
+        for key, value in part.stats.items():
+            stats[key] = stats.get(key, 0) + value
+
+    n = len(ids)
+    _resize(path, n, dim, dtype)
+    vectors = (
+        np.memmap(path, dtype=dtype, mode="r", shape=(n, dim))
+        if n
+        else np.empty((0, dim), dtype=dtype)
+    )
+    if stats.get("seconds"):
+        stats["texts_per_s"] = stats["n_texts"] / stats["seconds"]
+    if storage == "int8":
+        return EmbeddingResult(
+            vectors=vectors,
+            article_ids=ids,
+            scales=np.concatenate(scales) if scales else np.empty(0, dtype=np.float32),
+            stats=stats,
+        )
+    return EmbeddingResult(vectors=vectors, article_ids=ids, stats=stats)
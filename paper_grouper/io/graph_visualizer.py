@@ -4,27 +4,30 @@ import matplotlib.pyplot as plt
 import networkx as nx
 
 from paper_grouper.core.data import ClusteringResult
+from paper_grouper.core.sparse_graph import CSRGraph
 
 
 def render_graph_png(
-    G: nx.Graph,
+    G: CSRGraph,
     clustering: ClusteringResult,
     output_root: Path,
     filename: str = "graph_overview.png",
 ) -> Path:
 
+    nx_graph = G.to_networkx()  # spring_layout / drawing need networkx
+
     color_map = []
     sizes = []
-    for node in G.nodes():
+    for node in nx_graph.nodes():
         cid = clustering.article_to_cluster.get(node, -1)
         color_map.append(cid)
         sizes.append(80 + 1200 * clustering.centrality.get(node, 0.0))
 
-    pos = nx.spring_layout(G, weight="weight", seed=42)
+    pos = nx.spring_layout(nx_graph, weight="weight", seed=42)
 
     plt.figure(figsize=(8, 6))
-    nx.draw_networkx_nodes(G, pos, node_color=color_map, node_size=sizes, alpha=0.8)
-    nx.draw_networkx_edges(G, pos, alpha=0.15, width=0.5)
+    nx.draw_networkx_nodes(nx_graph, pos, node_color=color_map, node_size=sizes, alpha=0.8)
+    nx.draw_networkx_edges(nx_graph, pos, alpha=0.15, width=0.5)
     plt.axis("off")
 
     out_path = output_root / filename
@@ -0,0 +1,135 @@
+"""
+Folder manifest written alongside each output, for incremental reruns.
+
+`manifest.json` lists every input PDF with its path, size, mtime, content
+hash (see metadata_cache.fingerprint), article id and extracted record,
+along with the identifiers of the extractor and embedder that produced
+them. `manifest_embeddings.npy` holds the vectors in the same order and in
+their storage form (`manifest_scales.npy` holds the int8 scales); both are
+absent for sparse embedders. A later run with the same identifiers diffs
+its scan against this manifest and only extracts/embeds added or modified
+PDFs.
+"""
+
+import json
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Union
+
+import numpy as np
+
+from paper_grouper.core.data import ArticleRecord
+
+from .metadata_cache import Fingerprint, fingerprint
+
+MANIFEST_FILE = "manifest.json"
+EMBEDDINGS_FILE = "manifest_embeddings.npy"
+SCALES_FILE = "manifest_scales.npy"
+_VERSION = 2
+
+
+@dataclass
+class ManifestEntry:
+    path: str
+    size: int
+    mtime_ns: int
+    content_hash: str
+    article_id: str
+
+
+@dataclass
+class Manifest:
+    entries: List[ManifestEntry]
+    records: List[ArticleRecord]  # aligned with entries
+    config: Dict[str, Any] = field(default_factory=dict)  # extractor/embedder identifiers
+    vectors: Optional[np.ndarray] = None  # aligned with entries, in storage form
+    scales: Optional[np.ndarray] = None  # int8 storage only
+
+
+@dataclass
+class ManifestDiff:
+    reused: Dict[int, int] = field(default_factory=dict)  # current index -> manifest index
+    added: List[int] = field(default_factory=list)  # current indices
+    modified: List[int] = field(default_factory=list)  # current indices
+    removed: List[str] = field(default_factory=list)  # paths
+
+    def summary(self) -> Dict[str, int]:
+        return {
+            "unchanged": len(self.reused),
+            "added": len(self.added),
+            "modified": len(self.modified),
+            "removed": len(self.removed),
+        }
+
+
+def scan_entries(
+    pdf_paths: List[str], fingerprints: Optional[Dict[str, Fingerprint]] = None
+) -> List[ManifestEntry]:
+    """Entries of `pdf_paths`, taking fingerprints already computed from `fingerprints`."""
+    fingerprints = {} if fingerprints is None else fingerprints
+    entries = []
+    for path in pdf_paths:
+        if path not in fingerprints:
+            fingerprints[path] = fingerprint(path)
+        size, mtime_ns, content_hash, name = fingerprints[path]
+        entries.append(ManifestEntry(path, size, mtime_ns, content_hash, article_id=name))
+    return entries
+
+
+def write_manifest(folder: Union[str, Path], manifest: Manifest) -> Path:
+    folder = Path(folder)
+    payload = {
+        "version": _VERSION,
+        "config": manifest.config,
+        "entries": [
+            {**asdict(entry), "record": asdict(record)}
+            for entry, record in zip(manifest.entries, manifest.records, strict=True)
+        ],
+    }
+    for name in (EMBEDDINGS_FILE, SCALES_FILE):
+        (folder / name).unlink(missing_ok=True)
+    if manifest.vectors is not None:
+        # saved as stored: a memmap is streamed to disk, int8 is not dequantized
+        np.save(folder / EMBEDDINGS_FILE, manifest.vectors)
+        if manifest.scales is not None:
+            np.save(folder / SCALES_FILE, manifest.scales)
+    path = folder / MANIFEST_FILE
+    path.write_text(json.dumps(payload, ensure_ascii=False), encoding="utf-8")
+    return path
+
+
+def read_manifest(folder: Union[str, Path]) -> Optional[Manifest]:
+    """The manifest in `folder`, or None if there is none (or an unknown version)."""
+    folder = Path(folder)
+    path = folder / MANIFEST_FILE
+    if not path.exists():
+        return None
+    payload = json.loads(path.read_text(encoding="utf-8"))
+    if payload.get("version") != _VERSION:
+        return None
+    entries, records = [], []
+    for item in payload["entries"]:
+        records.append(ArticleRecord(**item.pop("record")))
+        entries.append(ManifestEntry(**item))
+    vectors = scales = None
+    if (folder / EMBEDDINGS_FILE).exists():
+        vectors = np.load(folder / EMBEDDINGS_FILE, mmap_mode="r")
+        if (folder / SCALES_FILE).exists():
+            scales = np.load(folder / SCALES_FILE)
+    return Manifest(entries, records, payload["config"], vectors, scales)
+
+
+def diff_manifest(previous: Manifest, current: List[ManifestEntry]) -> ManifestDiff:
+    """Match the current scan against `previous` by path."""
+    by_path = {entry.path: i for i, entry in enumerate(previous.entries)}
+    diff = ManifestDiff()
+    for i, entry in enumerate(current):
+        j = by_path.pop(entry.path, None)
+        if j is None:
+            diff.added.append(i)
+        elif previous.entries[j] == entry:
+            diff.reused[i] = j
+        else:
+            diff.modified.append(i)
+    diff.removed = sorted(by_path)
+    return diff
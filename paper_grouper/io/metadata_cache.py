@@ -0,0 +1,170 @@
+"""
+SQLite cache of extracted article metadata, so unchanged PDFs are not
+re-parsed on every run.
+
+A row is keyed by the file's fingerprint and the extractor version. The
+fingerprint is (size, mtime_ns, fast content hash, file name). The hash
+covers the size and the first and last 64 KiB, so computing it never
+reads a whole PDF. The name is part of the key because records carry it
+(id, and the placeholder title). The optional first-page text is stored
+zlib-compressed.
+"""
+
+import hashlib
+import os
+import sqlite3
+import zlib
+from pathlib import Path
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Tuple, Union
+
+from paper_grouper.core.data import ArticleRecord
+from paper_grouper.core.metadata_extractor import EXTRACTOR_VERSION, batch_extract
+
+DEFAULT_METADATA_CACHE = Path.home() / ".cache" / "paper_grouper" / "metadata.sqlite"
+
+_EDGE_BYTES = 64 * 1024
+
+Fingerprint = Tuple[int, int, str, str]  # size, mtime_ns, fast hash, file name
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS records (
+    size INTEGER NOT NULL,
+    mtime_ns INTEGER NOT NULL,
+    fast_hash TEXT NOT NULL,
+    name TEXT NOT NULL,
+    extractor TEXT NOT NULL,
+    title TEXT NOT NULL,
+    abstract TEXT NOT NULL,
+    keywords TEXT NOT NULL,
+    year INTEGER,
+    text_repr TEXT NOT NULL,
+    first_page BLOB,
+    PRIMARY KEY (size, mtime_ns, fast_hash, name, extractor)
+)
+"""
+
+
+def fingerprint(pdf_path: str) -> Fingerprint:
+    st = os.stat(pdf_path)
+    h = hashlib.blake2b(st.st_size.to_bytes(8, "little"), digest_size=16)
+    with open(pdf_path, "rb") as f:
+        h.update(f.read(_EDGE_BYTES))
+        if st.st_size > 2 * _EDGE_BYTES:
+            f.seek(-_EDGE_BYTES, os.SEEK_END)
+            h.update(f.read(_EDGE_BYTES))
+        elif st.st_size > _EDGE_BYTES:
+            h.update(f.read())
+    return st.st_size, st.st_mtime_ns, h.hexdigest(), Path(pdf_path).name
+
+
+class MetadataCache:
+    def __init__(self, path: Union[str, Path], store_first_page: bool = True):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.store_first_page = store_first_page
+        self._conn = sqlite3.connect(self.path)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(_SCHEMA)
+
+    def close(self) -> None:
+        self._conn.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    def get(self, fp: Fingerprint, pdf_path: str) -> Optional[ArticleRecord]:
+        row = self._conn.execute(
+            "SELECT title, abstract, keywords, year, text_repr, first_page FROM records"
+            " WHERE size = ? AND mtime_ns = ? AND fast_hash = ? AND name = ? AND extractor = ?",
+            (*fp, EXTRACTOR_VERSION),
+        ).fetchone()
+        if row is None:
+            return None
+        title, abstract, keywords, year, text_repr, first_page = row
+        p = Path(pdf_path)
+        return ArticleRecord(
+            id=p.name,
+            src_path=str(p.resolve()),
+            title=title,
+            abstract=abstract,
+            keywords=keywords,
+            year=year,
+            text_repr=text_repr,
+            first_page_text=zlib.decompress(first_page).decode("utf-8") if first_page else "",
+        )
+
+    def put_many(self, items: List[Tuple[Fingerprint, ArticleRecord]]) -> None:
+        rows = [
+            (
+                *fp,
+                EXTRACTOR_VERSION,
+                rec.title,
+                rec.abstract,
+                rec.keywords,
+                rec.year,
+                rec.text_repr,
+                (
+                    zlib.compress(rec.first_page_text.encode("utf-8"))
+                    if self.store_first_page and rec.first_page_text
+                    else None
+                ),
+            )
+            for fp, rec in items
+        ]
+        with self._conn:
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO records VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)", rows
+            )
+
+
+def extract_with_cache(
+    pdf_paths: Iterable[str],
+    cache: MetadataCache,
+    extract_fn: Callable[[Iterable[str]], List[ArticleRecord]] = batch_extract,
+    fingerprints: Optional[Dict[str, Fingerprint]] = None,
+) -> Tuple[List[ArticleRecord], Dict[str, int]]:
+    """
+    Records in the order of `pdf_paths`, calling `extract_fn` only for PDFs
+    not in the cache and storing their records. Also returns this run's
+    statistics: hits, misses and bytes_saved (size of the PDFs not parsed).
+
+    `extract_fn` gets the misses as an iterable that looks paths up in the
+    cache as it is consumed, so a streamed `pdf_paths` (e.g. from
+    `file_scanner.iter_pdfs`) is extracted while it is still being produced.
+
+    Fingerprints already in `fingerprints` (path -> fingerprint) are not
+    recomputed; the ones computed here are added to it.
+    """
+    fingerprints = {} if fingerprints is None else fingerprints
+    paths: List[str] = []
+    fps: List[Fingerprint] = []
+    records: List[Optional[ArticleRecord]] = []
+
+    def misses() -> Iterator[str]:
+        for path in pdf_paths:
+            if path not in fingerprints:
+                fingerprints[path] = fingerprint(path)
+            fp = fingerprints[path]
+            paths.append(path)
+            fps.append(fp)
+            records.append(cache.get(fp, path))
+            if records[-1] is None:
+                yield path
+
+    fresh = extract_fn(misses())
+    missing = [i for i, rec in enumerate(records) if rec is None]
+    for i, rec in zip(missing, fresh, strict=True):
+        records[i] = rec
+    if missing:
+        cache.put_many([(fps[i], records[i]) for i in missing])
+
+    missing_set = set(missing)
+    stats = {
+        "hits": len(paths) - len(missing),
+        "misses": len(missing),
+        "bytes_saved": sum(fp[0] for i, fp in enumerate(fps) if i not in missing_set),
+    }
+    return records, stats
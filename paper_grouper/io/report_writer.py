@@ -10,6 +10,7 @@ def write_reports(
     clustering: ClusteringResult,
     articles: Dict[str, ArticleRecord],
     trials_info: Optional[List[AutoTuneTrialResult]] = None,
+    near_duplicates: Optional[List[List[str]]] = None,
 ) -> None:
 
     # JSON
@@ -28,14 +29,15 @@ def write_reports(
         }
         for art_id in members:
             a = articles[art_id]
-            cinfo["papers"].append(
-                {
-                    "id": a.id,
-                    "title": a.title,
-                    "year": a.year,
-                    "abstract_snippet": a.abstract[:400],
-                }
-            )
+            paper = {
+                "id": a.id,
+                "title": a.title,
+                "year": a.year,
+                "abstract_snippet": a.abstract[:400],
+            }
+            if a.aliases:
+                paper["aliases"] = a.aliases
+            cinfo["papers"].append(paper)
         data["clusters"].append(cinfo)
 
     if trials_info:
@@ -49,6 +51,9 @@ def write_reports(
             for t in trials_info
         ]
 
+    if near_duplicates:
+        data["near_duplicates"] = near_duplicates
+
     with open(json_path, "w", encoding="utf-8") as f:
         json.dump(data, f, ensure_ascii=False, indent=2)
 
@@ -67,4 +72,10 @@ def write_reports(
             for aid in ranked:
                 a = articles[aid]
                 f.write(f"- {a.title} ({a.year}) [{aid}]\n")
+                for alias in a.aliases:
+                    f.write(f"    duplicate: {alias}\n")
             f.write("\n")
+        if near_duplicates:
+            f.write("=== Near-duplicate groups ===\n")
+            for group in near_duplicates:
+                f.write(f"- {' ~ '.join(group)}\n")
@@ -0,0 +1,55 @@
+"""
+Persist a fitted TF-IDF vocabulary/IDF so later runs embed into the same
+space (see core.embedder.embed_articles_tfidf).
+
+One .npz file holds the terms (in column order), the IDF weights and the
+vectorizer parameters actually used, as JSON. No pickle is involved, so
+vectorizers with callable parameters (custom tokenizer, analyzer, ...)
+cannot be stored.
+"""
+
+import json
+from pathlib import Path
+from typing import Union
+
+import numpy as np
+from sklearn.feature_extraction.text import TfidfVectorizer
+
+
+def _stored_params(vectorizer: TfidfVectorizer) -> dict:
+    """Every constructor parameter except dtype (always float32), as JSON values."""
+    params = {}
+    for name, value in vectorizer.get_params().items():
+        if name == "dtype":
+            continue
+        if callable(value):
+            raise ValueError(f"TF-IDF parameter {name!r} is callable and cannot be stored")
+        params[name] = sorted(value) if isinstance(value, (set, frozenset)) else value
+    return params
+
+
+def save_tfidf(vectorizer: TfidfVectorizer, path: Union[str, Path]) -> Path:
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    terms = sorted(vectorizer.vocabulary_, key=vectorizer.vocabulary_.get)
+    params = _stored_params(vectorizer)
+    with open(path, "wb") as f:
+        np.savez(
+            f,
+            terms=np.array(terms, dtype=str),
+            idf=vectorizer.idf_.astype(np.float64),
+            params=np.array(json.dumps(params)),
+        )
+    return path
+
+
+def load_tfidf(path: Union[str, Path]) -> TfidfVectorizer:
+    with np.load(path, allow_pickle=False) as data:
+        params = json.loads(str(data["params"]))
+        terms = data["terms"].tolist()
+        idf = data["idf"]
+    params["ngram_range"] = tuple(params["ngram_range"])
+    vectorizer = TfidfVectorizer(**params, dtype=np.float32)
+    vectorizer.vocabulary_ = {term: i for i, term in enumerate(terms)}
+    vectorizer.idf_ = idf
+    return vectorizer
@@ -1,5 +1,6 @@
 from __future__ import annotations
 
+import os
 import traceback
 
 from PySide6.QtCore import Qt
@@ -7,6 +8,7 @@ from PySide6.QtGui import QPixmap, QTextCursor
 from PySide6.QtWidgets import (
     QApplication,
     QCheckBox,
+    QComboBox,
     QDoubleSpinBox,
     QFileDialog,
     QFormLayout,
@@ -88,9 +90,58 @@ class MainWindow(QMainWindow):
         self.rename_checkbox = QCheckBox("Renomear PDFs usando o título detectado")
         self.rename_checkbox.setChecked(True)
 
+        self.recursive_checkbox = QCheckBox("Incluir PDFs de subpastas")
+        self.recursive_checkbox.setChecked(False)
+
+        self.embedder_combo = QComboBox()
+        self.embedder_combo.addItem("Leve (hashing, rápido, sem torch)", "light")
+        self.embedder_combo.addItem("Semântico (sentence-transformers)", "model")
+        self.embedder_combo.addItem("TF-IDF esparso (corpora grandes, sem torch)", "tfidf")
+        self.embedder_combo.setToolTip("Como o texto de cada artigo vira um vetor.")
+
+        self.near_dup_combo = QComboBox()
+        self.near_dup_combo.addItem("Quase duplicatas: ignorar", "off")
+        self.near_dup_combo.addItem("Quase duplicatas: só apontar no relatório", "flag")
+        self.near_dup_combo.addItem("Quase duplicatas: juntar em um artigo", "merge")
+        self.near_dup_combo.setToolTip(
+            "Versões quase idênticas do mesmo artigo (preprint e versão final, por exemplo)."
+        )
+
+        self.cache_checkbox = QCheckBox("Reaproveitar resultados já calculados (cache)")
+        self.cache_checkbox.setChecked(False)
+        self.cache_checkbox.setToolTip(
+            f"Guarda metadados em {app_controller.DEFAULT_METADATA_CACHE} e vetores em "
+            f"{app_controller.DEFAULT_CACHE_DIR}; nas próximas execuções só artigos "
+            "novos ou alterados são processados."
+        )
+
+        self.extract_workers_spin = QSpinBox()
+        self.extract_workers_spin.setMinimum(1)
+        self.extract_workers_spin.setMaximum(64)
+        self.extract_workers_spin.setValue(1)
+        self.extract_workers_spin.setToolTip(
+            "Quantos processos leem os PDFs em paralelo (1 = um por vez)."
+        )
+        extract_row = QHBoxLayout()
+        extract_row.addWidget(QLabel("Processos para ler PDFs:"))
+        extract_row.addWidget(self.extract_workers_spin)
+
+        self.previous_edit = QLineEdit()
+        self.previous_edit.setPlaceholderText("Saída anterior (opcional, execução incremental)")
+        self.previous_edit.setToolTip(
+            "Pasta gerada por uma execução anterior sobre a mesma entrada: só PDFs "
+            "novos ou alterados desde então são lidos e vetorizados."
+        )
+
         general_box = QGroupBox("Opções gerais")
         general_layout = QVBoxLayout()
         general_layout.addWidget(self.rename_checkbox)
+        general_layout.addWidget(self.recursive_checkbox)
+        general_layout.addWidget(self.embedder_combo)
+        general_layout.addWidget(self.near_dup_combo)
+        general_layout.addWidget(self.cache_checkbox)
+        general_layout.addLayout(extract_row)
+        general_layout.addWidget(self.previous_edit)
         general_box.setLayout(general_layout)
 
         # Monta a barra superior
@@ -174,12 +225,43 @@ class MainWindow(QMainWindow):
         self.workers_spin.setValue(4)
         self.workers_spin.setToolTip("Quantas configurações testar em paralelo no modo automático.")
 
+        self.strategy_combo = QComboBox()
+        self.strategy_combo.addItem("Grade completa (testa tudo)", "grid")
+        self.strategy_combo.addItem("Busca aleatória", "random")
+        self.strategy_combo.addItem("Successive halving (subamostras)", "halving")
+        self.strategy_combo.addItem("Bayesiana (TPE)", "tpe")
+        self.strategy_combo.setToolTip(
+            "Como escolher as combinações a testar. A grade completa testa todas; "
+            "as demais chegam perto do melhor score testando bem menos."
+        )
+
+        self.max_trials_spin = QSpinBox()
+        self.max_trials_spin.setMinimum(0)
+        self.max_trials_spin.setMaximum(10000)
+        self.max_trials_spin.setValue(0)
+        self.max_trials_spin.setSpecialValueText("sem limite")
+        self.max_trials_spin.setToolTip("Número máximo de combinações avaliadas (0 = sem limite).")
+
+        self.time_budget_spin = QSpinBox()
+        self.time_budget_spin.setMinimum(0)
+        self.time_budget_spin.setMaximum(24 * 3600)
+        self.time_budget_spin.setValue(0)
+        self.time_budget_spin.setSuffix(" s")
+        self.time_budget_spin.setSpecialValueText("sem limite")
+        self.time_budget_spin.setToolTip(
+            "Tempo máximo da busca, em segundos (0 = sem limite). "
+            "Ao estourar, fica o melhor resultado encontrado até ali."
+        )
+
         auto_form_layout.addRow("Lista de k (separado por vírgula):", self.k_values_edit)
         auto_form_layout.addRow("Lista de resoluções Louvain:", self.resolutions_edit)
         auto_form_layout.addRow(
             "Lista de tamanhos mínimos de cluster:", self.min_cluster_values_edit
         )
         auto_form_layout.addRow("Trabalhadores paralelos:", self.workers_spin)
+        auto_form_layout.addRow("Estratégia de busca:", self.strategy_combo)
+        auto_form_layout.addRow("Máximo de tentativas:", self.max_trials_spin)
+        auto_form_layout.addRow("Tempo máximo:", self.time_budget_spin)
 
         auto_form_box.setLayout(auto_form_layout)
 
@@ -281,6 +363,23 @@ class MainWindow(QMainWindow):
         self.result_view.setTextCursor(cursor)
         self.result_view.ensureCursorVisible()
 
+    def _pipeline_options(self) -> dict:
+        return {
+            "embedder": self.embedder_combo.currentData(),
+            "cache_dir": (
+                str(app_controller.DEFAULT_CACHE_DIR) if self.cache_checkbox.isChecked() else None
+            ),
+            "extract_workers": self.extract_workers_spin.value(),
+            "metadata_cache": (
+                str(app_controller.DEFAULT_METADATA_CACHE)
+                if self.cache_checkbox.isChecked()
+                else None
+            ),
+            "incremental_from": self.previous_edit.text().strip() or None,
+            "recursive": self.recursive_checkbox.isChecked(),
+            "near_duplicates": self.near_dup_combo.currentData(),
+        }
+
     def _clear_result(self):
         self.result_view.clear()
         self.graph_label.setText("O grafo aparecerá aqui após a execução.")
@@ -314,6 +413,7 @@ class MainWindow(QMainWindow):
                 resolution=resolution,
                 min_cluster_size=min_cluster,
                 rename_with_title=rename_flag,
+                **self._pipeline_options(),
             )
             self._render_result(result, mode="manual")
         except Exception:
@@ -356,6 +456,8 @@ class MainWindow(QMainWindow):
             resolutions = self._parse_float_list(self.resolutions_edit.text())
             min_cluster_values = self._parse_int_list(self.min_cluster_values_edit.text())
             workers = self.workers_spin.value()
+            max_trials = self.max_trials_spin.value() or None
+            time_budget = self.time_budget_spin.value() or None
 
             result = app_controller.run_auto(
                 input_dir=input_dir,
@@ -365,6 +467,10 @@ class MainWindow(QMainWindow):
                 min_cluster_sizes=min_cluster_values,
                 max_workers=workers,
                 rename_with_title=rename_flag,
+                search_strategy=self.strategy_combo.currentData(),
+                max_trials=max_trials,
+                time_budget=time_budget,
+                **self._pipeline_options(),
             )
             self._render_result(result, mode="auto")
         except Exception:
@@ -400,6 +506,45 @@ class MainWindow(QMainWindow):
         self._append_result(f"- Modularity: {summary.get('modularity')}")
         self._append_result(f"- Balance score: {summary.get('balance_score')}")
 
+        incremental_stats = result_dict.get("incremental_stats")
+        if incremental_stats is not None:
+            self._append_result(
+                f"- Execução incremental: {incremental_stats['unchanged']} PDFs inalterados,"
+                f" {incremental_stats['added']} novos, {incremental_stats['modified']} alterados,"
+                f" {incremental_stats['removed']} removidos"
+            )
+        if result_dict.get("incremental_rebuild"):
+            self._append_result(
+                "- Execução incremental: extrator ou embedder mudou, todos os PDFs reprocessados"
+            )
+        duplicates = result_dict.get("duplicates") or {}
+        if duplicates:
+            n_copies = sum(len(copies) for copies in duplicates.values())
+            self._append_result(
+                f"- Cópias idênticas ignoradas: {n_copies} (de {len(duplicates)} artigos)"
+            )
+        near_dups = result_dict.get("near_duplicates") or []
+        if near_dups:
+            self._append_result(f"- Grupos de quase duplicatas: {len(near_dups)}")
+        extraction_stats = result_dict.get("extraction_stats") or {}
+        if extraction_stats:
+            self._append_result(
+                f"- PDFs reaproveitados do cache: {extraction_stats['hits']}"
+                f" (lidos: {extraction_stats['misses']},"
+                f" {extraction_stats['bytes_saved'] / 2**20:.1f} MB sem reabrir)"
+            )
+        emb_stats = result_dict.get("embedding_stats") or {}
+        if "cache_hits" in emb_stats:
+            self._append_result(
+                f"- Embeddings reaproveitados do cache: {emb_stats['cache_hits']}"
+                f" (novos: {emb_stats['cache_misses']})"
+            )
+        if emb_stats.get("texts_per_s"):
+            self._append_result(
+                f"- Vazão do modelo: {emb_stats['texts_per_s']:.1f} textos/s"
+                f" ({emb_stats['n_texts']} textos em {emb_stats['seconds']:.1f}s)"
+            )
+
         if mode == "auto":
             best_cfg = result_dict.get("best_cfg", {})
             self._append_result("\nMelhor configuração encontrada (auto-tune):")
@@ -466,6 +611,12 @@ class MainWindow(QMainWindow):
 
 
 def main():
+    # opt-in: com PAPER_GROUPER_MODEL_DIR apontando para um modelo local, ele
+    # começa a carregar em segundo plano enquanto a janela abre
+    model_dir = os.environ.get("PAPER_GROUPER_MODEL_DIR")
+    if model_dir:
+        app_controller.warm_up_model(model_dir)
+
     app = QApplication([])
     win = MainWindow()
     win.show()
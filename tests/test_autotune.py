@@ -0,0 +1,163 @@
+import concurrent.futures
+
+import numpy as np
+import pytest
+
+from paper_grouper.core import autotune
+from paper_grouper.core.autotune import _evaluate_k_group, run_autotune
+from paper_grouper.core.data import ArticleRecord, EmbeddingResult
+from paper_grouper.core.graph_builder import compute_neighbor_table
+
+
+def _toy_corpus(n_topics: int = 4, per_topic: int = 15, seed: int = 0, noise: float = 0.1):
+    rng = np.random.default_rng(seed)
+    centers = rng.normal(size=(n_topics, 16))
+    articles, vectors = [], []
+    for t in range(n_topics):
+        for i in range(per_topic):
+            aid = f"t{t}_{i}.pdf"
+            title = f"topic{t} paper {i}"
+            articles.append(
+                ArticleRecord(
+                    id=aid,
+                    src_path=f"/tmp/{aid}",
+                    title=title,
+                    abstract="",
+                    keywords="",
+                    year=None,
+                    text_repr=title,
+                )
+            )
+            vectors.append(centers[t] + noise * rng.normal(size=16))
+    emb = EmbeddingResult(vectors=np.vstack(vectors), article_ids=[a.id for a in articles])
+    return articles, emb
+
+
+def test_run_autotune_picks_best_and_reports_every_trial():
+    articles, emb = _toy_corpus()
+    best_cr, best_cfg, trials = run_autotune(
+        articles=articles,
+        emb=emb,
+        k_values=[4, 6],
+        resolutions=[0.8, 1.0],
+        min_cluster_sizes=[2, 3],
+        max_workers=2,
+    )
+    assert len(trials) == 8
+    assert best_cr.score_final == max(t.score_final for t in trials)
+    assert best_cfg["k"] in (4, 6)
+    assert set(best_cr.article_to_cluster) == set(emb.article_ids)
+    assert set(best_cr.cluster_labels) == set(best_cr.clusters)
+
+
+def test_run_autotune_is_reproducible_with_warm_start():
+    articles, emb = _toy_corpus(seed=1)
+    kwargs = dict(
+        articles=articles,
+        emb=emb,
+        k_values=[4, 6],
+        resolutions=[0.8, 1.0, 1.2],
+        min_cluster_sizes=[2],
+        max_workers=3,
+        louvain_backend="native",
+    )
+    _, cfg_a, trials_a = run_autotune(**kwargs)
+    _, cfg_b, trials_b = run_autotune(**kwargs)
+    assert cfg_a == cfg_b
+    assert [(t.params, t.score_final) for t in trials_a] == [
+        (t.params, t.score_final) for t in trials_b
+    ]
+
+
+def test_run_autotune_budgeted_strategies_return_a_full_data_best():
+    articles, emb = _toy_corpus(seed=2)
+    for strategy in ("random", "halving", "tpe"):
+        best_cr, best_cfg, trials = run_autotune(
+            articles=articles,
+            emb=emb,
+            k_values=[4, 6],
+            resolutions=[0.8, 1.0],
+            min_cluster_sizes=[2, 3],
+            max_workers=2,
+            strategy=strategy,
+            max_trials=3,
+        )
+        assert 1 <= len(trials) <= 3
+        assert set(best_cr.article_to_cluster) == set(emb.article_ids)
+        assert best_cr.score_final >= max(t.score_final for t in trials)
+
+
+def test_k_group_shares_one_louvain_run_across_min_cluster_sizes():
+    _, emb = _toy_corpus(seed=3)
+    table = compute_neighbor_table(emb, k_max=6)
+    configs = [{"k": 6, "resolution": r, "min_cluster_size": m} for r in (0.8, 1.2) for m in (2, 4)]
+    grouped = _evaluate_k_group(configs, table, louvain_backend="native", seed=0, warm_start=False)
+    assert sorted(str(cfg) for cfg, _, _ in grouped) == sorted(str(cfg) for cfg in configs)
+    for cfg, summary, labels in grouped:
+        [(_, single_summary, single_labels)] = _evaluate_k_group(
+            [cfg], table, louvain_backend="native", seed=0, warm_start=False
+        )
+        assert summary == single_summary
+        np.testing.assert_array_equal(labels, single_labels)
+
+
+def test_tasks_follow_fixed_warm_start_chains(monkeypatch):
+    submitted = []
+
+    class RecordingPool(concurrent.futures.ThreadPoolExecutor):
+        # one thread: every thread would re-run the initializer over the shared state
+        def __init__(self, max_workers, **kwargs):
+            super().__init__(max_workers=1, **kwargs)
+
+        def submit(self, fn, *args, **kwargs):
+            submitted.append(args[0])
+            return super().submit(fn, *args, **kwargs)
+
+    monkeypatch.setattr(autotune.concurrent.futures, "ProcessPoolExecutor", RecordingPool)
+    articles, emb = _toy_corpus(seed=4)
+    kwargs = dict(
+        articles=articles,
+        emb=emb,
+        k_values=[4, 6],
+        resolutions=[0.6, 0.8, 1.0, 1.2],
+        min_cluster_sizes=[2, 3],
+        max_workers=4,
+        louvain_backend="native",
+    )
+    # chains of WARM_CHAIN_LENGTH=3 resolutions: [1.2, 1.0, 0.8] and [0.6] per k
+    for warm_start, n_tasks in ((True, 4), (False, 8)):
+        submitted.clear()
+        _, _, trials = run_autotune(warm_start=warm_start, **kwargs)
+        assert len(trials) == 16
+        assert len(submitted) == n_tasks
+        # a task never mixes k values and keeps each resolution's sizes together
+        for task in submitted:
+            assert len({cfg["k"] for cfg in task}) == 1
+            assert len(task) % 2 == 0
+
+
+def test_scores_do_not_depend_on_the_worker_count_or_strategy():
+    # noisy enough that a warm start changes some partitions
+    articles, emb = _toy_corpus(n_topics=6, per_topic=25, seed=3, noise=0.6)
+    kwargs = dict(
+        articles=articles,
+        emb=emb,
+        k_values=[4, 6],
+        resolutions=[0.6, 0.8, 1.0, 1.2, 1.4],
+        min_cluster_sizes=[2],
+        louvain_backend="native",
+    )
+    results = [run_autotune(max_workers=w, **kwargs) for w in (1, 4)]
+    (_, cfg_1, trials_1), (_, cfg_4, trials_4) = results
+    assert cfg_1 == cfg_4
+    scores = {str(t.params): t.score_final for t in trials_1}
+    assert scores == {str(t.params): t.score_final for t in trials_4}
+
+    _, _, tpe_trials = run_autotune(max_workers=2, strategy="tpe", max_trials=5, **kwargs)
+    assert all(scores[str(t.params)] == t.score_final for t in tpe_trials)
+
+
+def test_empty_config_space_is_rejected():
+    articles, emb = _toy_corpus()
+    with pytest.raises(ValueError, match="no autotune configurations"):
+        run_autotune(articles, emb, k_values=[4], resolutions=[], min_cluster_sizes=[2])
@@ -0,0 +1,47 @@
+import numpy as np
+
+from paper_grouper.core.cluster_postprocess import finalize_clustering, score_clustering
+from paper_grouper.core.data import ArticleRecord, EmbeddingResult
+from paper_grouper.core.graph_builder import build_knn_graph
+
+
+def _setup():
+    rng = np.random.default_rng(0)
+    ids = [f"p{i}" for i in range(20)]
+    articles = [
+        ArticleRecord(
+            id=i,
+            src_path="",
+            title=f"graph learning {i}",
+            abstract="",
+            keywords="",
+            year=None,
+            text_repr="",
+        )
+        for i in ids
+    ]
+    G = build_knn_graph(EmbeddingResult(vectors=rng.normal(size=(20, 5)), article_ids=ids), k=3)
+    raw = {aid: i % 2 for i, aid in enumerate(ids)}
+    return G, articles, raw
+
+
+def test_enrichment_is_deferred_until_first_access():
+    G, articles, raw = _setup()
+    calls = []
+    cr = finalize_clustering(raw, G, articles, min_cluster_size=2, alpha=1.0, beta=0.5, gamma=0.5)
+    enricher = cr.enricher
+    cr.enricher = lambda obj: (calls.append(1), enricher(obj))
+
+    assert calls == []
+    assert set(cr.centrality) == set(raw)
+    assert cr.cluster_labels[0].startswith("graph / learning")
+    assert calls == [1]
+
+
+def test_scoring_phase_matches_finalize_metrics():
+    G, articles, raw = _setup()
+    cheap = score_clustering(raw, G, min_cluster_size=2, alpha=1.0, beta=0.5, gamma=0.5)
+    full = finalize_clustering(raw, G, articles, min_cluster_size=2, alpha=1.0, beta=0.5, gamma=0.5)
+    assert cheap.cluster_labels is None and cheap.centrality is None
+    assert cheap.score_final == full.score_final
+    assert cheap.article_to_cluster == full.article_to_cluster
@@ -0,0 +1,101 @@
+import json
+
+from paper_grouper import app_controller
+from paper_grouper.io import dedup
+from paper_grouper.io.dedup import DuplicateFilter, dedupe_pdfs
+
+
+def _write(folder, name, data):
+    path = folder / name
+    path.write_bytes(data)
+    return str(path)
+
+
+def test_only_byte_identical_same_size_files_collapse(tmp_path, monkeypatch):
+    body = b"%PDF-1.4\n" + bytes(range(256)) * 50
+    paths = [
+        _write(tmp_path, "c.pdf", body),
+        _write(tmp_path, "b.pdf", body[:-1] + b"X"),  # same size, different bytes
+        _write(tmp_path, "a.pdf", body),
+        _write(tmp_path, "d.pdf", body + b"tail"),
+        _write(tmp_path, "e.pdf", b""),
+        _write(tmp_path, "f.pdf", b""),
+    ]
+
+    hashed = []
+    real_hash = dedup.content_hash
+    monkeypatch.setattr(
+        dedup,
+        "content_hash",
+        lambda path, chunk_size: hashed.append(path) or real_hash(path, chunk_size),
+    )
+    unique, aliases = dedupe_pdfs(paths, max_workers=2, chunk_size=1000)
+
+    # the smallest path is kept, wherever it is listed
+    assert unique == [paths[1], paths[2], paths[3], paths[4]]
+    assert aliases == {paths[2]: [paths[0]], paths[4]: [paths[5]]}
+    assert paths[3] not in hashed  # unique size: never read
+
+
+def test_filter_admits_copies_only_when_they_sort_first(tmp_path):
+    body = b"%PDF-1.4\n" + bytes(range(256)) * 50
+    b, c, a, d = (
+        _write(tmp_path, "b.pdf", body),
+        _write(tmp_path, "c.pdf", body),
+        _write(tmp_path, "a.pdf", body),
+        _write(tmp_path, "d.pdf", body[:-1] + b"X"),
+    )
+    dup_filter = DuplicateFilter(chunk_size=1000)
+    assert [dup_filter.admit(p) for p in (b, c, a, d)] == [True, False, True, True]
+    assert dup_filter.aliases() == {a: [b, c]}
+
+
+def test_scan_never_extracts_copies_of_an_earlier_file(tmp_path, monkeypatch):
+    in_dir = tmp_path / "in"
+    in_dir.mkdir()
+    paths = [_write(in_dir, f"paper{i}.pdf", f"%PDF-1.4\n{i % 3}".encode()) for i in range(6)]
+    extracted = []
+    real_extract = app_controller.batch_extract
+
+    def extract(pdfs, **kwargs):
+        return real_extract((extracted.append(p) or p for p in pdfs), **kwargs)
+
+    monkeypatch.setattr(app_controller, "iter_pdfs", lambda *args, **kwargs: iter(paths))
+    monkeypatch.setattr(app_controller, "batch_extract", extract)
+    result = app_controller.run_manual(
+        str(in_dir),
+        str(tmp_path / "out"),
+        k=1,
+        resolution=1.0,
+        min_cluster_size=1,
+        rename_with_title=False,
+    )
+    assert extracted == paths[:3]
+    assert result["duplicates"] == {f"paper{i}.pdf": [paths[i + 3]] for i in range(3)}
+
+
+def test_duplicates_become_one_node_with_aliases_in_report(tmp_path):
+    in_dir = tmp_path / "in"
+    in_dir.mkdir()
+    for i in range(5):
+        _write(in_dir, f"paper{i}.pdf", f"%PDF-1.4\n{i}".encode())
+    copy = _write(in_dir, "paper1 (copy).pdf", b"%PDF-1.4\n1")
+    original = str(in_dir / "paper1.pdf")
+
+    result = app_controller.run_manual(
+        str(in_dir),
+        str(tmp_path / "out"),
+        k=2,
+        resolution=1.0,
+        min_cluster_size=1,
+        rename_with_title=False,
+    )
+    # " " sorts before ".", so the copy's path is the smallest and is kept
+    assert copy < original
+    assert result["duplicates"] == {"paper1 (copy).pdf": [original]}
+    assert len(result["articles"]) == 5
+
+    summary = json.loads((tmp_path / "out" / "clusters_summary.json").read_text())
+    papers = {p["id"]: p for c in summary["clusters"] for p in c["papers"]}
+    assert papers["paper1 (copy).pdf"]["aliases"] == [original]
+    assert "aliases" not in papers["paper0.pdf"]
@@ -0,0 +1,51 @@
+import numpy as np
+import pytest
+
+from paper_grouper.core.ann_index import neighbor_recall
+from paper_grouper.core.data import EmbeddingResult
+from paper_grouper.core.dim_reduction import REDUCTION_METHODS, reduce_dimensions
+from paper_grouper.core.graph_builder import knn_search_blocked
+from paper_grouper.core.quantization import quantize_embeddings
+
+
+def _low_rank(n=1200, dim=96, rank=12, seed=0):
+    rng = np.random.default_rng(seed)
+    centers = rng.normal(size=(20, rank))
+    latent = centers[rng.integers(20, size=n)] + 0.5 * rng.normal(size=(n, rank))
+    vectors = latent @ rng.normal(size=(rank, dim)) + 0.05 * rng.normal(size=(n, dim))
+    return EmbeddingResult(vectors=vectors, article_ids=[str(i) for i in range(n)])
+
+
+@pytest.mark.parametrize("method", ["svd", "pca"])
+def test_svd_and_pca_keep_neighbors_of_low_rank_embeddings(method):
+    emb = _low_rank()
+    reduced = reduce_dimensions(emb, 16, method=method, sample_size=500, batch_size=100)
+    assert reduced.vectors.shape == (1200, 16) and reduced.vectors.dtype == np.float32
+    exact, _ = knn_search_blocked(emb.vectors, k=10)
+    approx, _ = knn_search_blocked(reduced.vectors, k=10)
+    assert neighbor_recall(approx, exact) >= 0.9
+
+
+@pytest.mark.parametrize("method", REDUCTION_METHODS)
+def test_batching_and_int8_input(method):
+    emb = quantize_embeddings(_low_rank(n=300), "int8")
+    one = reduce_dimensions(emb, 8, method=method, batch_size=1000)
+    many = reduce_dimensions(emb, 8, method=method, batch_size=7)
+    assert one.vectors.dtype == np.int8 and one.scales.shape == (300,)
+    np.testing.assert_array_equal(one.vectors, many.vectors)
+    np.testing.assert_allclose(one.scales, many.scales, rtol=1e-5)
+    assert reduce_dimensions(emb, 96, method=method) is emb
+
+
+def test_memmap_input_is_reduced_into_a_memmap(tmp_path):
+    dense = quantize_embeddings(_low_rank(n=300), "float16")
+    vectors = np.memmap(tmp_path / "emb.dat", dtype=np.float16, mode="w+", shape=(300, 96))
+    vectors[:] = dense.vectors
+    emb = EmbeddingResult(vectors=vectors, article_ids=dense.article_ids)
+
+    reduced = reduce_dimensions(emb, 8, batch_size=64)
+    assert isinstance(reduced.vectors, np.memmap)
+    assert reduced.vectors.dtype == np.float16 and reduced.vectors.shape == (300, 8)
+    assert str(reduced.vectors.filename) == str(tmp_path / "emb.8d.dat")
+    in_memory = reduce_dimensions(dense, 8, batch_size=64)
+    np.testing.assert_array_equal(reduced.vectors, in_memory.vectors)
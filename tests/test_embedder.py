@@ -0,0 +1,107 @@
+import threading
+
+import numpy as np
+import pytest
+
+from paper_grouper.core import embedder
+from paper_grouper.core.data import ArticleRecord
+from paper_grouper.core.embedder import _text_to_vec_hash, embed_articles_model, hash_embed_sparse
+
+
+def test_hash_embed_sparse_is_bit_identical_to_per_text_hashing():
+    texts = [
+        "Graph neural networks for graph learning",
+        "",
+        "Ação e reação: ÁGUA água",
+        "the the the the a",
+        "token " * 300,
+    ]
+    for dim in (8, 64):
+        expected = np.vstack([_text_to_vec_hash(t, dim=dim) for t in texts])
+        got = hash_embed_sparse(texts, dim=dim)
+        assert got.shape == (len(texts), dim)
+        assert np.array_equal(got.toarray(), expected)
+
+
+class _FakeModel:
+    """Stands in for SentenceTransformer: vector = [n_words, first char code]."""
+
+    def __init__(self):
+        self.batches = []
+
+    def encode(self, texts, batch_size, convert_to_numpy, show_progress_bar):
+        self.batches.append([len(t.split()) for t in texts])
+        return np.array([[len(t.split()), ord(t[0])] for t in texts], dtype=np.float32)
+
+
+def test_embed_articles_model_buckets_by_length_and_keeps_order():
+    texts = ["a b c", "b", "c d e f g", "d e", "e f g h", "f"]
+    articles = [
+        ArticleRecord(
+            id=str(i), src_path="", title="", abstract="", keywords="", year=None, text_repr=t
+        )
+        for i, t in enumerate(texts)
+    ]
+    model = _FakeModel()
+    emb = embed_articles_model(articles, batch_size=2, model=model)
+
+    assert model.batches == [[5, 4], [3, 2], [1, 1]]
+    expected = [[len(t.split()), ord(t[0])] for t in texts]
+    np.testing.assert_array_equal(emb.vectors, expected)
+    assert emb.article_ids == [a.id for a in articles]
+    assert emb.stats["n_texts"] == 6 and emb.stats["n_batches"] == 3
+
+
+def test_warm_up_loads_in_background_and_run_waits_for_it(monkeypatch):
+    release = threading.Event()
+    loads = []
+
+    def slow_load(model_dir=None):
+        loads.append(model_dir)
+        release.wait(5)
+        return _FakeModel()
+
+    monkeypatch.setattr(embedder, "_load_model", slow_load)
+    monkeypatch.setattr(embedder, "_model_cache", None)
+    monkeypatch.setattr(embedder, "_model_error", None)
+    monkeypatch.setattr(embedder, "_model_ready", threading.Event())
+    monkeypatch.setattr(embedder, "_warmup_thread", None)
+    monkeypatch.setattr(embedder, "_model_dir", None)
+
+    thread = embedder.warm_up_model("/models/minilm")
+    assert embedder.warm_up_model("/models/minilm") is thread
+    assert not embedder.wait_for_model(timeout=0.05)
+    assert not embedder.model_ready()
+
+    release.set()
+    assert embedder.wait_for_model(timeout=5)
+    article = ArticleRecord(
+        id="a", src_path="", title="", abstract="", keywords="", year=None, text_repr="x y"
+    )
+    emb = embedder.embed_articles_model([article])
+    np.testing.assert_array_equal(emb.vectors, [[2, ord("x")]])
+    assert loads == ["/models/minilm"]
+
+
+def test_failed_warm_up_is_raised_instead_of_loading_another_model(monkeypatch):
+    loads = []
+
+    def broken_load(model_dir=None):
+        loads.append(model_dir)
+        raise OSError("no model here")
+
+    monkeypatch.setattr(embedder, "_load_model", broken_load)
+    monkeypatch.setattr(embedder, "_model_cache", None)
+    monkeypatch.setattr(embedder, "_model_error", None)
+    monkeypatch.setattr(embedder, "_model_ready", threading.Event())
+    monkeypatch.setattr(embedder, "_warmup_thread", None)
+    monkeypatch.setattr(embedder, "_model_dir", None)
+
+    embedder.warm_up_model("/models/missing").join(5)
+    article = ArticleRecord(
+        id="a", src_path="", title="", abstract="", keywords="", year=None, text_repr="x y"
+    )
+    with pytest.raises(RuntimeError) as excinfo:
+        embedder.embed_articles_model([article])
+    assert isinstance(excinfo.value.__cause__, OSError)
+    assert loads == ["/models/missing"]
@@ -0,0 +1,77 @@
+import numpy as np
+
+from paper_grouper.core.data import ArticleRecord
+from paper_grouper.core.embedder import embed_articles_light
+from paper_grouper.io.embedding_cache import EmbeddingCache, embed_with_cache
+
+
+def _article(aid: str, text: str) -> ArticleRecord:
+    return ArticleRecord(
+        id=aid, src_path=aid, title=text, abstract="", keywords="", year=None, text_repr=text
+    )
+
+
+class _CountingEmbedder:
+    def __init__(self):
+        self.seen = []
+
+    def __call__(self, articles):
+        self.seen.extend(a.id for a in articles)
+        return embed_articles_light(articles, dim=16)
+
+
+def test_rerun_embeds_only_new_or_changed_texts(tmp_path):
+    articles = [_article(f"a{i}", f"paper about topic {i}") for i in range(5)]
+    first = _CountingEmbedder()
+    emb = embed_with_cache(articles, first, EmbeddingCache(tmp_path, "light", 16))
+    assert first.seen == [a.id for a in articles]
+    np.testing.assert_allclose(
+        emb.vectors, embed_articles_light(articles, dim=16).vectors, atol=1e-6
+    )
+
+    articles[2] = _article("a2", "rewritten abstract")
+    articles.append(_article("a5", "paper about topic 0"))  # same text as a0
+    second = _CountingEmbedder()
+    cache = EmbeddingCache(tmp_path, "light", 16)  # reopened from disk
+    emb2 = embed_with_cache(articles, second, cache)
+    assert second.seen == ["a2"]
+    assert (cache.hits, cache.misses) == (5, 1)
+    assert emb2.article_ids == [a.id for a in articles]
+    np.testing.assert_array_equal(emb2.vectors[5], emb2.vectors[0])
+    np.testing.assert_allclose(
+        emb2.vectors[2], embed_articles_light([articles[2]], dim=16).vectors[0], atol=1e-6
+    )
+
+
+def test_unchanged_folder_is_served_from_the_memory_map(tmp_path):
+    articles = [_article(f"a{i}", f"text {i}") for i in range(4)]
+    embed_with_cache(articles, _CountingEmbedder(), EmbeddingCache(tmp_path, "light", 16))
+    emb = embed_with_cache(articles, _CountingEmbedder(), EmbeddingCache(tmp_path, "light", 16))
+    assert isinstance(emb.vectors, np.memmap)
+
+
+def test_cached_and_uncached_paths_agree_on_dtype_and_counts(tmp_path):
+    articles = [_article(f"a{i}", "same text" if i < 3 else f"text {i}") for i in range(5)]
+    embedder = _CountingEmbedder()
+    cache = EmbeddingCache(tmp_path, "light", 16)
+    emb = embed_with_cache(articles, embedder, cache)
+    assert embedder.seen == ["a0", "a3", "a4"]  # the shared text is embedded once
+    assert (cache.hits, cache.misses) == (0, 5)
+    assert (emb.stats["cache_hits"], emb.stats["cache_misses"]) == (0, 5)
+    assert emb.vectors.dtype == embed_articles_light(articles, dim=16).vectors.dtype
+
+
+def test_interrupted_append_is_discarded(tmp_path):
+    articles = [_article(f"a{i}", f"text {i}") for i in range(3)]
+    cache = EmbeddingCache(tmp_path, "light", 16)
+    embed_with_cache(articles[:2], _CountingEmbedder(), cache)
+    with open(cache.path / "vectors.f32", "ab") as f:
+        f.write(b"\0" * 10)  # half-written row, never indexed
+
+    reopened = EmbeddingCache(tmp_path, "light", 16)
+    assert len(reopened) == 2
+    emb = embed_with_cache(articles, _CountingEmbedder(), reopened)
+    assert len(EmbeddingCache(tmp_path, "light", 16)) == 3
+    np.testing.assert_allclose(
+        emb.vectors[2], embed_articles_light(articles[2:], dim=16).vectors[0], atol=1e-6
+    )
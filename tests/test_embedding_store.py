@@ -0,0 +1,52 @@
+import numpy as np
+import pytest
+
+from paper_grouper.core.data import ArticleRecord
+from paper_grouper.core.embedder import embed_articles_light
+from paper_grouper.core.graph_builder import knn_search_blocked
+from paper_grouper.core.quantization import quantize_embeddings
+from paper_grouper.io.embedding_store import embed_to_memmap
+
+
+def _articles(n):
+    for i in range(n):
+        text = f"topic{i % 7} paper {i} words {i % 3}"
+        yield ArticleRecord(
+            id=f"p{i}", src_path="", title=text, abstract="", keywords="", year=None, text_repr=text
+        )
+
+
+@pytest.mark.parametrize("storage", ["float32", "int8"])
+def test_streamed_memmap_matches_in_memory_embedding(tmp_path, storage):
+    expected = quantize_embeddings(embed_articles_light(list(_articles(50)), dim=16), storage)
+
+    # a generator without len(): the file has to grow while streaming
+    emb = embed_to_memmap(
+        _articles(50),
+        lambda chunk: embed_articles_light(chunk, dim=16),
+        tmp_path / "vectors.bin",
+        dim=16,
+        chunk_size=7,
+        storage=storage,
+    )
+    assert isinstance(emb.vectors, np.memmap)
+    assert emb.article_ids == expected.article_ids
+    np.testing.assert_array_equal(emb.vectors, expected.vectors)
+    if storage == "int8":
+        np.testing.assert_array_equal(emb.scales, expected.scales)
+    assert (tmp_path / "vectors.bin").stat().st_size == emb.vectors.nbytes
+
+    idx, _ = knn_search_blocked(emb.vectors, k=4, block_size=8, tile_size=16)
+    np.testing.assert_array_equal(idx, knn_search_blocked(expected.vectors, k=4)[0])
+
+
+def test_preallocated_size_is_enforced(tmp_path):
+    with pytest.raises(ValueError):
+        embed_to_memmap(
+            _articles(10),
+            lambda chunk: embed_articles_light(chunk, dim=8),
+            tmp_path / "v.bin",
+            dim=8,
+            n_articles=5,
+            chunk_size=4,
+        )
@@ -0,0 +1,140 @@
+import os
+
+import pytest
+
+from paper_grouper import app_controller
+from paper_grouper.core.metadata_extractor import batch_extract
+from paper_grouper.io.file_scanner import iter_pdfs, list_pdfs
+
+
+def _tree(root):
+    for rel in [
+        "a.pdf",
+        "notes.txt",
+        "2021/icml/b.PDF",
+        "2021/icml/b_old.pdf",
+        "2022/c.pdf",
+        "2022/nips/deep/d.pdf",
+        "drafts/e.pdf",
+    ]:
+        path = root / rel
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_bytes(b"%PDF-1.4\n" + rel.encode())
+    # a loop back to the root and a dangling link
+    os.symlink(root, root / "2022" / "loop")
+    os.symlink(root / "missing.pdf", root / "dangling.pdf")
+
+
+def _rel(root, paths):
+    return [os.path.relpath(p, root) for p in paths]
+
+
+def test_recursive_scan_with_filters_and_symlink_loop(tmp_path):
+    _tree(tmp_path)
+    assert _rel(tmp_path, list_pdfs(str(tmp_path))) == ["a.pdf"]
+
+    expected = [
+        "2021/icml/b.PDF",
+        "2021/icml/b_old.pdf",
+        "2022/c.pdf",
+        "2022/nips/deep/d.pdf",
+        "a.pdf",
+        "drafts/e.pdf",
+    ]
+    for workers in (1, 4):
+        found = list_pdfs(str(tmp_path), recursive=True, max_workers=workers)
+        assert _rel(tmp_path, found) == expected
+
+    filtered = list_pdfs(
+        str(tmp_path), recursive=True, include=["2021/*", "2022/*"], exclude=["drafts", "*_old.pdf"]
+    )
+    assert _rel(tmp_path, filtered) == ["2021/icml/b.PDF", "2022/c.pdf", "2022/nips/deep/d.pdf"]
+
+
+@pytest.mark.parametrize("recursive", [False, True])
+def test_missing_input_folder_raises(tmp_path, recursive):
+    with pytest.raises(FileNotFoundError):
+        list_pdfs(str(tmp_path / "missing"), recursive=recursive)
+
+
+def test_unreadable_subfolder_is_skipped(tmp_path, monkeypatch):
+    _tree(tmp_path)
+    real_scandir = os.scandir
+
+    def scandir(path):
+        if os.path.basename(path) == "drafts":
+            raise PermissionError(path)
+        return real_scandir(path)
+
+    monkeypatch.setattr(os, "scandir", scandir)
+    found = list_pdfs(str(tmp_path), recursive=True, max_workers=1)
+    assert "drafts/e.pdf" not in _rel(tmp_path, found) and "a.pdf" in _rel(tmp_path, found)
+
+
+def test_streamed_scan_feeds_extraction(tmp_path):
+    _tree(tmp_path)
+    records = batch_extract(iter_pdfs(str(tmp_path), recursive=True), max_workers=2, chunk_size=2)
+    assert sorted(r.id for r in records) == [
+        "a.pdf",
+        "b.PDF",
+        "b_old.pdf",
+        "c.pdf",
+        "d.pdf",
+        "e.pdf",
+    ]
+
+
+def test_run_extracts_while_the_folder_is_scanned(tmp_path, monkeypatch):
+    _tree(tmp_path)
+    events = []
+    real_iter, real_extract = app_controller.iter_pdfs, app_controller.batch_extract
+
+    def scan(*args, **kwargs):
+        for path in real_iter(*args, **kwargs):
+            events.append("scan")
+            yield path
+
+    def extract(paths, **kwargs):
+        return real_extract((events.append("extract") or p for p in paths), **kwargs)
+
+    monkeypatch.setattr(app_controller, "iter_pdfs", scan)
+    monkeypatch.setattr(app_controller, "batch_extract", extract)
+    app_controller.run_manual(
+        str(tmp_path),
+        str(tmp_path / "out"),
+        k=2,
+        resolution=1.0,
+        min_cluster_size=1,
+        rename_with_title=False,
+        recursive=True,
+    )
+    assert events.count("scan") == events.count("extract") == 6
+    assert events.index("extract") < len(events) - 1 - events[::-1].index("scan")
+
+
+def test_recursive_run_disambiguates_repeated_file_names(tmp_path):
+    for folder in ("x", "y"):
+        for i in range(3):
+            path = tmp_path / "in" / folder / f"paper{i}.pdf"
+            path.parent.mkdir(parents=True, exist_ok=True)
+            path.write_bytes(f"%PDF-1.4\n{folder}{i}".encode())
+    (tmp_path / "in" / "x" / "only.pdf").write_bytes(b"%PDF-1.4\n")
+
+    result = app_controller.run_manual(
+        str(tmp_path / "in"),
+        str(tmp_path / "out"),
+        k=2,
+        resolution=1.0,
+        min_cluster_size=1,
+        rename_with_title=False,
+        recursive=True,
+    )
+    assert sorted(result["articles"]) == [
+        "only.pdf",
+        "x/paper0.pdf",
+        "x/paper1.pdf",
+        "x/paper2.pdf",
+        "y/paper0.pdf",
+        "y/paper1.pdf",
+        "y/paper2.pdf",
+    ]
@@ -0,0 +1,75 @@
+import numpy as np
+import scipy.sparse as sp
+from sklearn.metrics.pairwise import cosine_similarity
+
+from paper_grouper.core.data import EmbeddingResult
+from paper_grouper.core.graph_builder import (
+    build_knn_graph,
+    compute_neighbor_table,
+    graph_from_neighbor_table,
+    knn_search_blocked,
+)
+
+
+def _dense_reference_edges(vectors: np.ndarray, k: int) -> dict:
+    sims = cosine_similarity(vectors)
+    edges = {}
+    for i in range(sims.shape[0]):
+        idx_sorted = np.argsort(-sims[i], kind="stable")
+        for j in [j for j in idx_sorted if j != i][:k]:
+            key = (min(i, j), max(i, j))
+            edges[key] = max(edges.get(key, -1.0), float(sims[i, j]))
+    return edges
+
+
+def test_blocked_graph_matches_dense_reference():
+    rng = np.random.default_rng(0)
+    vectors = rng.normal(size=(57, 16))
+    ids = [f"p{i}" for i in range(57)]
+    emb = EmbeddingResult(vectors=vectors, article_ids=ids)
+
+    expected = _dense_reference_edges(vectors, k=5)
+    for block_size in (1, 7, 1024):
+        G = build_knn_graph(emb, k=5, block_size=block_size)
+        got = {
+            (min(int(a[1:]), int(b[1:])), max(int(a[1:]), int(b[1:]))): d["weight"]
+            for a, b, d in G.to_networkx().edges(data=True)
+        }
+        assert got.keys() == expected.keys()
+        for key, w in expected.items():
+            assert abs(got[key] - w) < 1e-5
+
+
+def test_knn_search_excludes_self_and_clamps_k():
+    vectors = np.eye(3)
+    indices, sims = knn_search_blocked(vectors, k=10, block_size=2)
+    assert indices.shape == (3, 2)
+    for i in range(3):
+        assert i not in indices[i]
+    assert np.allclose(sims, 0.0)
+
+
+def test_graphs_sliced_from_neighbor_table_match_direct_build():
+    rng = np.random.default_rng(1)
+    emb = EmbeddingResult(
+        vectors=rng.normal(size=(40, 8)), article_ids=[f"p{i}" for i in range(40)]
+    )
+    table = compute_neighbor_table(emb, k_max=12)
+    assert table.indices.shape == (40, 12)
+    for k in (3, 8, 12):
+        sliced = graph_from_neighbor_table(table, k)
+        direct = build_knn_graph(emb, k=k)
+        assert np.array_equal(sliced.indptr, direct.indptr)
+        assert np.array_equal(sliced.indices, direct.indices)
+
+
+def test_non_positive_similarities_are_linked_only_for_dense_input():
+    # orthogonal and opposite vectors: the only neighbors have similarity <= 0
+    vectors = np.array([[1.0, 0.0], [0.0, 1.0], [-1.0, 0.0]])
+    dense = EmbeddingResult(vectors=vectors, article_ids=["a", "b", "c"])
+    assert build_knn_graph(dense, k=2).n_edges > 0
+
+    # sparse rows sharing no term (similarity 0) carry no affinity
+    sparse = EmbeddingResult(vectors=sp.csr_matrix(np.eye(3)), article_ids=["a", "b", "c"])
+    G = build_knn_graph(sparse, k=2)
+    assert G.n_nodes == 3 and G.n_edges == 0
@@ -0,0 +1,63 @@
+import numpy as np
+import pytest
+
+from paper_grouper.core.community_detector import detect_communities_louvain
+from paper_grouper.core.data import EmbeddingResult
+from paper_grouper.core.graph_builder import build_knn_graph
+from paper_grouper.core.sparse_graph import labels_from_partition, modularity
+
+
+def _knn_graph(n: int = 600, noise: float = 1.5, seed: int = 0):
+    rng = np.random.default_rng(seed)
+    centers = rng.normal(size=(8, 16))
+    vectors = centers[rng.integers(0, 8, n)] + noise * rng.normal(size=(n, 16))
+    return build_knn_graph(
+        EmbeddingResult(vectors=vectors, article_ids=[f"p{i}" for i in range(n)]), k=8
+    )
+
+
+@pytest.mark.parametrize("resolution", [0.8, 1.0, 1.2])
+def test_native_modularity_close_to_python_louvain(resolution):
+    G = _knn_graph()
+    ref = detect_communities_louvain(G, resolution, backend="python-louvain", seed=0)
+    nat = detect_communities_louvain(G, resolution, backend="native", seed=0)
+
+    assert set(nat) == set(G.node_ids)
+    q_ref = modularity(G, labels_from_partition(G, ref))
+    q_nat = modularity(G, labels_from_partition(G, nat))
+    assert q_nat >= q_ref - 0.02
+
+
+def test_native_is_deterministic_for_a_seed():
+    G = _knn_graph(n=300)
+    a = detect_communities_louvain(G, 1.0, backend="native", seed=7)
+    b = detect_communities_louvain(G, 1.0, backend="native", seed=7)
+    assert a == b
+
+
+@pytest.mark.parametrize("backend", ["python-louvain", "native"])
+def test_warm_start_from_finer_resolution(backend):
+    G = _knn_graph()
+    fine = detect_communities_louvain(G, 1.2, backend=backend, seed=0)
+    cold = detect_communities_louvain(G, 1.0, backend=backend, seed=0)
+    warm = detect_communities_louvain(G, 1.0, backend=backend, seed=0, initial_partition=fine)
+
+    assert set(warm) == set(G.node_ids)
+    q_cold = modularity(G, labels_from_partition(G, cold))
+    q_warm = modularity(G, labels_from_partition(G, warm))
+    assert q_warm >= q_cold - 0.02
+
+
+def test_python_louvain_warm_start_with_negative_similarities():
+    # 3 tight clusters of 6 at k=8: every node also links to far, negative-similarity points
+    rng = np.random.default_rng(0)
+    centers = rng.normal(size=(3, 8))
+    vectors = np.repeat(centers, 6, axis=0) + 0.1 * rng.normal(size=(18, 8))
+    G = build_knn_graph(
+        EmbeddingResult(vectors=vectors, article_ids=[str(i) for i in range(18)]), 8
+    )
+    assert (G.weights <= 0).any()
+
+    fine = detect_communities_louvain(G, 1.2, seed=0)
+    warm = detect_communities_louvain(G, 1.0, seed=0, initial_partition=fine)
+    assert warm == detect_communities_louvain(G, 1.0, seed=0)
@@ -0,0 +1,179 @@
+import os
+from pathlib import Path
+
+import numpy as np
+
+from paper_grouper import app_controller
+from paper_grouper.core.embedder import EMBEDDER_SPECS
+from paper_grouper.core.metadata_extractor import batch_extract
+from paper_grouper.io import manifest, metadata_cache
+from paper_grouper.io.manifest import (
+    EMBEDDINGS_FILE,
+    SCALES_FILE,
+    Manifest,
+    diff_manifest,
+    read_manifest,
+    scan_entries,
+    write_manifest,
+)
+from paper_grouper.io.metadata_cache import fingerprint
+
+
+def _pdfs(folder, n):
+    folder.mkdir(exist_ok=True)
+    paths = []
+    for i in range(n):
+        pdf = folder / f"paper{i}.pdf"
+        pdf.write_bytes(b"%PDF-1.4\n" + bytes([i]) * (1000 + i))
+        paths.append(str(pdf))
+    return paths
+
+
+def _count_embedded(monkeypatch):
+    embedded = []
+    real_embed = app_controller.embed_articles
+
+    def counting_embed(articles, *args, **kw):
+        embedded.extend(a.id for a in articles)
+        return real_embed(articles, *args, **kw)
+
+    monkeypatch.setattr(app_controller, "embed_articles", counting_embed)
+    return embedded
+
+
+def test_manifest_round_trip_and_diff(tmp_path):
+    paths = _pdfs(tmp_path / "in", 4)
+    vectors = np.arange(4 * 3, dtype=np.float32).reshape(4, 3)
+    config = {"extractor": "x/v1", "embedder": "light/v1", "dim": 3}
+    written = Manifest(scan_entries(paths), batch_extract(paths), config, vectors)
+    write_manifest(tmp_path, written)
+
+    loaded = read_manifest(tmp_path)
+    assert loaded.config == config
+    assert loaded.entries == written.entries
+    assert loaded.records == written.records
+    np.testing.assert_array_equal(loaded.vectors, vectors)
+
+    with open(paths[1], "ab") as f:
+        f.write(b"more")
+    os.remove(paths[3])
+    new = tmp_path / "in" / "new.pdf"
+    new.write_bytes(b"%PDF-1.4\nnew")
+    current = scan_entries([paths[0], paths[1], paths[2], str(new)])
+
+    diff = diff_manifest(loaded, current)
+    assert diff.reused == {0: 0, 2: 2}
+    assert diff.modified == [1]
+    assert diff.added == [3]
+    assert diff.removed == [paths[3]]
+
+    assert read_manifest(tmp_path / "missing") is None
+
+
+def test_incremental_run_only_embeds_new_and_modified(tmp_path, monkeypatch):
+    in_dir = tmp_path / "in"
+    paths = _pdfs(in_dir, 8)
+    kwargs = dict(k=3, resolution=1.0, min_cluster_size=1, rename_with_title=False)
+    first = app_controller.run_manual(str(in_dir), str(tmp_path / "out1"), **kwargs)
+    assert (tmp_path / "out1" / EMBEDDINGS_FILE).exists()
+
+    embedded = _count_embedded(monkeypatch)
+    with open(paths[2], "ab") as f:
+        f.write(b"more")
+    os.remove(paths[5])
+    second = app_controller.run_manual(
+        str(in_dir), str(tmp_path / "out2"), incremental_from=first["output_root"], **kwargs
+    )
+
+    assert embedded == ["paper2.pdf"]
+    assert second["incremental_stats"] == {"unchanged": 6, "added": 0, "modified": 1, "removed": 1}
+    assert set(second["articles"]) == {f"paper{i}.pdf" for i in range(8) if i != 5}
+
+    # reused vectors match a from-scratch run on the same folder
+    full = read_manifest(second["output_root"])
+    scratch = app_controller.run_manual(str(in_dir), str(tmp_path / "out3"), **kwargs)
+    np.testing.assert_allclose(full.vectors, read_manifest(scratch["output_root"]).vectors)
+
+
+def test_another_extractor_version_rebuilds_everything(tmp_path, monkeypatch):
+    in_dir = tmp_path / "in"
+    _pdfs(in_dir, 5)
+    kwargs = dict(k=2, resolution=1.0, min_cluster_size=1, rename_with_title=False)
+    first = app_controller.run_manual(str(in_dir), str(tmp_path / "out1"), **kwargs)
+
+    embedded = _count_embedded(monkeypatch)
+    monkeypatch.setattr(app_controller, "EXTRACTOR_VERSION", "placeholder/v2")
+    second = app_controller.run_manual(
+        str(in_dir), str(tmp_path / "out2"), incremental_from=first["output_root"], **kwargs
+    )
+    assert sorted(embedded) == [f"paper{i}.pdf" for i in range(5)]
+    assert second["incremental_rebuild"] and "incremental_stats" not in second
+    assert read_manifest(second["output_root"]).config["extractor"] == "placeholder/v2"
+
+
+def test_each_pdf_is_fingerprinted_once_per_run(tmp_path, monkeypatch):
+    in_dir = tmp_path / "in"
+    paths = _pdfs(in_dir, 5)
+    calls = []
+
+    def counting_fingerprint(path):
+        calls.append(path)
+        return fingerprint(path)
+
+    monkeypatch.setattr(manifest, "fingerprint", counting_fingerprint)
+    monkeypatch.setattr(metadata_cache, "fingerprint", counting_fingerprint)
+    kwargs = dict(
+        k=2,
+        resolution=1.0,
+        min_cluster_size=1,
+        rename_with_title=False,
+        metadata_cache=str(tmp_path / "meta.sqlite"),
+    )
+    first = app_controller.run_manual(str(in_dir), str(tmp_path / "out1"), **kwargs)
+    assert sorted(calls) == sorted(paths)
+
+    calls.clear()
+    with open(paths[0], "ab") as f:
+        f.write(b"more")
+    app_controller.run_manual(
+        str(in_dir), str(tmp_path / "out2"), incremental_from=first["output_root"], **kwargs
+    )
+    assert sorted(calls) == sorted(paths)
+
+
+def test_incremental_run_keeps_int8_vectors_in_a_memmap(tmp_path, monkeypatch):
+    in_dir = tmp_path / "in"
+    paths = _pdfs(in_dir, 6)
+    kwargs = dict(
+        k=2,
+        resolution=1.0,
+        min_cluster_size=1,
+        rename_with_title=False,
+        embedding_storage="int8",
+    )
+    first = app_controller.run_manual(str(in_dir), str(tmp_path / "out1"), **kwargs)
+    assert (Path(first["output_root"]) / SCALES_FILE).exists()
+    assert read_manifest(first["output_root"]).vectors.dtype == np.int8
+
+    embedded = _count_embedded(monkeypatch)
+    with open(paths[4], "ab") as f:
+        f.write(b"more")
+    memmap = tmp_path / "vectors.mmap"
+    second = app_controller.run_manual(
+        str(in_dir),
+        str(tmp_path / "out2"),
+        incremental_from=first["output_root"],
+        embedding_memmap=str(memmap),
+        **kwargs,
+    )
+    assert embedded == ["paper4.pdf"]
+    assert memmap.stat().st_size == 6 * EMBEDDER_SPECS["light"][1]  # int8 rows
+
+    def dequantized(folder):
+        m = read_manifest(folder)
+        return m.vectors.astype(np.float32) * m.scales[:, None]
+
+    scratch = app_controller.run_manual(str(in_dir), str(tmp_path / "out3"), **kwargs)
+    np.testing.assert_allclose(
+        dequantized(second["output_root"]), dequantized(scratch["output_root"]), atol=1e-6
+    )
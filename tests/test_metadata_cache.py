@@ -0,0 +1,48 @@
+import os
+
+from paper_grouper.core.metadata_extractor import batch_extract
+from paper_grouper.io.metadata_cache import MetadataCache, extract_with_cache
+
+
+class _CountingExtractor:
+    def __init__(self):
+        self.seen = []
+
+    def __call__(self, paths):
+        paths = list(paths)
+        self.seen.extend(os.path.basename(p) for p in paths)
+        records = batch_extract(paths, max_workers=1)
+        for rec in records:
+            rec.first_page_text = f"first page of {rec.id} " * 20
+        return records
+
+
+def _pdfs(folder, n):
+    paths = []
+    for i in range(n):
+        pdf = folder / f"paper{i}.pdf"
+        pdf.write_bytes(b"%PDF-1.4\n" + bytes([i]) * (1000 + i))
+        paths.append(str(pdf))
+    return paths
+
+
+def test_unchanged_pdfs_are_not_reparsed(tmp_path):
+    paths = _pdfs(tmp_path, 4)
+    db = tmp_path / "meta.sqlite"
+
+    first = _CountingExtractor()
+    with MetadataCache(db) as cache:
+        records, stats = extract_with_cache(paths, cache, first)
+    assert first.seen == [f"paper{i}.pdf" for i in range(4)]
+    assert stats == {"hits": 0, "misses": 4, "bytes_saved": 0}
+
+    # paper2 changes (size and mtime), the others are untouched
+    with open(paths[2], "ab") as f:
+        f.write(b"more")
+    second = _CountingExtractor()
+    with MetadataCache(db) as cache:
+        again, stats = extract_with_cache(paths, cache, second)
+    assert second.seen == ["paper2.pdf"]
+    assert stats["hits"] == 3 and stats["misses"] == 1
+    assert stats["bytes_saved"] == sum(os.path.getsize(p) for i, p in enumerate(paths) if i != 2)
+    assert again == records
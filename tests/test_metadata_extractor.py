@@ -0,0 +1,25 @@
+import concurrent.futures
+
+from paper_grouper.core.metadata_extractor import batch_extract
+
+
+def test_parallel_extraction_keeps_input_order(tmp_path):
+    paths = []
+    for i in range(23):
+        pdf = tmp_path / f"paper_{(i * 7) % 23:02d}.pdf"
+        pdf.write_bytes(b"%PDF-1.4\n")
+        paths.append(str(pdf))
+
+    serial = batch_extract(paths, max_workers=1)
+    parallel = batch_extract(paths, max_workers=3, chunk_size=4)
+    assert [a.src_path for a in parallel] == paths
+    assert parallel == serial
+
+
+def test_extraction_is_serial_by_default(tmp_path, monkeypatch):
+    def no_pool(*args, **kwargs):
+        raise AssertionError("no process pool expected")
+
+    monkeypatch.setattr(concurrent.futures, "ProcessPoolExecutor", no_pool)
+    paths = [str(tmp_path / f"p{i}.pdf") for i in range(200)]
+    assert [a.id for a in batch_extract(paths, chunk_size=4)] == [f"p{i}.pdf" for i in range(200)]
@@ -0,0 +1,78 @@
+import json
+
+import numpy as np
+
+from paper_grouper import app_controller
+from paper_grouper.core.near_duplicates import (
+    _word_hashes,
+    choose_bands,
+    lsh_groups,
+    minhash_signatures,
+)
+
+
+def _random_texts(n, words=150, seed=0):
+    rng = np.random.default_rng(seed)
+    return [" ".join(f"w{i}" for i in rng.integers(0, 5000, words)) for _ in range(n)]
+
+
+def test_edited_copies_group_and_unrelated_texts_do_not():
+    texts = _random_texts(300)
+    edited = texts[7].split()
+    edited[40] = "camera-ready"
+    texts.append(" ".join(edited))  # 300: ~0.95 similar to 7
+    texts.append(texts[12].upper() + "!")  # 301: same words as 12
+    texts += ["", "  ...  ", "tiny", "tiny"]  # no words twice, then two one-word texts
+
+    signatures, empty = minhash_signatures(texts)
+    assert signatures.shape == (len(texts), 128)
+    assert empty.tolist() == [False] * 302 + [True, True, False, False]
+    assert lsh_groups(signatures, 0.8, skip=empty) == [[7, 300], [12, 301], [304, 305]]
+
+
+def test_case_folding_that_changes_byte_length_keeps_words_in_their_text():
+    # "\u212a" (Kelvin sign) lowers from 3 bytes to 1, "\u0130" (İ) from 2 to 3
+    body = "one two three four five"
+    texts = ["kelvin \u212a \u212a \u212a", body, body, "\u0130" * 30, body]
+    _, lengths = _word_hashes(texts)
+    assert lengths.tolist() == [4, 5, 5, 1, 5]
+
+    signatures, empty = minhash_signatures(texts)
+    assert lsh_groups(signatures, 0.8, skip=empty) == [[1, 2, 4]]
+
+
+def test_band_choice_favours_recall_below_the_threshold():
+    for threshold in (0.5, 0.8, 0.9):
+        bands, rows = choose_bands(128, threshold)
+        assert bands * rows == 128
+        assert (1 / bands) ** (1 / rows) <= threshold
+    assert choose_bands(128, 0.8) == (16, 8)
+
+
+def test_merge_mode_folds_near_duplicates_before_the_graph(tmp_path):
+    in_dir = tmp_path / "in"
+    in_dir.mkdir()
+    base = "message passing neural networks for molecular property prediction at scale"
+    titles = [f"{base} preprint", f"{base} camera ready", "protein folding", "quantum error"]
+    for i, title in enumerate(titles + ["graph coloring", "sparse attention"]):
+        (in_dir / f"{title}.pdf").write_bytes(f"%PDF-1.4\n{i}".encode())
+
+    kwargs = dict(k=2, resolution=1.0, min_cluster_size=1, rename_with_title=False)
+    flagged = app_controller.run_manual(
+        str(in_dir), str(tmp_path / "flag"), near_duplicates="flag", **kwargs
+    )
+    assert len(flagged["articles"]) == 6
+    (group,) = flagged["near_duplicates"]
+    assert sorted(group) == sorted(f"{t}.pdf" for t in titles[:2])
+
+    merged = app_controller.run_manual(
+        str(in_dir), str(tmp_path / "merge"), near_duplicates="merge", **kwargs
+    )
+    assert merged["near_duplicates"] == flagged["near_duplicates"]
+    assert len(merged["articles"]) == 5
+    kept = merged["articles"][group[0]]
+    assert kept.aliases == [str(in_dir / group[1])]
+    assert group[1] not in merged["clustering"].article_to_cluster
+
+    summary = json.loads((tmp_path / "merge" / "clusters_summary.json").read_text())
+    assert summary["near_duplicates"] == [group]
@@ -0,0 +1,67 @@
+import tracemalloc
+
+import numpy as np
+import pytest
+from sklearn.metrics.pairwise import cosine_similarity
+
+from paper_grouper.core.ann_index import neighbor_recall
+from paper_grouper.core.data import EmbeddingResult
+from paper_grouper.core.graph_builder import knn_search_blocked
+from paper_grouper.core.quantization import dequantize, quantize_embeddings, storage_mode
+
+
+def _clustered(n=1500, d=64, seed=0):
+    rng = np.random.default_rng(seed)
+    centers = rng.normal(size=(30, d))
+    vectors = centers[rng.integers(30, size=n)] + 0.5 * rng.normal(size=(n, d))
+    return EmbeddingResult(vectors=vectors, article_ids=[str(i) for i in range(n)])
+
+
+def _float64_knn(vectors, k):
+    sims = cosine_similarity(vectors.astype(np.float64))
+    np.fill_diagonal(sims, -np.inf)
+    return np.argsort(-sims, axis=1, kind="stable")[:, :k]
+
+
+@pytest.mark.parametrize(
+    "storage, min_overlap, max_rel_err",
+    # neighbor overlap of the 10-NN lists against the float64 search
+    [("float32", 0.999, 1e-6), ("float16", 0.99, 1e-3), ("int8", 0.95, 1e-2)],
+)
+def test_compact_storage_keeps_neighbors(storage, min_overlap, max_rel_err):
+    emb = _clustered()
+    exact = _float64_knn(emb.vectors, k=10)
+
+    compact = quantize_embeddings(emb, storage)
+    assert storage_mode(compact) == storage
+    assert compact.vectors.nbytes < emb.vectors.nbytes
+    rel_err = np.abs(dequantize(compact) - emb.vectors).max() / np.abs(emb.vectors).max()
+    assert rel_err < max_rel_err
+
+    approx, _ = knn_search_blocked(compact.vectors, k=10, block_size=256, tile_size=500)
+    assert neighbor_recall(approx, exact) >= min_overlap
+
+
+def test_int8_zero_rows_and_tiling_match_untiled_search():
+    emb = _clustered(n=300, d=16, seed=1)
+    emb.vectors[7] = 0.0
+    q = quantize_embeddings(emb, "int8")
+    assert q.scales[7] == 0.0 and not q.vectors[7].any()
+
+    full = knn_search_blocked(q.vectors, k=5, tile_size=10_000)
+    tiled = knn_search_blocked(q.vectors, k=5, tile_size=37)
+    np.testing.assert_array_equal(full[0], tiled[0])
+    np.testing.assert_allclose(full[1], tiled[1], atol=1e-6)
+
+
+def test_search_never_holds_a_float32_copy_of_int8_vectors():
+    emb = quantize_embeddings(_clustered(n=2000, d=512), "int8")
+    knn_search_blocked(emb.vectors, k=5, block_size=32, tile_size=128)  # warm-up
+    tracemalloc.start()
+    try:
+        knn_search_blocked(emb.vectors, k=5, block_size=32, tile_size=128)
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    # a float32 copy alone would be 4x the int8 matrix
+    assert peak < 2 * emb.vectors.nbytes
@@ -0,0 +1,63 @@
+from paper_grouper.core.search_strategies import (
+    SuccessiveHalving,
+    grid_configs,
+    make_strategy,
+)
+
+SPACE = {"k": [5, 10, 15], "resolution": [0.5, 1.0, 1.5], "min_cluster_size": [3]}
+
+
+def _score(cfg):
+    # single peak at k=10, resolution=1.0
+    return -abs(cfg["k"] - 10) - 10 * abs(cfg["resolution"] - 1.0)
+
+
+def _drive(strategy, max_trials=None):
+    seen = []
+    while True:
+        left = None if max_trials is None else max_trials - len(seen)
+        if left == 0:
+            break
+        batch = strategy.ask(left)
+        if not batch:
+            break
+        for cfg, fraction in batch:
+            seen.append((cfg, fraction))
+            strategy.tell(cfg, fraction, _score(cfg))
+    return seen
+
+
+def test_grid_and_random_cover_the_product_once():
+    grid = [cfg for cfg, _ in _drive(make_strategy("grid", SPACE, n_items=100))]
+    assert grid == grid_configs(SPACE)
+    rand = [cfg for cfg, _ in _drive(make_strategy("random", SPACE, n_items=100, seed=3))]
+    assert sorted(map(str, rand)) == sorted(map(str, grid))
+
+
+def test_halving_promotes_to_full_data_and_finds_peak():
+    strategy = SuccessiveHalving(SPACE, n_items=10_000, seed=0, eta=3, min_sample=100)
+    trials = _drive(strategy)
+    fractions = [f for _, f in trials]
+    assert fractions[: len(grid_configs(SPACE))] == [1 / 9] * 9
+    full = [cfg for cfg, f in trials if f == 1.0]
+    assert len(full) == 1 and full[0]["k"] == 10 and full[0]["resolution"] == 1.0
+
+
+def test_halving_fits_every_rung_in_the_budget():
+    strategy = make_strategy("halving", SPACE, n_items=10_000, seed=0, max_trials=5)
+    trials = _drive(strategy, max_trials=5)
+    fractions = [f for _, f in trials]
+    # 9 configs do not fit: 3 configs at 1/3 of the data, then the best one on all of it
+    assert fractions == [1 / 3] * 3 + [1.0]
+    assert strategy.ask() == []
+
+
+def test_tpe_respects_budget_and_never_repeats():
+    strategy = make_strategy("tpe", SPACE, n_items=100, seed=0, batch_size=2)
+    trials = _drive(strategy, max_trials=7)
+    keys = [tuple(cfg.values()) for cfg, _ in trials]
+    assert len(keys) == 7 and len(set(keys)) == 7
+    assert all(f == 1.0 for _, f in trials)
+    assert strategy.best_guess() == dict(
+        zip(SPACE, max(keys, key=lambda k: _score(dict(zip(SPACE, k)))), strict=True)
+    )
@@ -0,0 +1,29 @@
+import numpy as np
+
+from paper_grouper.core.shared_arrays import (
+    attach_array,
+    pack_strings,
+    share_array,
+    unpack_strings,
+)
+
+
+def test_shared_array_roundtrip_is_zero_copy():
+    arr = np.arange(12, dtype=np.float32).reshape(3, 4)
+    shm, spec = share_array(arr)
+    try:
+        other, view = attach_array(spec)
+        assert np.array_equal(view, arr)
+        view[0, 0] = 42.0
+        assert np.ndarray(arr.shape, dtype=arr.dtype, buffer=shm.buf)[0, 0] == 42.0
+        del view
+        other.close()
+    finally:
+        shm.close()
+        shm.unlink()
+
+
+def test_pack_strings_roundtrip():
+    values = ["a.pdf", "", "ação & ß", "x" * 300]
+    blob, offsets = pack_strings(values)
+    assert unpack_strings(blob, offsets) == values
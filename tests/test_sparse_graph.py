@@ -0,0 +1,53 @@
+import numpy as np
+from community import community_louvain
+
+from paper_grouper.core.cluster_postprocess import _compute_centrality, _merge_tiny_clusters
+from paper_grouper.core.data import EmbeddingResult
+from paper_grouper.core.graph_builder import build_knn_graph
+from paper_grouper.core.sparse_graph import csr_from_edges, labels_from_partition, modularity
+
+
+def _graph():
+    rng = np.random.default_rng(3)
+    ids = [f"p{i}" for i in range(30)]
+    return build_knn_graph(EmbeddingResult(vectors=rng.normal(size=(30, 6)), article_ids=ids), k=4)
+
+
+def test_csr_is_symmetric_and_keeps_max_weight():
+    G = csr_from_edges(
+        np.array([0, 1, 1, 2]),
+        np.array([1, 0, 2, 2]),
+        np.array([0.2, 0.5, -0.3, 1.0]),
+        ["a", "b", "c"],
+    )
+    nxG = G.to_networkx()
+    assert G.n_edges == 2
+    assert nxG["a"]["b"]["weight"] == 0.5
+    assert nxG["b"]["c"]["weight"] == -0.3
+    assert not nxG.has_edge("c", "c")
+
+
+def test_modularity_matches_python_louvain():
+    G = _graph()
+    partition = {node: i % 3 for i, node in enumerate(G.node_ids)}
+    expected = community_louvain.modularity(partition, G.to_networkx(), weight="weight")
+    assert abs(modularity(G, labels_from_partition(G, partition)) - expected) < 1e-9
+
+
+def test_merge_tiny_and_centrality_follow_heaviest_edges():
+    G = _graph()
+    nxG = G.to_networkx()
+    partition = {node: (0 if i < 28 else i) for i, node in enumerate(G.node_ids)}
+
+    merged = _merge_tiny_clusters(partition, G, min_size=2)
+    for node in ("p28", "p29"):
+        best = max(
+            (n for n in nxG[node] if partition[n] != partition[node]),
+            key=lambda n: nxG[node][n]["weight"],
+        )
+        assert merged[node] == partition[best]
+
+    cent = _compute_centrality(G, labels_from_partition(G, merged))
+    for node in G.node_ids:
+        expected = sum(d["weight"] for n, d in nxG[node].items() if merged[n] == merged[node])
+        assert abs(cent[node] - expected) < 1e-9
@@ -0,0 +1,94 @@
+import numpy as np
+import pytest
+import scipy.sparse as sp
+
+from paper_grouper.core.autotune import run_autotune
+from paper_grouper.core.cluster_postprocess import score_clustering
+from paper_grouper.core.community_detector import detect_communities_louvain
+from paper_grouper.core.data import ArticleRecord
+from paper_grouper.core.dim_reduction import reduce_dimensions
+from paper_grouper.core.embedder import embed_articles_tfidf, fit_tfidf
+from paper_grouper.core.graph_builder import build_knn_graph, knn_search_blocked
+from paper_grouper.io.tfidf_store import load_tfidf, save_tfidf
+
+TOPICS = [
+    "graph neural networks message passing node classification",
+    "protein folding structure prediction molecular dynamics",
+    "reinforcement learning policy gradient reward agents",
+]
+
+
+def _record(i, text):
+    return ArticleRecord(
+        id=f"a{i}",
+        src_path="",
+        title=text,
+        abstract="",
+        keywords="",
+        year=None,
+        text_repr=text,
+    )
+
+
+def _articles(n=45):
+    rng = np.random.default_rng(0)
+    return [
+        _record(i, " ".join(rng.choice(TOPICS[i % 3].split(), size=6)) + f" paper{i}")
+        for i in range(n)
+    ]
+
+
+def test_sparse_knn_matches_dense_search():
+    emb = embed_articles_tfidf(_articles())
+    assert sp.issparse(emb.vectors) and emb.vectors.dtype == np.float32
+    sparse_idx, sparse_sims = knn_search_blocked(emb.vectors, k=5, block_size=16, tile_size=10)
+    dense_idx, dense_sims = knn_search_blocked(emb.vectors.toarray(), k=5)
+    np.testing.assert_allclose(sparse_sims, dense_sims, atol=1e-6)
+    assert (sparse_idx == dense_idx).mean() > 0.99  # only float ties may reorder
+
+    G = build_knn_graph(emb, k=5)
+    same_topic = [
+        int(G.node_ids[i][1:]) % 3 == int(G.node_ids[j][1:]) % 3
+        for i in range(G.n_nodes)
+        for j in G.neighbors(i)[0]
+    ]
+    assert np.mean(same_topic) > 0.9
+
+    reduced = reduce_dimensions(emb, 8, method="pca")
+    assert reduced.vectors.shape == (45, 8) and not sp.issparse(reduced.vectors)
+
+
+def test_saved_vocabulary_reproduces_the_embedding(tmp_path):
+    articles = _articles()
+    vectorizer = fit_tfidf([a.text_repr for a in articles[:30]], stop_words=["paper0"], min_df=2)
+    path = save_tfidf(vectorizer, tmp_path / "vocab.npz")
+    assert load_tfidf(path).get_params() == vectorizer.get_params()
+
+    original = embed_articles_tfidf(articles[30:], vectorizer).vectors
+    reloaded = embed_articles_tfidf(articles[30:], load_tfidf(path)).vectors
+    assert (original != reloaded).nnz == 0
+
+
+@pytest.mark.parametrize("backend", ["python-louvain", "native"])
+def test_documents_sharing_no_term_become_singletons(backend):
+    # underscore-joined filenames tokenize to one term each, so no edge survives
+    articles = [_record(i, f"draft_{i}_final_v{i}") for i in range(6)]
+    emb = embed_articles_tfidf(articles)
+    G = build_knn_graph(emb, k=3)
+    assert G.total_weight() == 0.0
+
+    partition = detect_communities_louvain(G, 1.0, backend=backend, seed=0)
+    cr = score_clustering(partition, G, min_cluster_size=2, alpha=1.0, beta=0.5, gamma=0.5)
+    assert len(cr.clusters) == 6 and cr.modularity == 0.0
+
+    best_cr, _, trials = run_autotune(
+        articles,
+        emb,
+        k_values=[2, 3],
+        resolutions=[0.8, 1.0],
+        min_cluster_sizes=[2],
+        max_workers=2,
+        louvain_backend=backend,
+    )
+    assert len(trials) == 4 and all(t.modularity == 0.0 for t in trials)
+    assert len(best_cr.clusters) == 6